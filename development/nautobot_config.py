@@ -215,6 +215,7 @@ PLUGINS_CONFIG = {
 
 # Graphene middleware for GraphQL query logging and Prometheus metrics
 GRAPHENE["MIDDLEWARE"] = [  # noqa: F405
+    "nautobot_graphql_observability.limits.QueryLimitMiddleware",
     "nautobot_graphql_observability.logging_middleware.GraphQLQueryLoggingMiddleware",
     "nautobot_graphql_observability.middleware.PrometheusMiddleware",
 ]
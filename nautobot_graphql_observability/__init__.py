@@ -1,6 +1,8 @@
 """App declaration for nautobot_graphql_observability."""
 
 # Metadata is inherited from Nautobot. If not including Nautobot in the environment, this should be added
+import time
+from functools import partial
 from importlib import metadata
 
 from nautobot.apps import NautobotAppConfig
@@ -24,9 +26,62 @@ class NautobotAppGraphqlObservabilityConfig(NautobotAppConfig):
         "track_query_complexity": True,
         "track_field_resolution": False,
         "track_per_user": True,
+        "track_db_queries": True,
+        "detect_n_plus_one": False,
+        "n_plus_one_threshold": 10,
+        "track_query_cost": True,
+        "query_cost_default_list_size": 100,
+        "query_cost_field_weights": {},
+        "track_query_fingerprint": False,
+        "track_overhead": False,
+        "track_request_phases": False,
+        "query_limits_mode": "off",
+        "max_query_depth": 0,
+        "max_query_cost": 0,
+        "query_limit_user_overrides": {},
+        "query_limit_group_overrides": {},
+        "field_resolution_sample_rate": 1.0,
+        "field_resolution_sample_rates": {},
+        "field_resolution_max_traced_per_second": 0,
+        "analysis_cache_size": 1000,
+        "document_cache_size": 1000,
+        "max_operation_name_labels": 500,
+        "operation_name_label_allowlist": [],
+        "max_user_labels": 500,
+        "user_label_allowlist": [],
+        "max_fingerprint_labels": 500,
+        "max_persisted_query_labels": 500,
+        "max_n_plus_one_path_labels": 500,
+        "label_idle_seconds": 3600,
+        "metrics_endpoint_cache_ttl": 5,
         "query_logging_enabled": False,
         "log_query_body": False,
         "log_query_variables": False,
+        "log_query_fingerprint": False,
+        "query_log_queue_enabled": False,
+        "query_log_queue_size": 10000,
+        "query_log_batch_size": 100,
+        "query_log_queue_drop_policy": "drop_newest",
+        "slow_operations_enabled": False,
+        "slow_operation_threshold_ms": 1000,
+        "slow_operation_buffer_size": 1000,
+        "slow_operation_buffer_path": "",
+        "slow_operation_query_length": 2048,
+        "tracing_enabled": False,
+        "tracing_exporter": "otlp",
+        "tracing_otlp_endpoint": "",
+        "tracing_otlp_protocol": "grpc",
+        "tracing_jsonl_path": "",
+        "tracing_service_name": "nautobot",
+        "tracing_sample_rate": 1.0,
+        "tracing_max_queue_size": 2048,
+        "tracing_max_export_batch_size": 512,
+        "response_cache_enabled": False,
+        "response_cache_ttl": 30,
+        "response_cache_alias": "default",
+        "persisted_queries_enabled": False,
+        "persisted_queries_ttl": 86400,
+        "persisted_queries_alias": "default",
     }
     middleware = [
         "nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware",
@@ -48,27 +103,152 @@ class NautobotAppGraphqlObservabilityConfig(NautobotAppConfig):
         Request duration and query logging are handled by
         :class:`~nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware`,
         which is registered via :attr:`middleware` (the official Nautobot mechanism).
+
+        ``GraphQLDRFAPIView.get_response()`` is patched the same way to resolve
+        the optional automatic persisted queries (see
+        :mod:`~nautobot_graphql_observability.persisted_queries`) and serve
+        query responses from the optional response cache (see
+        :mod:`~nautobot_graphql_observability.response_cache`): it is the first
+        point where the DRF request is authenticated and its body parsed.
+        ``GraphQLDRFAPIView.parse_body()`` and ``finalize_response()`` are
+        patched to time the phases of each request (see
+        :mod:`~nautobot_graphql_observability.phases`).
         """
         super().ready()
         self._patch_init_graphql()
+        self._patch_get_response()
+        self._patch_request_phases()
 
     @staticmethod
     def _patch_init_graphql():
-        """Patch ``GraphQLDRFAPIView.init_graphql`` to load ``GRAPHENE["MIDDLEWARE"]``."""
+        """Patch ``GraphQLDRFAPIView.init_graphql`` to load ``GRAPHENE["MIDDLEWARE"]``.
+
+        The middlewares are instantiated once per process, and every request
+        uses the same chain of the middlewares enabled by the app settings
+        (see :mod:`~nautobot_graphql_observability.middleware_chain`).
+
+        ``init_graphql`` is called at the start of ``execute_graphql_request``,
+        which then parses, validates and executes the document with the
+        ``parse``, ``validate`` and ``execute`` functions of its module. These
+        are replaced by counterparts timing their phase (see
+        :mod:`~nautobot_graphql_observability.phases`), parsing and validating
+        through the caches of :mod:`~nautobot_graphql_observability.document_cache`.
+        """
+        from nautobot.core.api import views  # pylint: disable=import-outside-toplevel
         from nautobot.core.api.views import GraphQLDRFAPIView  # pylint: disable=import-outside-toplevel
 
+        from nautobot_graphql_observability.app_settings import (  # pylint: disable=import-outside-toplevel
+            get_app_settings,
+        )
+        from nautobot_graphql_observability.middleware_chain import (  # pylint: disable=import-outside-toplevel
+            get_middleware_chain,
+        )
+        from nautobot_graphql_observability.phases import (  # pylint: disable=import-outside-toplevel
+            timed_execute,
+            timed_parse,
+            timed_validate,
+        )
+
         original_init_graphql = GraphQLDRFAPIView.init_graphql
 
         def patched_init_graphql(view_self):
             original_init_graphql(view_self)
             if view_self.middleware is None:
-                from graphene_django.settings import graphene_settings  # pylint: disable=import-outside-toplevel
-                from graphene_django.views import instantiate_middleware  # pylint: disable=import-outside-toplevel
-
-                if graphene_settings.MIDDLEWARE:
-                    view_self.middleware = list(instantiate_middleware(graphene_settings.MIDDLEWARE))
+                view_self.middleware = get_middleware_chain(get_app_settings())
 
         GraphQLDRFAPIView.init_graphql = patched_init_graphql
+        views.parse = timed_parse
+        views.validate = timed_validate
+        views.execute = timed_execute
+
+    @staticmethod
+    def _patch_get_response():
+        """Patch ``GraphQLDRFAPIView.get_response`` to go through the persisted queries and response cache when enabled.
+
+        Persisted queries are resolved first, so the response cache sees the document.
+        Requests rejected by the view are kept as failed before execution.
+        """
+        from graphene_django.views import HttpError  # pylint: disable=import-outside-toplevel
+        from nautobot.core.api.views import GraphQLDRFAPIView  # pylint: disable=import-outside-toplevel
+
+        from nautobot_graphql_observability.app_settings import (  # pylint: disable=import-outside-toplevel
+            get_app_settings,
+        )
+        from nautobot_graphql_observability.persisted_queries import (  # pylint: disable=import-outside-toplevel
+            get_persisted_query_response,
+        )
+        from nautobot_graphql_observability.phases import (  # pylint: disable=import-outside-toplevel
+            get_current_phases,
+        )
+        from nautobot_graphql_observability.response_cache import (  # pylint: disable=import-outside-toplevel
+            get_cached_response,
+        )
+
+        original_get_response = GraphQLDRFAPIView.get_response
+
+        def patched_get_response(view_self, request, data):
+            config = get_app_settings()
+            get_response = partial(original_get_response, view_self)
+            if config.response_cache_enabled:
+                get_response = partial(get_cached_response, get_response=get_response, config=config)
+            try:
+                if config.persisted_queries_enabled:
+                    return get_persisted_query_response(request, data, get_response, config)
+                return get_response(request, data)
+            except HttpError as error:
+                phases = get_current_phases()
+                if phases is not None:
+                    phases.fail(error, query=data.get("query") if hasattr(data, "get") else None)
+                raise
+
+        GraphQLDRFAPIView.get_response = patched_get_response
+
+    @staticmethod
+    def _patch_request_phases():
+        """Patch ``GraphQLDRFAPIView.parse_body`` and ``finalize_response`` to time the body parsing and serialization.
+
+        The response is rendered after the view returns it: its serialization
+        is timed from ``finalize_response`` to the end of its rendering.
+        """
+        from graphene_django.views import HttpError  # pylint: disable=import-outside-toplevel
+        from nautobot.core.api.views import GraphQLDRFAPIView  # pylint: disable=import-outside-toplevel
+
+        from nautobot_graphql_observability.phases import (  # pylint: disable=import-outside-toplevel
+            REQUEST_PARSE,
+            SERIALIZE,
+            get_current_phases,
+        )
+
+        original_parse_body = GraphQLDRFAPIView.parse_body
+        original_finalize_response = GraphQLDRFAPIView.finalize_response
+
+        def patched_parse_body(view_self, request):
+            phases = get_current_phases()
+            if phases is None:
+                return original_parse_body(view_self, request)
+            start_time = time.monotonic()
+            try:
+                return original_parse_body(view_self, request)
+            except HttpError as error:
+                phases.fail(error)
+                raise
+            finally:
+                phases.add(REQUEST_PARSE, time.monotonic() - start_time)
+
+        def patched_finalize_response(view_self, request, response, *args, **kwargs):
+            response = original_finalize_response(view_self, request, response, *args, **kwargs)
+            phases = get_current_phases()
+            if phases is not None and hasattr(response, "add_post_render_callback"):
+                start_time = time.monotonic()
+
+                def record_serialization(_response):
+                    phases.add(SERIALIZE, time.monotonic() - start_time)
+
+                response.add_post_render_callback(record_serialization)
+            return response
+
+        GraphQLDRFAPIView.parse_body = patched_parse_body
+        GraphQLDRFAPIView.finalize_response = patched_finalize_response
 
 
 config = NautobotAppGraphqlObservabilityConfig  # pylint:disable=invalid-name
@@ -0,0 +1,113 @@
+"""Per-document analysis of GraphQL operations, memoized in a bounded LRU cache.
+
+Clients tend to send the same handful of documents over and over again. The
+static properties of an operation (name, root fields, depth, complexity, ...) only
+depend on the document text, so they are computed once per distinct document
+and served from :data:`_analysis_cache` afterwards, skipping the AST walk.
+"""
+
+import hashlib
+from typing import NamedTuple
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cache import LRUCache
+from nautobot_graphql_observability.utils import analyze_selection_set
+
+_analysis_cache = None
+
+
+class OperationAnalysis(NamedTuple):
+    """Static properties of a GraphQL operation derived from its AST."""
+
+    operation_name: str
+    root_fields: tuple
+    depth: int
+    complexity: int
+    alias_count: int
+    fragment_count: int
+    max_breadth: int
+
+
+def _get_analysis_cache():
+    """Return the process-wide analysis cache, creating it on first use.
+
+    The capacity follows the ``analysis_cache_size`` app setting, so the cache
+    is resized when the settings snapshot is rebuilt with a different value.
+    """
+    global _analysis_cache  # noqa: PLW0603  # pylint: disable=global-statement
+    maxsize = get_app_settings().analysis_cache_size
+    if _analysis_cache is None:
+        _analysis_cache = LRUCache("query_analysis", maxsize)
+    elif _analysis_cache.maxsize != maxsize:
+        _analysis_cache.resize(maxsize)
+    return _analysis_cache
+
+
+def document_cache_key(operation):
+    """Build the cache key for an operation: a digest of the document text plus the operation name.
+
+    A document may hold several operations, so the name of the selected one
+    is part of the key. Returns None when the operation carries no source
+    location (e.g. a programmatically built AST), in which case it is not cached.
+    """
+    loc = getattr(operation, "loc", None)
+    body = loc.source.body if loc is not None else None
+    if not isinstance(body, str):
+        return None
+    name = operation.name.value if operation.name else ""
+    return hashlib.blake2b(body.encode(), digest_size=16).digest(), name
+
+
+def _analyze(operation, fragments):
+    """Walk the operation AST once and build its :class:`OperationAnalysis`."""
+    stats = analyze_selection_set(operation.selection_set, fragments)
+    root_fields = tuple(sorted(stats.root_fields))
+
+    if operation.name:
+        operation_name = operation.name.value
+    else:
+        operation_name = ",".join(root_fields) if root_fields else "anonymous"
+
+    return OperationAnalysis(
+        operation_name=operation_name,
+        root_fields=root_fields,
+        depth=stats.depth,
+        complexity=stats.field_count,
+        alias_count=stats.alias_count,
+        fragment_count=stats.fragment_count,
+        max_breadth=stats.max_breadth,
+    )
+
+
+def analyze_operation(info):
+    """Return the :class:`OperationAnalysis` of the operation being executed.
+
+    Args:
+        info (GraphQLResolveInfo): GraphQL resolve info of any field of the operation.
+
+    Returns:
+        OperationAnalysis: The cached or freshly computed analysis.
+    """
+    return analyze_operation_node(info.operation, info.fragments)
+
+
+def analyze_operation_node(operation, fragments=None):
+    """Return the :class:`OperationAnalysis` of an operation of a parsed document.
+
+    Args:
+        operation (OperationDefinitionNode): The operation to analyze.
+        fragments (dict): Fragment definitions of the document, by name.
+
+    Returns:
+        OperationAnalysis: The cached or freshly computed analysis.
+    """
+    key = document_cache_key(operation)
+    if key is None:
+        return _analyze(operation, fragments)
+
+    cache = _get_analysis_cache()
+    analysis = cache.get(key)
+    if analysis is None:
+        analysis = _analyze(operation, fragments)
+        cache.set(key, analysis)
+    return analysis
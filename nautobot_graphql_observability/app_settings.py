@@ -0,0 +1,247 @@
+"""Compiled, immutable snapshot of the app's ``PLUGINS_CONFIG`` settings.
+
+The Graphene middlewares consult the app configuration on every field
+resolution. Rather than going through ``django.conf.settings`` and several
+dict lookups each time, the configuration is compiled once into an
+:class:`AppSettings` instance whose values are already type-resolved, and
+shared by every middleware. The snapshot is dropped whenever Django reports a
+change to ``PLUGINS_CONFIG`` (``override_settings`` in tests, for example) and
+rebuilt lazily on the next access.
+
+Settings restricted to a set of values are validated here, once per
+snapshot: an unknown value is logged and replaced by the default rather than
+failing requests.
+"""
+
+import logging
+from types import MappingProxyType
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from nautobot_graphql_observability import NautobotAppGraphqlObservabilityConfig
+from nautobot_graphql_observability.log_queue import DROP_POLICIES
+from nautobot_graphql_observability.tracing import OTLP_PROTOCOLS, TRACING_EXPORTERS
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "nautobot_graphql_observability"
+
+_snapshot = None
+
+
+def _rate(value):
+    """Resolve a sampling rate setting to a float clamped to ``[0, 1]``."""
+    return min(max(float(value), 0.0), 1.0)
+
+
+def _choice(name, value, choices):
+    """Return ``value`` if it is one of ``choices``, otherwise log a warning and return the default of ``name``."""
+    if value in choices:
+        return value
+    default = NautobotAppGraphqlObservabilityConfig.default_settings[name]
+    logger.warning("Unknown %s %r, expected one of %s; using %r.", name, value, choices, default)
+    return default
+
+
+def _limit_overrides(overrides):
+    """Resolve per-user or per-group query limit overrides.
+
+    ``{"name": {"max_query_depth": 20, "max_query_cost": 0}}`` becomes a
+    read-only mapping of the overridden fields of
+    :class:`~nautobot_graphql_observability.limits.QueryLimits`, by name.
+    """
+    resolved = {}
+    for name, override in (overrides or {}).items():
+        fields = {}
+        if "max_query_depth" in override:
+            fields["max_depth"] = max(int(override["max_query_depth"]), 0)
+        if "max_query_cost" in override:
+            fields["max_cost"] = max(float(override["max_query_cost"]), 0.0)
+        resolved[name] = MappingProxyType(fields)
+    return MappingProxyType(resolved)
+
+
+class AppSettings:
+    """Frozen view of the app settings with defaults applied and values pre-resolved.
+
+    Args:
+        config (dict): The app's ``PLUGINS_CONFIG`` entry. Missing keys fall back
+            to :attr:`NautobotAppGraphqlObservabilityConfig.default_settings`.
+    """
+
+    __slots__ = (
+        "graphql_metrics_enabled",
+        "track_query_depth",
+        "track_query_complexity",
+        "track_field_resolution",
+        "track_per_user",
+        "track_db_queries",
+        "detect_n_plus_one",
+        "n_plus_one_threshold",
+        "track_query_cost",
+        "query_cost_default_list_size",
+        "query_cost_field_weights",
+        "track_query_fingerprint",
+        "track_overhead",
+        "track_request_phases",
+        "query_limits_mode",
+        "max_query_depth",
+        "max_query_cost",
+        "query_limit_user_overrides",
+        "query_limit_group_overrides",
+        "field_resolution_sample_rate",
+        "field_resolution_sample_rates",
+        "field_resolution_max_traced_per_second",
+        "analysis_cache_size",
+        "document_cache_size",
+        "max_operation_name_labels",
+        "operation_name_label_allowlist",
+        "max_user_labels",
+        "user_label_allowlist",
+        "max_fingerprint_labels",
+        "max_persisted_query_labels",
+        "max_n_plus_one_path_labels",
+        "label_idle_seconds",
+        "metrics_endpoint_cache_ttl",
+        "query_logging_enabled",
+        "log_query_body",
+        "log_query_variables",
+        "log_query_fingerprint",
+        "query_log_queue_enabled",
+        "query_log_queue_size",
+        "query_log_batch_size",
+        "query_log_queue_drop_policy",
+        "slow_operations_enabled",
+        "slow_operation_threshold_ms",
+        "slow_operation_buffer_size",
+        "slow_operation_buffer_path",
+        "slow_operation_query_length",
+        "tracing_enabled",
+        "tracing_exporter",
+        "tracing_otlp_endpoint",
+        "tracing_otlp_protocol",
+        "tracing_jsonl_path",
+        "tracing_service_name",
+        "tracing_sample_rate",
+        "tracing_max_queue_size",
+        "tracing_max_export_batch_size",
+        "response_cache_enabled",
+        "response_cache_ttl",
+        "response_cache_alias",
+        "persisted_queries_enabled",
+        "persisted_queries_ttl",
+        "persisted_queries_alias",
+    )
+
+    def __init__(self, config=None):
+        """Compile ``config`` merged over the app defaults."""
+        # limits imports this module.
+        from nautobot_graphql_observability.limits import QUERY_LIMITS_MODES  # pylint: disable=import-outside-toplevel
+
+        values = {**NautobotAppGraphqlObservabilityConfig.default_settings, **(config or {})}
+        assign = super().__setattr__
+        assign("graphql_metrics_enabled", bool(values["graphql_metrics_enabled"]))
+        assign("track_query_depth", bool(values["track_query_depth"]))
+        assign("track_query_complexity", bool(values["track_query_complexity"]))
+        assign("track_field_resolution", bool(values["track_field_resolution"]))
+        assign("track_per_user", bool(values["track_per_user"]))
+        assign("track_db_queries", bool(values["track_db_queries"]))
+        assign("detect_n_plus_one", bool(values["detect_n_plus_one"]))
+        assign("n_plus_one_threshold", max(int(values["n_plus_one_threshold"]), 1))
+        assign("track_query_cost", bool(values["track_query_cost"]))
+        assign("query_cost_default_list_size", max(int(values["query_cost_default_list_size"]), 0))
+        weights = values["query_cost_field_weights"] or {}
+        assign("query_cost_field_weights", MappingProxyType({name: float(weight) for name, weight in weights.items()}))
+        assign("track_query_fingerprint", bool(values["track_query_fingerprint"]))
+        assign("track_overhead", bool(values["track_overhead"]))
+        assign("track_request_phases", bool(values["track_request_phases"]))
+        limits_mode = str(values["query_limits_mode"]).lower()
+        assign("query_limits_mode", _choice("query_limits_mode", limits_mode, QUERY_LIMITS_MODES))
+        assign("max_query_depth", max(int(values["max_query_depth"]), 0))
+        assign("max_query_cost", max(float(values["max_query_cost"]), 0.0))
+        assign("query_limit_user_overrides", _limit_overrides(values["query_limit_user_overrides"]))
+        assign("query_limit_group_overrides", _limit_overrides(values["query_limit_group_overrides"]))
+        assign("field_resolution_sample_rate", _rate(values["field_resolution_sample_rate"]))
+        rates = values["field_resolution_sample_rates"] or {}
+        assign("field_resolution_sample_rates", MappingProxyType({name: _rate(rate) for name, rate in rates.items()}))
+        max_traced = max(float(values["field_resolution_max_traced_per_second"]), 0.0)
+        assign("field_resolution_max_traced_per_second", max_traced)
+        assign("analysis_cache_size", max(int(values["analysis_cache_size"]), 0))
+        assign("document_cache_size", max(int(values["document_cache_size"]), 0))
+        assign("max_operation_name_labels", max(int(values["max_operation_name_labels"]), 0))
+        assign("operation_name_label_allowlist", frozenset(values["operation_name_label_allowlist"] or ()))
+        assign("max_user_labels", max(int(values["max_user_labels"]), 0))
+        assign("user_label_allowlist", frozenset(values["user_label_allowlist"] or ()))
+        assign("max_fingerprint_labels", max(int(values["max_fingerprint_labels"]), 0))
+        assign("max_persisted_query_labels", max(int(values["max_persisted_query_labels"]), 0))
+        assign("max_n_plus_one_path_labels", max(int(values["max_n_plus_one_path_labels"]), 0))
+        assign("label_idle_seconds", max(float(values["label_idle_seconds"]), 0.0))
+        assign("metrics_endpoint_cache_ttl", max(float(values["metrics_endpoint_cache_ttl"]), 0.0))
+        assign("query_logging_enabled", bool(values["query_logging_enabled"]))
+        assign("log_query_body", bool(values["log_query_body"]))
+        assign("log_query_variables", bool(values["log_query_variables"]))
+        assign("log_query_fingerprint", bool(values["log_query_fingerprint"]))
+        assign("query_log_queue_enabled", bool(values["query_log_queue_enabled"]))
+        assign("query_log_queue_size", max(int(values["query_log_queue_size"]), 1))
+        assign("query_log_batch_size", max(int(values["query_log_batch_size"]), 1))
+        drop_policy = str(values["query_log_queue_drop_policy"])
+        assign("query_log_queue_drop_policy", _choice("query_log_queue_drop_policy", drop_policy, DROP_POLICIES))
+        assign("slow_operations_enabled", bool(values["slow_operations_enabled"]))
+        assign("slow_operation_threshold_ms", max(float(values["slow_operation_threshold_ms"]), 0.0))
+        assign("slow_operation_buffer_size", max(int(values["slow_operation_buffer_size"]), 1))
+        assign("slow_operation_buffer_path", str(values["slow_operation_buffer_path"] or ""))
+        assign("slow_operation_query_length", max(int(values["slow_operation_query_length"]), 0))
+        assign("tracing_enabled", bool(values["tracing_enabled"]))
+        exporter = str(values["tracing_exporter"]).lower()
+        assign("tracing_exporter", _choice("tracing_exporter", exporter, TRACING_EXPORTERS))
+        assign("tracing_otlp_endpoint", str(values["tracing_otlp_endpoint"] or ""))
+        protocol = str(values["tracing_otlp_protocol"]).lower()
+        assign("tracing_otlp_protocol", _choice("tracing_otlp_protocol", protocol, OTLP_PROTOCOLS))
+        assign("tracing_jsonl_path", str(values["tracing_jsonl_path"] or ""))
+        assign("tracing_service_name", str(values["tracing_service_name"]))
+        assign("tracing_sample_rate", _rate(values["tracing_sample_rate"]))
+        assign("tracing_max_queue_size", max(int(values["tracing_max_queue_size"]), 1))
+        assign("tracing_max_export_batch_size", max(int(values["tracing_max_export_batch_size"]), 1))
+        assign("response_cache_enabled", bool(values["response_cache_enabled"]))
+        assign("response_cache_ttl", max(float(values["response_cache_ttl"]), 0.0))
+        assign("response_cache_alias", str(values["response_cache_alias"]))
+        assign("persisted_queries_enabled", bool(values["persisted_queries_enabled"]))
+        assign("persisted_queries_ttl", max(float(values["persisted_queries_ttl"]), 0.0))
+        assign("persisted_queries_alias", str(values["persisted_queries_alias"]))
+
+    def __setattr__(self, name, value):
+        """Reject mutation: the snapshot is shared across threads and requests."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        """Reject mutation: the snapshot is shared across threads and requests."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        """Return a readable representation listing every setting."""
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+def get_app_settings():
+    """Return the compiled app settings, building them on first use.
+
+    Returns:
+        AppSettings: The shared settings snapshot.
+    """
+    global _snapshot  # noqa: PLW0603  # pylint: disable=global-statement
+    snapshot = _snapshot
+    if snapshot is None:
+        from django.conf import settings  # pylint: disable=import-outside-toplevel
+
+        snapshot = _snapshot = AppSettings(getattr(settings, "PLUGINS_CONFIG", {}).get(APP_NAME, {}))
+    return snapshot
+
+
+@receiver(setting_changed)
+def _reset_app_settings(setting, **kwargs):  # pylint: disable=unused-argument
+    """Drop the compiled snapshot when ``PLUGINS_CONFIG`` changes."""
+    global _snapshot  # noqa: PLW0603  # pylint: disable=global-statement
+    if setting == "PLUGINS_CONFIG":
+        _snapshot = None
@@ -0,0 +1,95 @@
+"""Bounded, thread-safe LRU cache used by the app's hot paths."""
+
+import threading
+from collections import OrderedDict
+
+from nautobot_graphql_observability.metrics import graphql_internal_cache_events_total
+
+
+class LRUCache:
+    """A bounded least-recently-used mapping with hit/miss/eviction accounting.
+
+    Every lookup and eviction is counted both on the instance (``hits``,
+    ``misses``, ``evictions``) and in the ``graphql_internal_cache_events_total``
+    Prometheus counter under the cache's ``name`` label. A ``maxsize`` of ``0``
+    disables storage entirely: every lookup is a miss and nothing is retained.
+
+    Args:
+        name (str): Name used as the ``cache`` label on the events counter.
+        maxsize (int): Maximum number of entries kept before evicting the oldest.
+    """
+
+    def __init__(self, name, maxsize):
+        """Initialize an empty cache."""
+        self.name = name
+        self.maxsize = max(int(maxsize), 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hit_counter = graphql_internal_cache_events_total.labels(cache=name, event="hit")
+        self._miss_counter = graphql_internal_cache_events_total.labels(cache=name, event="miss")
+        self._eviction_counter = graphql_internal_cache_events_total.labels(cache=name, event="eviction")
+
+    def __len__(self):
+        """Return the number of entries currently cached."""
+        return len(self._data)
+
+    def __contains__(self, key):
+        """Return whether ``key`` is cached, without touching its recency or the counters."""
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it as most recently used.
+
+        Args:
+            key: The cache key.
+            default: Value returned on a miss.
+
+        Returns:
+            object: The cached value, or ``default`` if ``key`` is not cached.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                self._miss_counter.inc()
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+        self._hit_counter.inc()
+        return value
+
+    def set(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entries if full."""
+        if not self.maxsize:
+            return
+        evicted = 0
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            self._eviction_counter.inc(evicted)
+
+    def resize(self, maxsize):
+        """Change the capacity of the cache, evicting entries if it shrinks."""
+        evicted = 0
+        with self._lock:
+            self.maxsize = max(int(maxsize), 0)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            self._eviction_counter.inc(evicted)
+
+    def clear(self):
+        """Drop every cached entry. Counters are left untouched."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,207 @@
+"""Cardinality guard for the ``operation_name``, ``user``, ``fingerprint``, ``persisted_query`` and ``path`` metric labels.
+
+Anonymous operations are labelled by their root fields, per-user metrics by
+username, per-shape metrics by query fingerprint, per-document metrics by
+persisted query hash and N+1 findings by field path, so scripted clients can
+create an unbounded number of series.
+Each guarded label gets a :class:`LabelLimiter` that admits at most
+``max_values`` distinct values. Admitted values are tracked in LRU order:
+once the limiter is full, the least recently used value is evicted (and its
+series removed from the guarded metrics) only if it has been idle for
+``label_idle_seconds``; otherwise the new value is folded into
+:data:`OVERFLOW_LABEL_VALUE` and counted in ``graphql_label_values_folded_total``.
+Allowlisted values are always admitted and do not count towards the limit.
+
+``prometheus_client`` cannot remove series in multiprocess mode, so there
+admitted values are never evicted and new values are folded once the limit
+is reached.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from nautobot_graphql_observability.metrics import (
+    graphql_db_duration_seconds,
+    graphql_db_queries,
+    graphql_db_rows,
+    graphql_errors_total,
+    graphql_label_values_folded_total,
+    graphql_n_plus_one_detected_total,
+    graphql_observability_overhead_ratio,
+    graphql_observability_overhead_seconds,
+    graphql_query_complexity,
+    graphql_query_cost,
+    graphql_query_depth,
+    graphql_request_duration_seconds,
+    graphql_request_phase_duration_seconds,
+    graphql_requests_by_fingerprint_total,
+    graphql_requests_by_persisted_query_total,
+    graphql_requests_by_user_total,
+    graphql_requests_total,
+)
+from nautobot_graphql_observability.multiprocess import is_multiprocess_enabled
+
+OVERFLOW_LABEL_VALUE = "__other__"
+
+# Metrics carrying each guarded label, whose series are removed on eviction.
+_OPERATION_NAME_METRICS = (
+    graphql_requests_total,
+    graphql_request_duration_seconds,
+    graphql_request_phase_duration_seconds,
+    graphql_errors_total,
+    graphql_query_depth,
+    graphql_query_complexity,
+    graphql_query_cost,
+    graphql_requests_by_user_total,
+    graphql_db_queries,
+    graphql_db_duration_seconds,
+    graphql_db_rows,
+    graphql_n_plus_one_detected_total,
+    graphql_requests_by_fingerprint_total,
+    graphql_observability_overhead_seconds,
+    graphql_observability_overhead_ratio,
+    graphql_requests_by_persisted_query_total,
+)
+_USER_METRICS = (graphql_requests_by_user_total,)
+_FINGERPRINT_METRICS = (graphql_requests_by_fingerprint_total,)
+_PERSISTED_QUERY_METRICS = (graphql_requests_by_persisted_query_total,)
+_N_PLUS_ONE_PATH_METRICS = (graphql_n_plus_one_detected_total,)
+
+_limiters = None
+
+
+class LabelLimiter:
+    """Bound the number of distinct values of one metric label.
+
+    Args:
+        label (str): Name of the guarded label.
+        max_values (int): Maximum number of admitted values, or ``0`` for no limit.
+        allowlist (Iterable[str]): Values always admitted, outside of the limit.
+        idle_seconds (float): Minimum idle time before an admitted value can be evicted.
+        metrics (Iterable[MetricWrapperBase]): Metrics whose series are removed when a value is evicted.
+    """
+
+    def __init__(self, label, max_values, allowlist=(), idle_seconds=3600.0, metrics=()):
+        """Initialize an empty limiter."""
+        self.label = label
+        self.max_values = max_values
+        self.allowlist = frozenset(allowlist)
+        self.idle_seconds = idle_seconds
+        self.metrics = tuple(metrics)
+        self._admitted = OrderedDict()
+        self._lock = threading.Lock()
+        self._folded_counter = graphql_label_values_folded_total.labels(label=label)
+
+    def __len__(self):
+        """Return the number of admitted values, allowlisted ones excluded."""
+        return len(self._admitted)
+
+    def admit(self, value):
+        """Return the label value to record for ``value``.
+
+        Returns:
+            str: ``value`` itself if it is (or can be) admitted, :data:`OVERFLOW_LABEL_VALUE` otherwise.
+        """
+        if not self.max_values or value in self.allowlist:
+            return value
+
+        evicted = None
+        now = time.monotonic()
+        with self._lock:
+            if value in self._admitted:
+                self._admitted[value] = now
+                self._admitted.move_to_end(value)
+                return value
+            if len(self._admitted) >= self.max_values:
+                oldest, last_seen = next(iter(self._admitted.items()))
+                if now - last_seen < self.idle_seconds:
+                    self._folded_counter.inc()
+                    return OVERFLOW_LABEL_VALUE
+                del self._admitted[oldest]
+                evicted = oldest
+            self._admitted[value] = now
+
+        if evicted is not None:
+            self._remove_series(evicted)
+        return value
+
+    def _remove_series(self, value):
+        """Remove every series of the guarded metrics carrying ``value`` for the label."""
+        for metric in self.metrics:
+            index = metric._labelnames.index(self.label)
+            for labelvalues in list(metric._metrics):
+                if labelvalues[index] == value:
+                    try:
+                        metric.remove(*labelvalues)
+                    except KeyError:
+                        pass
+
+
+class LabelLimiters(NamedTuple):
+    """The label limiters of the worker, one per guarded label."""
+
+    operation_name: LabelLimiter
+    user: LabelLimiter
+    fingerprint: LabelLimiter
+    persisted_query: LabelLimiter
+    path: LabelLimiter
+
+
+def get_label_limiters(config):
+    """Return the label limiters of the worker for the given app settings.
+
+    The limiters, and the values they admitted, are rebuilt only when the
+    settings snapshot changes. In multiprocess mode values are never evicted.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        LabelLimiters: The ``operation_name``, ``user``, ``fingerprint`` and ``persisted_query``
+        limiters, and the ``path`` limiter of N+1 findings.
+    """
+    global _limiters  # noqa: PLW0603  # pylint: disable=global-statement
+    limiters = _limiters
+    if limiters is None or limiters[0] is not config:
+        idle_seconds = math.inf if is_multiprocess_enabled() else config.label_idle_seconds
+        limiters = _limiters = (
+            config,
+            LabelLimiters(
+                operation_name=LabelLimiter(
+                    "operation_name",
+                    config.max_operation_name_labels,
+                    allowlist=config.operation_name_label_allowlist,
+                    idle_seconds=idle_seconds,
+                    metrics=_OPERATION_NAME_METRICS,
+                ),
+                user=LabelLimiter(
+                    "user",
+                    config.max_user_labels,
+                    allowlist=config.user_label_allowlist,
+                    idle_seconds=idle_seconds,
+                    metrics=_USER_METRICS,
+                ),
+                fingerprint=LabelLimiter(
+                    "fingerprint",
+                    config.max_fingerprint_labels,
+                    idle_seconds=idle_seconds,
+                    metrics=_FINGERPRINT_METRICS,
+                ),
+                persisted_query=LabelLimiter(
+                    "persisted_query",
+                    config.max_persisted_query_labels,
+                    idle_seconds=idle_seconds,
+                    metrics=_PERSISTED_QUERY_METRICS,
+                ),
+                path=LabelLimiter(
+                    "path",
+                    config.max_n_plus_one_path_labels,
+                    idle_seconds=idle_seconds,
+                    metrics=_N_PLUS_ONE_PATH_METRICS,
+                ),
+            ),
+        )
+    return limiters[1]
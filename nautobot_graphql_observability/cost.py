@@ -0,0 +1,243 @@
+"""Schema-aware cost estimation of GraphQL operations.
+
+``complexity`` counts every selected field as 1, whatever it returns. The cost
+estimate instead weighs each field by the number of objects it is expected to
+produce: a field costs its weight (``1`` unless overridden in
+``query_cost_field_weights`` as ``"TypeName.field_name"``) times the number of
+parent objects it is resolved for. A list field multiplies the cost of its
+sub-selection by its ``limit`` (or ``first``) argument when given, and by
+``query_cost_default_list_size`` otherwise. For example, with the default
+list size of 100::
+
+    { devices(limit: 10) { name interfaces { name } } }
+
+costs ``1 (devices) + 10 * (1 (name) + 1 (interfaces) + 100 * 1 (interfaces.name)) = 1021``.
+
+What a field returns and whether it is a list is looked up in a
+:class:`FieldWeightIndex`, built by walking the schema once per process (and
+again only if the weight overrides change). Estimates that do not depend on
+variables are cached per document in the index.
+"""
+
+from typing import NamedTuple
+
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLInterfaceType,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    VariableNode,
+    get_named_type,
+    value_from_ast_untyped,
+)
+
+from nautobot_graphql_observability.analysis import document_cache_key
+from nautobot_graphql_observability.cache import LRUCache
+
+# Arguments bounding the number of items returned by a list field.
+LIST_SIZE_ARGUMENTS = ("limit", "first")
+
+_index = None
+
+
+class FieldCost(NamedTuple):
+    """Cost properties of one schema field."""
+
+    weight: float
+    is_list: bool
+    size_arguments: tuple
+    type_name: str
+
+
+class FieldWeightIndex:
+    """Per-type, per-field :class:`FieldCost` lookup table built from a schema.
+
+    Args:
+        schema (GraphQLSchema): The executable schema.
+        field_weights (Mapping): Weight overrides keyed by ``"TypeName.field_name"``.
+        default_list_size (int): Estimated size of list fields queried without a size argument.
+        cache_size (int): Number of per-document estimates cached.
+    """
+
+    def __init__(self, schema, field_weights=None, default_list_size=100, cache_size=1000):
+        """Walk the schema and index the cost properties of every field."""
+        field_weights = field_weights or {}
+        self.default_list_size = default_list_size
+        self.types = {}
+        for type_name, graphql_type in schema.type_map.items():
+            if type_name.startswith("__") or not isinstance(graphql_type, (GraphQLObjectType, GraphQLInterfaceType)):
+                continue
+            self.types[type_name] = {
+                field_name: FieldCost(
+                    weight=field_weights.get(f"{type_name}.{field_name}", 1),
+                    is_list=_is_list(field.type),
+                    size_arguments=tuple(name for name in LIST_SIZE_ARGUMENTS if name in field.args),
+                    type_name=get_named_type(field.type).name,
+                )
+                for field_name, field in graphql_type.fields.items()
+            }
+        self.root_types = {
+            "query": schema.query_type.name if schema.query_type else None,
+            "mutation": schema.mutation_type.name if schema.mutation_type else None,
+            "subscription": schema.subscription_type.name if schema.subscription_type else None,
+        }
+        self._costs = LRUCache("query_cost", cache_size)
+
+    def estimate(self, operation, fragments, variables=None):
+        """Return the estimated cost of ``operation``.
+
+        Args:
+            operation (OperationDefinitionNode): The operation to estimate.
+            fragments (dict): Fragment definitions of the document, by name.
+            variables (dict): Variable values of the request.
+
+        Returns:
+            float: The estimated cost.
+        """
+        key = document_cache_key(operation)
+        if key is not None:
+            cost = self._costs.get(key)
+            if cost is not None:
+                return cost
+        cost, uses_variables = self._estimate(operation, fragments or {}, variables or {})
+        if key is not None and not uses_variables:
+            self._costs.set(key, cost)
+        return cost
+
+    def _estimate(self, operation, fragments, variables):  # noqa: C901  # pylint: disable=too-many-branches
+        """Walk the operation once, summing the cost of each selection set for a single parent object.
+
+        The cost of a selection set is linear in the number of objects it is
+        resolved for, so each one is costed once and scaled by its list size
+        when folded into its parent. Each fragment is costed once, keyed by
+        name (its type condition is part of its definition), and the cost is
+        reused for every later spread of it, so the walk stays linear in the
+        size of the document even when nested fragments are spread many times.
+        A spread of a fragment that is still being walked is a cycle and is
+        skipped.
+
+        Returns:
+            tuple[float, bool]: The cost and whether a list size came from a variable.
+        """
+        uses_variables = False
+        memo = {}
+        in_progress = set()
+        stack = [_CostFrame(operation.selection_set, self.root_types.get(operation.operation.value))]
+        while True:
+            frame = stack[-1]
+            if frame.index < len(frame.selections):
+                selection = frame.selections[frame.index]
+                frame.index += 1
+                if isinstance(selection, FieldNode):
+                    name = selection.name.value
+                    if name.startswith("__"):
+                        continue
+                    field = self.types.get(frame.type_name, {}).get(name)
+                    if field is None:
+                        frame.cost += 1
+                        if selection.selection_set is not None:
+                            stack.append(_CostFrame(selection.selection_set, None))
+                        continue
+                    frame.cost += field.weight
+                    if selection.selection_set is None:
+                        continue
+                    scale = 1
+                    if field.is_list:
+                        scale, from_variable = self._list_size(selection, field, variables)
+                        uses_variables = uses_variables or from_variable
+                    stack.append(_CostFrame(selection.selection_set, field.type_name, scale))
+                elif isinstance(selection, InlineFragmentNode):
+                    condition = selection.type_condition.name.value if selection.type_condition else frame.type_name
+                    stack.append(_CostFrame(selection.selection_set, condition))
+                elif isinstance(selection, FragmentSpreadNode):
+                    name = selection.name.value
+                    if name in memo:
+                        frame.cost += memo[name]
+                        continue
+                    fragment = fragments.get(name)
+                    if fragment is None or name in in_progress:
+                        continue
+                    in_progress.add(name)
+                    stack.append(_CostFrame(fragment.selection_set, fragment.type_condition.name.value, fragment=name))
+                continue
+
+            stack.pop()
+            if frame.fragment is not None:
+                memo[frame.fragment] = frame.cost
+                in_progress.discard(frame.fragment)
+            if not stack:
+                return frame.cost, uses_variables
+            stack[-1].cost += frame.cost * frame.scale
+
+    def _list_size(self, node, field, variables):
+        """Return the expected size of a list field and whether it came from a variable."""
+        for argument in node.arguments:
+            if argument.name.value not in field.size_arguments:
+                continue
+            value = value_from_ast_untyped(argument.value, variables)
+            if isinstance(value, int) and value >= 0:
+                return value, isinstance(argument.value, VariableNode)
+        return self.default_list_size, False
+
+
+class _CostFrame:  # pylint: disable=too-few-public-methods
+    """Traversal state of one selection set on the explicit stack of :meth:`FieldWeightIndex._estimate`."""
+
+    __slots__ = ("selections", "index", "type_name", "scale", "fragment", "cost")
+
+    def __init__(self, selection_set, type_name, scale=1, fragment=None):
+        self.selections = selection_set.selections
+        self.index = 0
+        self.type_name = type_name
+        self.scale = scale
+        self.fragment = fragment
+        self.cost = 0
+
+
+def _is_list(graphql_type):
+    """Return whether a field type is a list, ignoring non-null wrappers."""
+    if isinstance(graphql_type, GraphQLNonNull):
+        graphql_type = graphql_type.of_type
+    return isinstance(graphql_type, GraphQLList)
+
+
+def get_field_weight_index(schema, config):
+    """Return the worker-wide :class:`FieldWeightIndex` of ``schema`` for the given app settings.
+
+    The index is built on first use and rebuilt only when the schema or the
+    settings snapshot changes.
+
+    Args:
+        schema (GraphQLSchema): The executable schema.
+        config (AppSettings): The current app settings snapshot.
+    """
+    global _index  # noqa: PLW0603  # pylint: disable=global-statement
+    index = _index
+    if index is None or index[0] is not schema or index[1] is not config:
+        index = _index = (
+            schema,
+            config,
+            FieldWeightIndex(
+                schema,
+                field_weights=config.query_cost_field_weights,
+                default_list_size=config.query_cost_default_list_size,
+                cache_size=config.analysis_cache_size,
+            ),
+        )
+    return index[2]
+
+
+def estimate_query_cost(info, config):
+    """Return the estimated cost of the operation being executed.
+
+    Args:
+        info (GraphQLResolveInfo): GraphQL resolve info of any field of the operation.
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        float: The estimated cost.
+    """
+    return get_field_weight_index(info.schema, config).estimate(info.operation, info.fragments, info.variable_values)
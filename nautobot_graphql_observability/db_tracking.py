@@ -0,0 +1,54 @@
+"""Attribution of SQL statements, database time and rows to GraphQL operations.
+
+:class:`GraphQLObservabilityDjangoMiddleware
+<nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware>`
+installs a :class:`QueryStatsWrapper` as a Django ``execute_wrapper`` on every
+database connection for the duration of each GraphQL request. The wrapper sees
+every statement the ORM sends, whichever backend runs it, and counts:
+
+- the number of statements (``executemany`` counts as one),
+- the time spent in the database driver,
+- the rows reported by the DB-API cursor's ``rowcount`` after the statement.
+  PostgreSQL and MySQL report the number of rows returned by a ``SELECT``
+  and affected by a write; backends reporting ``-1`` (SQLite ``SELECT``,
+  server-side cursors) contribute no rows.
+"""
+
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+class QueryStatsWrapper:
+    """Django ``execute_wrapper`` accumulating statement count, DB time and rows."""
+
+    __slots__ = ("queries", "duration", "rows")
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.queries = 0
+        self.duration = 0.0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Run the statement and account for it."""
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start_time
+            self.queries += 1
+            rowcount = getattr(context.get("cursor"), "rowcount", -1)
+            if isinstance(rowcount, int) and rowcount > 0:
+                self.rows += rowcount
+
+
+@contextmanager
+def execute_wrappers(*wrappers):
+    """Install ``execute_wrapper`` callables on every database connection of the thread for the block."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            for wrapper in wrappers:
+                stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
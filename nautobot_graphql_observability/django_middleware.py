@@ -4,45 +4,135 @@ This middleware wraps HTTP requests to GraphQL endpoints, measuring the full
 request duration and then reading metadata stashed by the Graphene-level
 middlewares (:class:`~nautobot_graphql_observability.middleware.PrometheusMiddleware`
 and :class:`~nautobot_graphql_observability.logging_middleware.GraphQLQueryLoggingMiddleware`)
-to record Prometheus histograms and emit structured log lines.
+to record Prometheus histograms and emit structured log lines. With
+``track_db_queries``, the SQL statements run during the request are counted
+(see :mod:`~nautobot_graphql_observability.db_tracking`) and attributed to the
+operation; with ``detect_n_plus_one`` they are also checked for N+1 patterns
+(see :mod:`~nautobot_graphql_observability.n_plus_one`). With
+``tracing_enabled``, the request is recorded in an OpenTelemetry span (see
+:mod:`~nautobot_graphql_observability.tracing`), and with
+``slow_operations_enabled`` slow operations are kept in the buffer shared by
+the workers (see :mod:`~nautobot_graphql_observability.slow_operations`).
+With ``track_overhead``, the time spent in the app's own code is measured
+(see :mod:`~nautobot_graphql_observability.overhead`), and with
+``track_request_phases`` the duration of each phase of GraphQL API requests
+(see :mod:`~nautobot_graphql_observability.phases`).
 
 Registered automatically via :attr:`NautobotAppConfig.middleware`.
 """
 
 import time
+from contextlib import nullcontext
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cardinality import get_label_limiters
+from nautobot_graphql_observability.db_tracking import QueryStatsWrapper, execute_wrappers
+from nautobot_graphql_observability.n_plus_one import _REQUEST_ATTR as _N_PLUS_ONE_ATTR
+from nautobot_graphql_observability.n_plus_one import NPlusOneDetector
+from nautobot_graphql_observability.overhead import _REQUEST_ATTR as _OVERHEAD_ATTR
+from nautobot_graphql_observability.overhead import (
+    METRICS,
+    QUERY_LOGGING,
+    REQUEST,
+    SLOW_OPERATIONS,
+    TRACING,
+    OverheadTimer,
+    get_overhead_timer,
+)
+from nautobot_graphql_observability.phases import RequestPhases, current_phases
+from nautobot_graphql_observability.slow_operations import record_slow_operation
+from nautobot_graphql_observability.tracing import _REQUEST_ATTR as _TRACE_ATTR
+from nautobot_graphql_observability.tracing import trace_request
 
 # Paths that correspond to Nautobot's GraphQL endpoints.
 _GRAPHQL_PATHS = frozenset(("/api/graphql/", "/graphql/"))
 
 
-def _record_observability(request, duration):
+def _record_observability(request, duration, db_stats=None, response=None, phases=None):
     """Read stashed metadata from the request and record metrics / emit logs.
 
+    This is the end-of-operation hook: it runs once per GraphQL request, after
+    every root field has been resolved and the response has been built.
+    Requests that failed before execution have no stashed metadata: they are
+    recorded from the error kept on their ``phases``. The request metrics are
+    only recorded with ``graphql_metrics_enabled``: the stashed metadata also
+    feeds the request span and the slow operation buffer.
+
+    With ``track_overhead``, the time of each step is added to the request's
+    :class:`~nautobot_graphql_observability.overhead.OverheadTimer`, which is
+    then recorded against the operation.
+
     Args:
         request: The Django/DRF request object.
         duration: Wall-clock duration of the request in seconds.
+        db_stats (QueryStatsWrapper): SQL statements run during the request, if tracked.
+        response (HttpResponse): The response, recorded on the request span when traced.
+        phases (RequestPhases): The phases of the request, recorded with ``track_request_phases``.
     """
     from nautobot_graphql_observability.logging_middleware import (  # noqa: I001  # pylint: disable=import-outside-toplevel
         _REQUEST_ATTR as _LOGGING_ATTR,
         _emit_log,
+        _failed_operation_log_meta,
     )
     from nautobot_graphql_observability.metrics import (  # pylint: disable=import-outside-toplevel
         graphql_request_duration_seconds,
     )
-    from nautobot_graphql_observability.middleware import (  # pylint: disable=import-outside-toplevel
+    from nautobot_graphql_observability.middleware import (  # noqa: I001  # pylint: disable=import-outside-toplevel
         _REQUEST_ATTR as _PROM_ATTR,
+        _failed_operation_meta,
+        _record_operation_metrics,
     )
 
-    prom_meta = getattr(request, _PROM_ATTR, None)
-    if prom_meta is not None:
-        graphql_request_duration_seconds.labels(
-            operation_type=prom_meta["operation_type"],
-            operation_name=prom_meta["operation_name"],
-        ).observe(duration)
-
-    log_meta = getattr(request, _LOGGING_ATTR, None)
-    if log_meta is not None:
-        _emit_log(log_meta, duration * 1000)
+    config = get_app_settings()
+    overhead = get_overhead_timer(request)
+    with overhead.section(REQUEST):
+        detector = getattr(request, _N_PLUS_ONE_ATTR, None)
+        n_plus_one = detector.findings(config.n_plus_one_threshold) if detector is not None else None
+
+        prom_meta = getattr(request, _PROM_ATTR, None)
+        failed = prom_meta is None and phases is not None and phases.error is not None
+        if failed:
+            with overhead.section(METRICS):
+                prom_meta = _failed_operation_meta(phases, config)
+
+        operation_trace = getattr(request, _TRACE_ATTR, None)
+        if operation_trace is not None and response is not None:
+            with overhead.section(TRACING):
+                operation_trace.finish(prom_meta, response, db_stats, n_plus_one)
+
+        if prom_meta is not None:
+            prom_meta["db_stats"] = db_stats
+            prom_meta["n_plus_one"] = n_plus_one
+            if config.graphql_metrics_enabled:
+                with overhead.section(METRICS):
+                    _record_operation_metrics(prom_meta)
+                    if phases is not None and config.track_request_phases:
+                        phases.record(prom_meta["operation_name"])
+                graphql_request_duration_seconds.labels(
+                    operation_type=prom_meta["operation_type"],
+                    operation_name=prom_meta["operation_name"],
+                ).observe(duration)
+            if config.slow_operations_enabled:
+                with overhead.section(SLOW_OPERATIONS):
+                    record_slow_operation(request, prom_meta, duration, config)
+
+        log_meta = getattr(request, _LOGGING_ATTR, None)
+        if log_meta is None and failed and config.query_logging_enabled:
+            log_meta = _failed_operation_log_meta(request, prom_meta, phases)
+        if log_meta is not None:
+            log_meta["db_stats"] = db_stats
+            log_meta["n_plus_one"] = n_plus_one
+            with overhead.section(QUERY_LOGGING):
+                _emit_log(log_meta, duration * 1000)
+
+    if isinstance(overhead, OverheadTimer):
+        if prom_meta is not None:
+            operation_name = prom_meta["operation_name"]
+        elif log_meta is not None:
+            operation_name = get_label_limiters(config).operation_name.admit(log_meta["operation_name"])
+        else:
+            return
+        overhead.record(operation_name, duration)
 
 
 class GraphQLObservabilityDjangoMiddleware:  # pylint: disable=too-few-public-methods
@@ -52,10 +142,16 @@ class GraphQLObservabilityDjangoMiddleware:  # pylint: disable=too-few-public-me
 
     On GraphQL paths it:
 
-    1. Records wall-clock time around the downstream middleware / view chain.
+    1. Records wall-clock time around the downstream middleware / view chain,
+       and with ``track_db_queries`` / ``detect_n_plus_one`` the SQL
+       statements it runs. With ``tracing_enabled``, the chain runs inside
+       the request span.
     2. After the response is built, reads metadata stashed on the request by
-       the Graphene middlewares and records a Prometheus duration histogram
-       and emits a structured query log line.
+       the Graphene middlewares, records the request-level Prometheus metrics
+       (once per operation) and the duration histogram, and emits a
+       structured query log line. Requests of the GraphQL API that failed
+       before execution (see :mod:`~nautobot_graphql_observability.phases`)
+       are recorded and logged as failed operations.
     """
 
     def __init__(self, get_response):
@@ -67,10 +163,24 @@ class GraphQLObservabilityDjangoMiddleware:  # pylint: disable=too-few-public-me
         if request.path not in _GRAPHQL_PATHS:
             return self.get_response(request)
 
-        start_time = time.monotonic()
-        response = self.get_response(request)
-        duration = time.monotonic() - start_time
-
-        _record_observability(request, duration)
+        config = get_app_settings()
+        db_stats = QueryStatsWrapper() if config.track_db_queries else None
+        detector = None
+        if config.detect_n_plus_one:
+            detector = NPlusOneDetector()
+            setattr(request, _N_PLUS_ONE_ATTR, detector)
+        if config.track_overhead:
+            setattr(request, _OVERHEAD_ATTR, OverheadTimer())
+
+        with trace_request(request, config) if config.tracing_enabled else nullcontext():
+            with (
+                current_phases(RequestPhases()) as phases,
+                execute_wrappers(*(wrapper for wrapper in (db_stats, detector) if wrapper is not None)),
+            ):
+                start_time = time.monotonic()
+                response = self.get_response(request)
+                duration = time.monotonic() - start_time
+
+            _record_observability(request, duration, db_stats, response, phases)
 
         return response
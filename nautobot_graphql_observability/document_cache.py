@@ -0,0 +1,99 @@
+"""Per-process cache of parsed and validated GraphQL documents.
+
+Nautobot's GraphQL API (``GraphQLDRFAPIView``) parses and validates the
+document of every request before executing it, which for large documents
+costs more than resolving them. :func:`parse_document` and
+:func:`validate_document` stand in for ``graphql.parse`` and
+``graphql.validate`` in ``nautobot.core.api.views`` and keep their results in
+two bounded LRU caches of ``document_cache_size`` entries:
+
+- parsed ``DocumentNode``s, keyed by the document text;
+- validation errors, keyed by the schema, the document text, the validation
+  rules and the maximum number of errors.
+
+Documents are never mutated by execution, so a cached ``DocumentNode`` is
+shared by every request with the same text. Documents that fail to parse are
+not cached. Parse and validation times of cache misses are recorded in
+``graphql_document_parse_duration_seconds`` and
+``graphql_document_validation_duration_seconds``; hits and misses in
+``graphql_internal_cache_events_total`` under ``cache="graphql_document"``
+and ``cache="graphql_validation"``.
+"""
+
+import time
+
+from graphql import parse, validate
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cache import LRUCache
+from nautobot_graphql_observability.metrics import (
+    graphql_document_parse_duration_seconds,
+    graphql_document_validation_duration_seconds,
+)
+
+_caches = None
+
+
+def _get_caches():
+    """Return the process-wide ``(document, validation)`` caches, sized by ``document_cache_size``."""
+    global _caches  # noqa: PLW0603  # pylint: disable=global-statement
+    maxsize = get_app_settings().document_cache_size
+    if _caches is None:
+        _caches = (LRUCache("graphql_document", maxsize), LRUCache("graphql_validation", maxsize))
+    elif _caches[0].maxsize != maxsize:
+        for cache in _caches:
+            cache.resize(maxsize)
+    return _caches
+
+
+def parse_document(source):
+    """Return the parsed document of ``source``, from the cache when it was parsed before.
+
+    Args:
+        source (str): The GraphQL document.
+
+    Returns:
+        DocumentNode: The parsed document, shared with the other requests for the same text.
+
+    Raises:
+        GraphQLSyntaxError: If ``source`` is not a valid GraphQL document.
+    """
+    cache = _get_caches()[0]
+    document = cache.get(source) if isinstance(source, str) else None
+    if document is None:
+        start_time = time.monotonic()
+        try:
+            document = parse(source)
+        finally:
+            graphql_document_parse_duration_seconds.observe(time.monotonic() - start_time)
+        if isinstance(source, str):
+            cache.set(source, document)
+    return document
+
+
+def validate_document(schema, document_ast, rules=None, max_errors=None):
+    """Return the validation errors of a document, from the cache when it was validated before.
+
+    Args:
+        schema (GraphQLSchema): The schema to validate against.
+        document_ast (DocumentNode): The parsed document.
+        rules (Collection): Validation rules, ``graphql.specified_rules`` when None.
+        max_errors (int): Maximum number of errors reported before validation stops.
+
+    Returns:
+        list: The validation errors, empty if the document is valid.
+    """
+    loc = document_ast.loc
+    key = None
+    if loc is not None and isinstance(loc.source.body, str):
+        key = (schema, loc.source.body, tuple(rules) if rules is not None else None, max_errors)
+    cache = _get_caches()[1]
+    errors = cache.get(key) if key is not None else None
+    if errors is None:
+        start_time = time.monotonic()
+        errors = validate(schema, document_ast, rules, max_errors)
+        graphql_document_validation_duration_seconds.observe(time.monotonic() - start_time)
+        if key is not None:
+            cache.set(key, tuple(errors))
+        return errors
+    return list(errors)
@@ -0,0 +1,95 @@
+"""Cached rendering of the app's own metrics in the Prometheus exposition formats.
+
+Nautobot's ``/metrics/`` endpoint renders every collector of the process on
+each scrape. The app endpoint (:class:`~nautobot_graphql_observability.views.AppMetricsView`)
+renders only the metrics declared in :mod:`nautobot_graphql_observability.metrics`,
+and keeps each rendered variant (text or OpenMetrics, plain or gzip) for
+``metrics_endpoint_cache_ttl`` seconds, so several Prometheus replicas scraping
+the same worker share a single render. Renders are serialized: concurrent
+scrapes arriving on an expired entry wait for one render instead of each
+doing their own.
+"""
+
+import gzip
+import threading
+import time
+
+from prometheus_client import multiprocess as prometheus_multiprocess
+from prometheus_client.exposition import choose_encoder
+from prometheus_client.metrics import MetricWrapperBase
+
+from nautobot_graphql_observability import metrics
+from nautobot_graphql_observability.cache import LRUCache
+from nautobot_graphql_observability.metrics import graphql_metrics_render_duration_seconds
+from nautobot_graphql_observability.multiprocess import get_multiprocess_dir
+
+# One entry per (content type, gzip) variant.
+_rendered = LRUCache("metrics_exposition", 8)
+_render_lock = threading.Lock()
+
+
+class AppMetricsCollector:
+    """Collector yielding only the metric families declared by this app.
+
+    In multiprocess mode the families are read from the value files of every
+    worker and filtered by name; otherwise the in-process metrics are collected
+    directly.
+    """
+
+    def __init__(self):
+        """Discover the app's metrics from :mod:`nautobot_graphql_observability.metrics`."""
+        self.metrics = tuple(value for value in vars(metrics).values() if isinstance(value, MetricWrapperBase))
+        self.family_names = frozenset(family.name for metric in self.metrics for family in metric.describe())
+
+    def collect(self):
+        """Yield the app's metric families."""
+        path = get_multiprocess_dir()
+        if path is None:
+            for metric in self.metrics:
+                yield from metric.collect()
+            return
+        for family in prometheus_multiprocess.MultiProcessCollector(None, path=path).collect():
+            if family.name in self.family_names:
+                yield family
+
+
+_collector = AppMetricsCollector()
+
+
+def render_metrics(accept, accept_encoding, ttl):
+    """Return the app metrics rendered for the client's ``Accept`` and ``Accept-Encoding`` headers.
+
+    Args:
+        accept (str): The request ``Accept`` header; OpenMetrics is used when it asks for it.
+        accept_encoding (str): The request ``Accept-Encoding`` header; the body is gzipped when it allows it.
+        ttl (float): Seconds a rendered variant is reused, or ``0`` to render every time.
+
+    Returns:
+        tuple[bytes, str, str | None]: The body, its content type and its content encoding.
+    """
+    encoder, content_type = choose_encoder(accept or "")
+    encoding = "gzip" if "gzip" in (accept_encoding or "") else None
+    key = (content_type, encoding)
+
+    cached = _rendered.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1], content_type, encoding
+
+    with _render_lock:
+        # Another scrape may have rendered this variant while we waited.
+        cached = _rendered.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[0] > now:
+            return cached[1], content_type, encoding
+        with graphql_metrics_render_duration_seconds.time():
+            body = encoder(_collector)
+            if encoding:
+                body = gzip.compress(body)
+        if ttl > 0:
+            _rendered.set(key, (now + ttl, body))
+    return body, content_type, encoding
+
+
+def clear_rendered_metrics():
+    """Drop every cached render."""
+    _rendered.clear()
@@ -0,0 +1,87 @@
+"""Request-local accumulation of per-field resolver durations.
+
+Observing a Prometheus histogram takes a lock and a label lookup. Doing that
+for every resolved value of a large list query means thousands of locked
+observations per field. Instead, durations are accumulated in a
+:class:`FieldTimingBuffer` owned by the operation, and flushed into
+``graphql_field_resolution_duration_seconds`` once the operation completes, so
+lock acquisitions scale with the number of distinct fields rather than the
+number of resolved values.
+
+The buffer reads the bucket bounds of the histogram, and the flush adds to
+the bucket counters and sum of each histogram child: attributes private to
+``prometheus_client`` (whose versions are pinned in ``pyproject.toml``).
+Should a release drop the bounds, the buffer keeps the durations themselves
+and passes them to the child's ``observe()`` one by one instead.
+"""
+
+from array import array
+from bisect import bisect_left
+
+from nautobot_graphql_observability.metrics import graphql_field_resolution_duration_seconds
+
+
+class FieldTimingBuffer:
+    """Per-operation histogram accumulator keyed by ``(type_name, field_name)``.
+
+    Each entry is a flat ``array('d')`` holding the sum of the observed
+    durations followed by one (non-cumulative) count per bucket of the target
+    histogram. The observation count is the total of the bucket counts.
+    Without the bucket bounds of the histogram, entries hold the observed
+    durations instead.
+
+    Args:
+        histogram (Histogram): The labelled histogram the buffer is flushed into.
+    """
+
+    __slots__ = ("histogram", "_upper_bounds", "_zero", "_entries")
+
+    def __init__(self, histogram=graphql_field_resolution_duration_seconds):
+        """Initialize an empty buffer sharing the bucket bounds of ``histogram``."""
+        self.histogram = histogram
+        self._upper_bounds = getattr(histogram, "_upper_bounds", None)
+        self._zero = None
+        if self._upper_bounds is not None:
+            self._zero = array("d", bytes(8 * (len(self._upper_bounds) + 1)))
+        self._entries = {}
+
+    def __len__(self):
+        """Return the number of distinct fields buffered."""
+        return len(self._entries)
+
+    def observe(self, type_name, field_name, duration):
+        """Buffer one resolver duration, in seconds, for the given field."""
+        key = (type_name, field_name)
+        entry = self._entries.get(key)
+        if self._zero is None:
+            if entry is None:
+                entry = self._entries[key] = array("d")
+            entry.append(duration)
+            return
+        if entry is None:
+            entry = self._entries[key] = array("d", self._zero)
+        entry[0] += duration
+        # Buckets are "less than or equal" bounds ending with +Inf, so the
+        # leftmost bound >= duration is the bucket the observation belongs to.
+        entry[bisect_left(self._upper_bounds, duration) + 1] += 1
+
+    def flush(self):
+        """Add the buffered observations to the histogram and empty the buffer.
+
+        Takes one label lookup per distinct field and one value lock for the
+        sum and for each non-empty bucket, whatever the number of observations.
+        """
+        histogram = self.histogram
+        for (type_name, field_name), entry in self._entries.items():
+            child = histogram.labels(type_name=type_name, field_name=field_name)
+            if self._zero is None:
+                for duration in entry:
+                    child.observe(duration)
+                continue
+            child._sum.inc(entry[0])
+            buckets = child._buckets
+            for index in range(1, len(entry)):
+                count = entry[index]
+                if count:
+                    buckets[index - 1].inc(count)
+        self._entries.clear()
@@ -0,0 +1,196 @@
+"""Normalized fingerprints identifying the shape of GraphQL operations.
+
+Anonymous operations are labelled by their sorted root fields, so
+``{ devices(name: "a") { id } }`` and ``{ devices { id name status { name } } }``
+share the ``devices`` series. A fingerprint tells them apart by the shape of
+the operation: the operation is printed in a normal form, where
+
+- argument values (literals and variables) are replaced by ``?``,
+- arguments, including directive arguments, are sorted by name,
+- aliases, the operation name and the variable definitions are dropped,
+- fragment spreads are written as ``... on Type #digest``, where the digest
+  is that of the normalized fragment, whatever its name,
+- whitespace is collapsed to single spaces,
+
+and the normalized text is hashed into a 16 hex digit digest. The two
+operations above normalize to ``query { devices(name: ?) { id } }`` and
+``query { devices { id name status { name } } }``, hence two fingerprints,
+while ``query Named($n: String) { d: devices(name: $n) { id } }`` shares the
+first one.
+
+Each fragment is normalized once, however often it is spread, and the walk
+uses explicit stacks, so neither fragment fan-out nor deep documents can make
+normalization exponential or hit Python's recursion limit.
+
+Fingerprints are cached per document (source text and operation name) in a
+bounded LRU cache, so each distinct document is normalized once.
+"""
+
+import hashlib
+
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+from nautobot_graphql_observability.analysis import document_cache_key
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cache import LRUCache
+
+_fingerprint_cache = None
+
+
+def _get_fingerprint_cache():
+    """Return the process-wide fingerprint cache, sized like the analysis cache."""
+    global _fingerprint_cache  # noqa: PLW0603  # pylint: disable=global-statement
+    maxsize = get_app_settings().analysis_cache_size
+    if _fingerprint_cache is None:
+        _fingerprint_cache = LRUCache("query_fingerprint", maxsize)
+    elif _fingerprint_cache.maxsize != maxsize:
+        _fingerprint_cache.resize(maxsize)
+    return _fingerprint_cache
+
+
+def _arguments(arguments):
+    """Return the normalized argument list of a field or directive, values stripped."""
+    if not arguments:
+        return ""
+    return "(" + ", ".join(f"{name}: ?" for name in sorted(argument.name.value for argument in arguments)) + ")"
+
+
+def _directives(directives):
+    """Return the normalized directives of a node."""
+    return [f"@{directive.name.value}{_arguments(directive.arguments)}" for directive in directives or ()]
+
+
+def _digest(text):
+    """Return a 16 hex digit digest of ``text``."""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def _spread_names(selection_set):
+    """Return the names of the fragments spread anywhere in ``selection_set``, in document order."""
+    names = {}
+    stack = [selection_set]
+    while stack:
+        for selection in reversed(stack.pop().selections):
+            if isinstance(selection, FragmentSpreadNode):
+                names[selection.name.value] = None
+            elif selection.selection_set is not None:
+                stack.append(selection.selection_set)
+    return list(names)
+
+
+def _append_selection_set(parts, selection_set, fragments, digests):
+    """Append the normalized selection set to ``parts``.
+
+    Fragment spreads are written as ``... on Type #digest``, with the digest
+    of the normalized fragment from ``digests``. Spreads of fragments missing
+    from ``digests`` (unknown or part of a cycle) are dropped.
+    """
+    # Explicit stack of tokens and selection sets still to write, last first.
+    stack = [selection_set]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        items = ["{"]
+        for selection in item.selections:
+            if isinstance(selection, FieldNode):
+                items.append(selection.name.value + _arguments(selection.arguments))
+                items.extend(_directives(selection.directives))
+                if selection.selection_set is not None:
+                    items.append(selection.selection_set)
+            elif isinstance(selection, InlineFragmentNode):
+                items.append("...")
+                if selection.type_condition is not None:
+                    items.append(f"on {selection.type_condition.name.value}")
+                items.extend(_directives(selection.directives))
+                items.append(selection.selection_set)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                if name not in digests:
+                    continue
+                items.append("...")
+                items.append(f"on {fragments[name].type_condition.name.value}")
+                items.extend(_directives(selection.directives))
+                items.append(f"#{digests[name]}")
+        items.append("}")
+        stack.extend(reversed(items))
+
+
+def _fragment_digests(selection_set, fragments):
+    """Return the digest of the normalized text of every fragment reachable from ``selection_set``, by name.
+
+    Fragments are normalized once each, after the fragments they spread, so
+    the work stays linear in the size of the document however often they are
+    spread. A spread of a fragment still being normalized is a cycle: it is
+    left out of the normalized text.
+    """
+    digests = {}
+    in_progress = set()
+    stack = [(None, iter(_spread_names(selection_set)))]
+    while stack:
+        name, pending = stack[-1]
+        spread = next(pending, None)
+        if spread is None:
+            stack.pop()
+            if name is not None:
+                in_progress.discard(name)
+                fragment = fragments[name]
+                parts = [f"on {fragment.type_condition.name.value}"]
+                _append_selection_set(parts, fragment.selection_set, fragments, digests)
+                digests[name] = _digest(" ".join(parts))
+            continue
+        if spread in digests or spread in in_progress or spread not in fragments:
+            continue
+        in_progress.add(spread)
+        stack.append((spread, iter(_spread_names(fragments[spread].selection_set))))
+    return digests
+
+
+def normalize_operation(operation, fragments=None):
+    """Return the normalized text of an operation.
+
+    Args:
+        operation (OperationDefinitionNode): The operation to normalize.
+        fragments (dict): Fragment definitions of the document, by name.
+
+    Returns:
+        str: The operation in normal form, e.g. ``query { devices(name: ?) { id } }``.
+    """
+    fragments = fragments or {}
+    parts = [operation.operation.value, *_directives(operation.directives)]
+    digests = _fragment_digests(operation.selection_set, fragments)
+    _append_selection_set(parts, operation.selection_set, fragments, digests)
+    return " ".join(parts)
+
+
+def fingerprint_operation(operation, fragments=None):
+    """Return the fingerprint of an operation: a 16 hex digit digest of its normalized text.
+
+    Args:
+        operation (OperationDefinitionNode): The operation to fingerprint.
+        fragments (dict): Fragment definitions of the document, by name.
+    """
+    return _digest(normalize_operation(operation, fragments))
+
+
+def query_fingerprint(info):
+    """Return the fingerprint of the operation being executed.
+
+    Args:
+        info (GraphQLResolveInfo): GraphQL resolve info of any field of the operation.
+
+    Returns:
+        str: The cached or freshly computed fingerprint.
+    """
+    operation = info.operation
+    key = document_cache_key(operation)
+    if key is None:
+        return fingerprint_operation(operation, info.fragments)
+
+    cache = _get_fingerprint_cache()
+    fingerprint = cache.get(key)
+    if fingerprint is None:
+        fingerprint = fingerprint_operation(operation, info.fragments)
+        cache.set(key, fingerprint)
+    return fingerprint
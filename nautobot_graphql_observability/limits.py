@@ -0,0 +1,192 @@
+"""Graphene middleware enforcing depth and cost limits before an operation executes.
+
+Depth and cost are otherwise only observed once the operation has run. The
+:class:`QueryLimitMiddleware` checks them on the first root field, before any
+resolver runs, from the cached
+:class:`~nautobot_graphql_observability.analysis.OperationAnalysis` and the
+:mod:`~nautobot_graphql_observability.cost` estimate. ``query_limits_mode``
+selects what happens to an operation over a limit:
+
+- ``"off"``: limits are not checked (default).
+- ``"log"``: the operation runs, but a warning is logged and the
+  ``graphql_query_limit_exceeded_total`` counter incremented (dry run, to
+  tune thresholds).
+- ``"enforce"``: every root field of the operation fails with a GraphQL error
+  and no resolver runs.
+
+Limits are global (``max_query_depth``, ``max_query_cost``) and can be
+overridden per user (``query_limit_user_overrides``) or per group
+(``query_limit_group_overrides``). A user override wins over group overrides;
+when several groups of the user have an override, the most permissive one
+applies. A limit of ``0`` means no limit.
+"""
+
+import logging
+from typing import NamedTuple
+
+from graphql import GraphQLError, GraphQLResolveInfo
+
+from nautobot_graphql_observability.analysis import analyze_operation
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cost import get_field_weight_index
+from nautobot_graphql_observability.metrics import graphql_query_limit_exceeded_total
+from nautobot_graphql_observability.utils import get_request_username, stash_meta_on_request
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_LOG = "log"
+MODE_ENFORCE = "enforce"
+QUERY_LIMITS_MODES = (MODE_OFF, MODE_LOG, MODE_ENFORCE)
+
+# Key used to stash the limit decision of the operation on the request: the
+# GraphQLError to raise for every root field, or False if the operation may run.
+_REQUEST_ATTR = "_graphql_query_limit_error"
+
+
+class QueryLimits(NamedTuple):
+    """Depth and cost limits applying to one operation; ``0`` means no limit."""
+
+    max_depth: int
+    max_cost: float
+
+
+def _most_permissive(first, second):
+    """Combine two limits keeping the most permissive one, ``0`` (no limit) included."""
+    if not first or not second:
+        return 0
+    return max(first, second)
+
+
+def get_query_limits(request, config):
+    """Return the limits applying to the user of ``request``.
+
+    Group memberships are only looked up when group overrides are configured.
+
+    Args:
+        request: The request object (DRF Request or WSGIRequest).
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        QueryLimits: The effective limits.
+    """
+    limits = QueryLimits(config.max_query_depth, config.max_query_cost)
+    override = config.query_limit_user_overrides.get(get_request_username(request))
+    if override is not None:
+        return limits._replace(**override)
+
+    user = getattr(request, "user", None)
+    if config.query_limit_group_overrides and getattr(user, "is_authenticated", False):
+        group_limits = None
+        for group in user.groups.values_list("name", flat=True):
+            override = config.query_limit_group_overrides.get(group)
+            if override is None:
+                continue
+            candidate = limits._replace(**override)
+            if group_limits is None:
+                group_limits = candidate
+            else:
+                group_limits = QueryLimits(
+                    _most_permissive(group_limits.max_depth, candidate.max_depth),
+                    _most_permissive(group_limits.max_cost, candidate.max_cost),
+                )
+        if group_limits is not None:
+            return group_limits
+    return limits
+
+
+def check_query_limits(info, config):
+    """Check the operation being executed against the limits of the requesting user.
+
+    Args:
+        info (GraphQLResolveInfo): GraphQL resolve info of a root field of the operation.
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        GraphQLError | None: The error rejecting the operation, or None if it may run.
+    """
+    limits = get_query_limits(info.context, config)
+    if not limits.max_depth and not limits.max_cost:
+        return None
+
+    analysis = analyze_operation(info)
+    exceeded = []
+    if limits.max_depth and analysis.depth > limits.max_depth:
+        exceeded.append(("depth", analysis.depth, limits.max_depth))
+    if limits.max_cost:
+        index = get_field_weight_index(info.schema, config)
+        cost = index.estimate(info.operation, info.fragments, info.variable_values)
+        if cost > limits.max_cost:
+            exceeded.append(("cost", cost, limits.max_cost))
+    if not exceeded:
+        return None
+
+    action = "rejected" if config.query_limits_mode == MODE_ENFORCE else "logged"
+    for limit, _, _ in exceeded:
+        graphql_query_limit_exceeded_total.labels(limit=limit, action=action).inc()
+    message = "; ".join(
+        f"query {limit} {value:g} exceeds the limit of {maximum:g}" for limit, value, maximum in exceeded
+    )
+    logger.warning(
+        "GraphQL operation %s by %s %s: %s",
+        analysis.operation_name,
+        get_request_username(info.context),
+        action,
+        message,
+    )
+    if action == "logged":
+        return None
+    return GraphQLError(message[0].upper() + message[1:] + ".")
+
+
+class QueryLimitMiddleware:  # pylint: disable=too-few-public-methods
+    """Graphene middleware rejecting operations over their depth or cost limit.
+
+    The decision is taken once, on the first root field, and applied to every
+    root field of the operation. List it *before*
+    :class:`~nautobot_graphql_observability.middleware.PrometheusMiddleware`
+    (Graphene runs the last middleware outermost) so rejected operations are
+    still counted in the request metrics.
+
+    Usage in Django settings::
+
+        GRAPHENE = {
+            "MIDDLEWARE": [
+                "nautobot_graphql_observability.limits.QueryLimitMiddleware",
+                "nautobot_graphql_observability.middleware.PrometheusMiddleware",
+            ]
+        }
+    """
+
+    @staticmethod
+    def is_enabled(config):
+        """Return whether the middleware belongs in the GraphQL API's chain under ``config``."""
+        return config.query_limits_mode != MODE_OFF
+
+    def resolve(self, next: callable, root: object, info: GraphQLResolveInfo, **kwargs: object) -> object:  # pylint: disable=redefined-builtin
+        """Reject root fields of over-limit operations before they resolve.
+
+        Args:
+            next (callable): Callable to continue the resolution chain.
+            root (object): Parent resolved value. None for top-level fields.
+            info (GraphQLResolveInfo): GraphQL resolve info containing operation metadata.
+            **kwargs (object): Field arguments.
+
+        Returns:
+            object: The result of the resolver.
+        """
+        if root is not None:
+            return next(root, info, **kwargs)
+
+        config = get_app_settings()
+        if config.query_limits_mode == MODE_OFF:
+            return next(root, info, **kwargs)
+
+        request = info.context
+        error = getattr(request, _REQUEST_ATTR, None)
+        if error is None:
+            error = check_query_limits(info, config) or False
+            stash_meta_on_request(request, _REQUEST_ATTR, error)
+        if error:
+            raise error
+        return next(root, info, **kwargs)
@@ -0,0 +1,184 @@
+"""Non-blocking, queued emission of query log records.
+
+With slow handlers (syslog, network sockets, NFS-backed files, heavy JSON
+formatting) writing the query log synchronously makes every GraphQL response
+wait on I/O. When ``query_log_queue_enabled`` is set, :func:`_emit_log
+<nautobot_graphql_observability.logging_middleware._emit_log>` builds the
+``LogRecord`` on the request thread (so its timestamp and thread information
+are accurate) and hands it to a :class:`QueryLogQueue`: a bounded in-memory
+queue drained by a background thread that passes records to the logger's
+handlers in batches.
+
+When the queue is full, the ``query_log_queue_drop_policy`` decides which
+record is lost: ``"drop_newest"`` discards the incoming record,
+``"drop_oldest"`` discards the oldest queued one. Dropped records are counted
+in ``graphql_query_log_dropped_total`` and the queue length is exported as
+the ``graphql_query_log_queue_depth`` gauge.
+"""
+
+import atexit
+import os
+import threading
+from collections import deque
+
+from nautobot_graphql_observability.metrics import (
+    graphql_query_log_dropped_total,
+    graphql_query_log_queue_depth,
+)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+DROP_POLICIES = (DROP_NEWEST, DROP_OLDEST)
+
+_queue = None
+_queue_config = None
+_queue_lock = threading.Lock()
+
+
+class QueryLogQueue:
+    """Bounded queue of log records drained in batches by a daemon thread.
+
+    The worker thread is started lazily on the first submitted record and
+    restarted after a fork, so the queue is safe to create before a
+    pre-forking server spawns its workers.
+
+    Args:
+        maxsize (int): Maximum number of queued records.
+        batch_size (int): Maximum number of records handled per wake-up of the worker thread.
+        drop_policy (str): One of :data:`DROP_POLICIES`.
+    """
+
+    def __init__(self, maxsize=10000, batch_size=100, drop_policy=DROP_NEWEST):
+        """Initialize an empty queue; the worker thread is not started yet."""
+        self._records = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._busy = False
+        self._stopping = False
+        self.configure(maxsize, batch_size, drop_policy)
+
+    def __len__(self):
+        """Return the number of queued records."""
+        return len(self._records)
+
+    def configure(self, maxsize, batch_size, drop_policy):
+        """Apply new limits to the queue. Already queued records are kept."""
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown query log drop policy {drop_policy!r}, expected one of {DROP_POLICIES}")
+        self.maxsize = max(int(maxsize), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.drop_policy = drop_policy
+        self._dropped_counter = graphql_query_log_dropped_total.labels(policy=drop_policy)
+
+    def submit(self, logger, record):
+        """Queue ``record`` for ``logger``'s handlers without blocking on I/O.
+
+        Returns:
+            bool: False if a record had to be dropped because the queue was full.
+        """
+        self._ensure_worker()
+        with self._condition:
+            full = len(self._records) >= self.maxsize
+            if not full or self.drop_policy == DROP_OLDEST:
+                if full:
+                    self._records.popleft()
+                self._records.append((logger, record))
+                self._condition.notify()
+            depth = len(self._records)
+        if full:
+            self._dropped_counter.inc()
+        graphql_query_log_queue_depth.set(depth)
+        return not full
+
+    def flush(self, timeout=None):
+        """Block until every queued record has been handled, or ``timeout`` seconds elapsed.
+
+        Returns:
+            bool: True if the queue was fully drained.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._records and not self._busy, timeout)
+
+    def stop(self, timeout=5.0):
+        """Drain the queue and stop the worker thread."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running yet."""
+        if self._thread is not None:
+            return
+        with self._condition:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="graphql-query-log", daemon=True)
+                self._thread.start()
+
+    def _after_fork(self):
+        """Reset the queue in a forked child.
+
+        The parent's worker thread does not exist in the child, its lock may
+        have been held at fork time, and its queued records belong to the parent.
+        """
+        self._records = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._busy = False
+        self._stopping = False
+
+    def _run(self):
+        """Worker loop: take batches of records off the queue and hand them to their handlers."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._records or self._stopping)
+                if not self._records and self._stopping:
+                    return
+                batch = [self._records.popleft() for _ in range(min(self.batch_size, len(self._records)))]
+                depth = len(self._records)
+                self._busy = True
+            graphql_query_log_queue_depth.set(depth)
+            for logger, record in batch:
+                try:
+                    logger.handle(record)
+                except Exception:  # noqa: S110  # pylint: disable=broad-except
+                    # Handlers report their own errors through handleError();
+                    # never let a faulty one kill the worker thread.
+                    pass
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+
+def get_log_queue(config):
+    """Return the process-wide :class:`QueryLogQueue`, creating it on first use.
+
+    The queue limits follow the settings snapshot: they are re-applied when
+    the snapshot changes.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    global _queue, _queue_config  # noqa: PLW0603  # pylint: disable=global-statement
+    if _queue_config is not config:
+        with _queue_lock:
+            limits = (config.query_log_queue_size, config.query_log_batch_size, config.query_log_queue_drop_policy)
+            if _queue is None:
+                _queue = QueryLogQueue(*limits)
+                atexit.register(_queue.stop)
+            else:
+                _queue.configure(*limits)
+            _queue_config = config
+    return _queue
+
+
+def _reset_queue_after_fork():
+    """Reset the process-wide queue in a forked worker process."""
+    if _queue is not None:
+        _queue._after_fork()
+
+
+os.register_at_fork(after_in_child=_reset_queue_after_fork)
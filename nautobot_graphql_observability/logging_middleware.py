@@ -5,8 +5,15 @@ import logging
 
 from graphql import GraphQLResolveInfo
 
-from nautobot_graphql_observability.middleware import PrometheusMiddleware, _get_app_settings
-from nautobot_graphql_observability.utils import stash_meta_on_request
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.fingerprint import query_fingerprint
+from nautobot_graphql_observability.log_queue import get_log_queue
+from nautobot_graphql_observability.middleware import PrometheusMiddleware
+from nautobot_graphql_observability.n_plus_one import MAX_LOGGED_FINDINGS
+from nautobot_graphql_observability.overhead import _REQUEST_ATTR as _OVERHEAD_ATTR
+from nautobot_graphql_observability.overhead import QUERY_LOGGING
+from nautobot_graphql_observability.persisted_queries import _REQUEST_ATTR as _PERSISTED_QUERY_ATTR
+from nautobot_graphql_observability.utils import get_request_username, stash_meta_on_request
 
 LOGGER_NAME = "nautobot_graphql_observability.graphql_query_log"
 _LOGGER_CONFIGURED = False
@@ -49,8 +56,12 @@ class GraphQLQueryLoggingMiddleware:  # pylint: disable=too-few-public-methods
     Controlled by app settings:
 
     - ``query_logging_enabled``: Master switch (default: False).
-    - ``log_query_body``: Include the full query text (default: False).
+    - ``log_query_body``: Include the full query text (default: False). For
+      persisted queries, the hash of the document is logged instead (see
+      :mod:`~nautobot_graphql_observability.persisted_queries`).
     - ``log_query_variables``: Include query variables (default: False).
+    - ``log_query_fingerprint``: Include the normalized query fingerprint
+      (default: False).
 
     Usage in Django settings::
 
@@ -62,9 +73,18 @@ class GraphQLQueryLoggingMiddleware:  # pylint: disable=too-few-public-methods
         }
     """
 
+    @staticmethod
+    def is_enabled(config):
+        """Return whether the middleware belongs in the GraphQL API's chain under ``config``."""
+        return config.query_logging_enabled
+
     def resolve(self, next: callable, root: object, info: GraphQLResolveInfo, **kwargs: object) -> object:  # pylint: disable=redefined-builtin
         """Intercept root-level resolutions and stash metadata on the request.
 
+        With ``track_overhead``, the time spent here on root fields outside of
+        ``next()`` is added to the request's
+        :class:`~nautobot_graphql_observability.overhead.OverheadTimer`.
+
         Args:
             next (callable): Callable to continue the resolution chain.
             root (object): Parent resolved value. None for top-level fields.
@@ -77,10 +97,19 @@ class GraphQLQueryLoggingMiddleware:  # pylint: disable=too-few-public-methods
         if root is not None:
             return next(root, info, **kwargs)
 
-        config = _get_app_settings()
-        if not config.get("query_logging_enabled", False):
+        config = get_app_settings()
+        if not config.query_logging_enabled:
             return next(root, info, **kwargs)
 
+        if config.track_overhead:
+            overhead = getattr(info.context, _OVERHEAD_ATTR, None)
+            if overhead is not None:
+                return overhead.measure(QUERY_LOGGING, self._resolve_root, next, root, info, **kwargs)
+        return self._resolve_root(next, root, info, **kwargs)
+
+    def _resolve_root(self, next, root, info, **kwargs):  # pylint: disable=redefined-builtin
+        """Stash the query log metadata on the request and resolve a root field, see :meth:`resolve`."""
+        config = get_app_settings()
         # Stash metadata on the request (only for the first root field).
         # For DRF views, info.context is a DRF Request wrapping a WSGIRequest.
         # The Django middleware sees the WSGIRequest, so stash on both.
@@ -93,12 +122,21 @@ class GraphQLQueryLoggingMiddleware:  # pylint: disable=too-few-public-methods
                 "config": config,
             }
 
-            if config.get("log_query_body", False):
+            persisted_query = (
+                getattr(request, _PERSISTED_QUERY_ATTR, None) if config.persisted_queries_enabled else None
+            )
+            if persisted_query is not None:
+                # The client identified the document by its hash: log the hash, not the body.
+                meta["persisted_query"] = persisted_query
+            elif config.log_query_body:
                 meta["query_body"] = _extract_query_body(info)
 
-            if config.get("log_query_variables", False):
+            if config.log_query_variables:
                 meta["variables"] = _extract_variables(info)
 
+            if config.log_query_fingerprint:
+                meta["fingerprint"] = query_fingerprint(info)
+
             stash_meta_on_request(request, _REQUEST_ATTR, meta)
 
         try:
@@ -114,15 +152,20 @@ class GraphQLQueryLoggingMiddleware:  # pylint: disable=too-few-public-methods
     @staticmethod
     def _get_user(info):
         """Extract the username from the request context."""
-        request = info.context
-        if hasattr(request, "user") and hasattr(request.user, "is_authenticated"):
-            if request.user.is_authenticated:
-                return request.user.username
-        return "anonymous"
+        return get_request_username(info.context)
 
 
 def _emit_log(meta, duration_ms):
-    """Emit a structured log record for the GraphQL query."""
+    """Emit a structured log record for the GraphQL query.
+
+    When the Django middleware tracked the SQL statements of the request, the
+    record includes ``db_queries``, ``db_time_ms`` and ``db_rows``, and the
+    worst N+1 findings, if any, under ``n_plus_one``.
+
+    With ``query_log_queue_enabled``, the record is handed to the
+    :class:`~nautobot_graphql_observability.log_queue.QueryLogQueue` instead of
+    being written synchronously on the request thread.
+    """
     error = meta.get("error")
     status = "error" if error else "success"
 
@@ -139,14 +182,59 @@ def _emit_log(meta, duration_ms):
         extra["query"] = meta["query_body"]
     if meta.get("variables"):
         extra["variables"] = meta["variables"]
+    if meta.get("fingerprint"):
+        extra["fingerprint"] = meta["fingerprint"]
+    if meta.get("persisted_query"):
+        extra["persisted_query"] = meta["persisted_query"]
+    db_stats = meta.get("db_stats")
+    if db_stats is not None:
+        extra["db_queries"] = db_stats.queries
+        extra["db_time_ms"] = round(db_stats.duration * 1000, 1)
+        extra["db_rows"] = db_stats.rows
+    n_plus_one = meta.get("n_plus_one")
+    if n_plus_one:
+        extra["n_plus_one"] = [finding._asdict() for finding in n_plus_one[:MAX_LOGGED_FINDINGS]]
 
     log = _get_logger()
-    if error:
+    config = meta.get("config") or get_app_settings()
+    if config.query_log_queue_enabled:
+        # Build the record here so its timestamp and thread are the request's,
+        # and leave the handler I/O to the queue's background thread.
+        level = logging.WARNING if error else logging.INFO
+        if log.isEnabledFor(level):
+            record = log.makeRecord(log.name, level, "(unknown file)", 0, "graphql_query", (), None, extra=extra)
+            get_log_queue(config).submit(log, record)
+    elif error:
         log.warning("graphql_query", extra=extra)
     else:
         log.info("graphql_query", extra=extra)
 
 
+def _failed_operation_log_meta(request, meta, phases):
+    """Build the log metadata of an operation that failed before execution.
+
+    Args:
+        request: The Django request.
+        meta (dict): The metadata built by :func:`~nautobot_graphql_observability.middleware._failed_operation_meta`.
+        phases (RequestPhases): The phases of the request, with its error.
+
+    Returns:
+        dict: Metadata shaped like the one stashed by :class:`GraphQLQueryLoggingMiddleware`.
+    """
+    config = meta["config"]
+    analysis = meta["analysis"]
+    log_meta = {
+        "operation_type": meta["operation_type"],
+        "operation_name": analysis.operation_name if analysis is not None else meta["operation_name"],
+        "user": get_request_username(request),
+        "config": config,
+        "error": phases.error,
+    }
+    if config.log_query_body and phases.query:
+        log_meta["query_body"] = phases.query.replace("\n", " ").strip()
+    return log_meta
+
+
 def _extract_query_body(info):
     """Extract the GraphQL query text from the parsed AST.
 
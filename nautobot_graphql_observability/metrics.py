@@ -1,6 +1,11 @@
-"""Prometheus metric definitions for GraphQL instrumentation."""
+"""Prometheus metric definitions for GraphQL instrumentation.
 
-from prometheus_client import Counter, Histogram
+Gauges set ``multiprocess_mode`` so their per-worker values are merged
+correctly when ``PROMETHEUS_MULTIPROC_DIR`` is set (see
+:mod:`nautobot_graphql_observability.multiprocess`).
+"""
+
+from prometheus_client import Counter, Gauge, Histogram
 
 # --- Basic metrics (Phase 1) ---
 
@@ -17,6 +22,13 @@ graphql_request_duration_seconds = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0],
 )
 
+graphql_request_phase_duration_seconds = Histogram(
+    "graphql_request_phase_duration_seconds",
+    "Duration of each phase of GraphQL API requests in seconds",
+    ["operation_name", "phase"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
 graphql_errors_total = Counter(
     "graphql_errors_total",
     "Total number of GraphQL errors",
@@ -39,6 +51,19 @@ graphql_query_complexity = Histogram(
     buckets=[1, 5, 10, 20, 50, 100, 200, 500, 1000, 2000],
 )
 
+graphql_query_cost = Histogram(
+    "graphql_query_cost",
+    "Estimated cost of GraphQL queries, weighting fields by their expected number of objects",
+    ["operation_name"],
+    buckets=[1, 10, 100, 1000, 10000, 100000, 1000000, 10000000],
+)
+
+graphql_query_limit_exceeded_total = Counter(
+    "graphql_query_limit_exceeded_total",
+    "Number of GraphQL operations over their depth or cost limit",
+    ["limit", "action"],
+)
+
 graphql_field_resolution_duration_seconds = Histogram(
     "graphql_field_resolution_duration_seconds",
     "Duration of individual GraphQL field resolution in seconds",
@@ -46,6 +71,35 @@ graphql_field_resolution_duration_seconds = Histogram(
     buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0],
 )
 
+# --- Database metrics ---
+
+graphql_db_queries = Histogram(
+    "graphql_db_queries",
+    "Number of SQL statements run per GraphQL operation",
+    ["operation_name"],
+    buckets=[0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000],
+)
+
+graphql_db_duration_seconds = Histogram(
+    "graphql_db_duration_seconds",
+    "Time spent in the database per GraphQL operation in seconds",
+    ["operation_name"],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+graphql_db_rows = Histogram(
+    "graphql_db_rows",
+    "Number of rows fetched or affected per GraphQL operation",
+    ["operation_name"],
+    buckets=[0, 1, 10, 100, 1000, 10000, 100000, 1000000],
+)
+
+graphql_n_plus_one_detected_total = Counter(
+    "graphql_n_plus_one_detected_total",
+    "Number of operations in which a field path ran the same SQL statement template repeatedly",
+    ["operation_name", "path"],
+)
+
 # --- Per-user metrics (Phase 3) ---
 
 graphql_requests_by_user_total = Counter(
@@ -53,3 +107,105 @@ graphql_requests_by_user_total = Counter(
     "Total number of GraphQL requests per user",
     ["user", "operation_type", "operation_name"],
 )
+
+# --- Query fingerprint metrics ---
+
+graphql_requests_by_fingerprint_total = Counter(
+    "graphql_requests_by_fingerprint_total",
+    "Total number of GraphQL requests per normalized query fingerprint",
+    ["operation_type", "operation_name", "fingerprint"],
+)
+
+# --- Document parsing and validation ---
+
+graphql_document_parse_duration_seconds = Histogram(
+    "graphql_document_parse_duration_seconds",
+    "Time spent parsing GraphQL API documents (document cache misses only)",
+    buckets=[0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],
+)
+
+graphql_document_validation_duration_seconds = Histogram(
+    "graphql_document_validation_duration_seconds",
+    "Time spent validating GraphQL API documents (validation cache misses only)",
+    buckets=[0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25],
+)
+
+# --- Persisted queries ---
+
+graphql_persisted_queries_total = Counter(
+    "graphql_persisted_queries_total",
+    "Number of GraphQL API requests using automatic persisted queries, by lookup result",
+    ["result"],
+)
+
+graphql_requests_by_persisted_query_total = Counter(
+    "graphql_requests_by_persisted_query_total",
+    "Total number of GraphQL requests per persisted query hash",
+    ["operation_type", "operation_name", "persisted_query"],
+)
+
+# --- Response cache ---
+
+graphql_response_cache_requests_total = Counter(
+    "graphql_response_cache_requests_total",
+    "Number of GraphQL API requests by response cache result",
+    ["result"],
+)
+
+graphql_response_cache_saved_seconds_total = Counter(
+    "graphql_response_cache_saved_seconds_total",
+    "Execution time saved by serving GraphQL responses from the response cache",
+)
+
+graphql_response_cache_invalidations_total = Counter(
+    "graphql_response_cache_invalidations_total",
+    "Number of response cache invalidations caused by object changes",
+)
+
+# --- Query log queue ---
+
+graphql_query_log_queue_depth = Gauge(
+    "graphql_query_log_queue_depth",
+    "Number of query log records waiting in the queue",
+    multiprocess_mode="livesum",
+)
+
+graphql_query_log_dropped_total = Counter(
+    "graphql_query_log_dropped_total",
+    "Number of query log records dropped because the queue was full",
+    ["policy"],
+)
+
+# --- App internals ---
+
+graphql_label_values_folded_total = Counter(
+    "graphql_label_values_folded_total",
+    "Number of label values folded into __other__ by the cardinality guard",
+    ["label"],
+)
+
+graphql_internal_cache_events_total = Counter(
+    "graphql_internal_cache_events_total",
+    "Hits, misses and evictions of the app's internal LRU caches",
+    ["cache", "event"],
+)
+
+graphql_observability_overhead_seconds = Histogram(
+    "graphql_observability_overhead_seconds",
+    "Time spent in the app's own code per GraphQL request, by feature",
+    ["operation_name", "feature"],
+    buckets=[0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1],
+)
+
+graphql_observability_overhead_ratio = Histogram(
+    "graphql_observability_overhead_ratio",
+    "Time spent in the app's own code relative to the GraphQL request duration",
+    ["operation_name"],
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5],
+)
+
+graphql_metrics_render_duration_seconds = Histogram(
+    "graphql_metrics_render_duration_seconds",
+    "Time spent rendering the app metrics endpoint",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
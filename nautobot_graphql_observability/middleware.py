@@ -3,51 +3,130 @@
 import time
 
 from graphql import GraphQLResolveInfo
-from graphql.language.ast import FieldNode
 
+from nautobot_graphql_observability.analysis import analyze_operation, analyze_operation_node
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cardinality import get_label_limiters
+from nautobot_graphql_observability.cost import estimate_query_cost
+from nautobot_graphql_observability.field_timing import FieldTimingBuffer
+from nautobot_graphql_observability.fingerprint import query_fingerprint
 from nautobot_graphql_observability.metrics import (
+    graphql_db_duration_seconds,
+    graphql_db_queries,
+    graphql_db_rows,
     graphql_errors_total,
-    graphql_field_resolution_duration_seconds,
+    graphql_n_plus_one_detected_total,
     graphql_query_complexity,
+    graphql_query_cost,
     graphql_query_depth,
+    graphql_requests_by_fingerprint_total,
+    graphql_requests_by_persisted_query_total,
     graphql_requests_by_user_total,
     graphql_requests_total,
 )
-from nautobot_graphql_observability.utils import (
-    calculate_query_complexity,
-    calculate_query_depth,
-    stash_meta_on_request,
-)
+from nautobot_graphql_observability.n_plus_one import _REQUEST_ATTR as _N_PLUS_ONE_ATTR
+from nautobot_graphql_observability.overhead import _REQUEST_ATTR as _OVERHEAD_ATTR
+from nautobot_graphql_observability.overhead import FIELD_RESOLUTION, METRICS
+from nautobot_graphql_observability.persisted_queries import _REQUEST_ATTR as _PERSISTED_QUERY_ATTR
+from nautobot_graphql_observability.phases import UNKNOWN
+from nautobot_graphql_observability.sampling import get_field_sampler
+from nautobot_graphql_observability.tracing import _REQUEST_ATTR as _TRACE_ATTR
+from nautobot_graphql_observability.utils import get_request_username, stash_meta_on_request
 
 # Key used to stash Prometheus metadata on the request for the Django middleware.
 _REQUEST_ATTR = "_graphql_prometheus_meta"
 
+# Key used to stash the _FieldState of an operation whose nested fields have
+# work to do. Absent otherwise, so nested fields only pay for one dict lookup.
+_FIELD_STATE_ATTR = "_graphql_field_state"
 
-def _get_app_settings():
-    """Load the app's plugin settings from Django config.
 
-    Returns:
-        dict: The plugin settings, or an empty dict if not found.
+class _FieldState:
+    """Per-operation state read by the nested fields of an operation.
+
+    Built once, on the first root field, from the app settings snapshot and
+    the objects the Django middleware attached to the request. Nested fields
+    read it from the request's ``__dict__``: on a DRF ``Request``, a missing
+    attribute goes through ``Request.__getattr__``, which raises and catches
+    an exception, far too slow for every field.
+
+    Attributes:
+        timings (FieldTimingBuffer): Buffer of the operation sampled for per-field timing, if any.
+        detector (NPlusOneDetector): N+1 detector of the request, if any.
+        trace (OperationTrace): Trace of the request, if any.
+        overhead (OverheadTimer): Overhead timer of the request, with ``track_overhead``.
     """
-    from django.conf import settings  # pylint: disable=import-outside-toplevel
 
-    return getattr(settings, "PLUGINS_CONFIG", {}).get("nautobot_graphql_observability", {})
+    __slots__ = ("timings", "detector", "trace", "overhead")
+
+    def __init__(self, timings, detector, trace, overhead):
+        """Keep the per-operation objects used by nested fields."""
+        self.timings = timings
+        self.detector = detector
+        self.trace = trace
+        self.overhead = overhead
+
+    def resolve(self, next, root, info, **kwargs):  # pylint: disable=redefined-builtin
+        """Resolve a nested field, recording its path and buffering its duration as needed."""
+        if self.detector is not None:
+            self.detector.path = info.path
+        timings = self.timings
+        if timings is None:
+            return next(root, info, **kwargs)
+        if self.trace is not None:
+            with self.trace.field_span(info):
+                return _resolve_field_with_metrics(timings, next, root, info, **kwargs)
+        return _resolve_field_with_metrics(timings, next, root, info, **kwargs)
+
+
+def _resolve_field_with_metrics(timings, next, root, info, **kwargs):  # pylint: disable=redefined-builtin
+    """Resolve a nested field while buffering its duration in ``timings``."""
+    start_time = time.monotonic()
+    try:
+        return next(root, info, **kwargs)
+    finally:
+        timings.observe(
+            info.parent_type.name if info.parent_type else "Unknown",
+            info.field_name,
+            time.monotonic() - start_time,
+        )
 
 
 class PrometheusMiddleware:  # pylint: disable=too-few-public-methods
     """Graphene middleware that instruments GraphQL resolvers with Prometheus metrics.
 
-    On root-level resolutions, records counters and advanced metrics immediately
-    (these are not timing-sensitive) and stashes operation labels onto the
-    request so that :class:`PrometheusDjangoMiddleware` can record the duration
-    histogram after the full HTTP response is built.
+    On the first root-level resolution of an operation, stashes the operation
+    labels (passed through the cardinality guard, see
+    :mod:`~nautobot_graphql_observability.cardinality`) and its cached
+    analysis onto the request. Root fields only count
+    errors and flag the operation as failed; the request-level counters and
+    histograms are recorded exactly once per executed operation by
+    :func:`_record_operation_metrics`, which
+    :class:`~nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware`
+    calls after the full HTTP response is built, together with the duration
+    histogram. Nothing is recorded unless ``graphql_metrics_enabled`` is set.
 
     Optionally records advanced metrics based on app configuration:
 
     - ``track_query_depth``: Record query nesting depth histogram.
     - ``track_query_complexity``: Record query field count histogram.
-    - ``track_field_resolution``: Record per-field resolver duration histogram.
+    - ``track_query_cost``: Record the schema-aware query cost estimate histogram
+      (see :mod:`~nautobot_graphql_observability.cost`).
+    - ``track_field_resolution``: Record per-field resolver duration histogram
+      for the operations picked by the head sampler
+      (see :mod:`~nautobot_graphql_observability.sampling`).
     - ``track_per_user``: Record per-user request counter.
+    - ``track_query_fingerprint``: Record a request counter per normalized
+      query fingerprint (see :mod:`~nautobot_graphql_observability.fingerprint`).
+    - ``persisted_queries_enabled``: Record a request counter per persisted
+      query hash (see :mod:`~nautobot_graphql_observability.persisted_queries`).
+    - ``track_db_queries``: Record the SQL statement count, database time and
+      rows of each operation (see :mod:`~nautobot_graphql_observability.db_tracking`).
+    - ``detect_n_plus_one``: Count the field paths running the same SQL
+      statement template repeatedly (see :mod:`~nautobot_graphql_observability.n_plus_one`).
+    - ``tracing_enabled``: Record root fields, and the nested fields of
+      operations sampled for per-field timing, in OpenTelemetry spans
+      (see :mod:`~nautobot_graphql_observability.tracing`).
 
     Usage in Django settings::
 
@@ -58,12 +137,38 @@ class PrometheusMiddleware:  # pylint: disable=too-few-public-methods
         }
     """
 
+    @staticmethod
+    def is_enabled(config):
+        """Return whether the middleware belongs in the GraphQL API's chain under ``config``.
+
+        Besides the metrics of ``graphql_metrics_enabled``, the operation
+        metadata it stashes feeds the slow operation buffer, the root field
+        spans and the field paths of N+1 findings.
+        """
+        return (
+            config.graphql_metrics_enabled
+            or config.slow_operations_enabled
+            or config.tracing_enabled
+            or config.detect_n_plus_one
+        )
+
     def resolve(self, next: callable, root: object, info: GraphQLResolveInfo, **kwargs: object) -> object:  # pylint: disable=redefined-builtin
         """Intercept each field resolution and record metrics.
 
-        Root-level resolutions (root is None) record counters and advanced
-        metrics and stash labels for the Django middleware to record duration.
-        Nested resolutions optionally record per-field duration when enabled.
+        Root-level resolutions (root is None) stash the operation metadata for
+        the end-of-operation hook, take the per-field sampling decision and
+        count resolver errors. Nested resolutions of sampled operations buffer
+        their duration in the operation's :class:`FieldTimingBuffer`, flushed
+        once by the end-of-operation hook. Nested resolutions read everything
+        they need from a per-operation :class:`_FieldState`, stashed on the
+        first root field only when they have work to do; otherwise they only
+        pay for one dict lookup. When N+1 detection is enabled, every field
+        also records its ``info.path`` on the request's
+        :class:`~nautobot_graphql_observability.n_plus_one.NPlusOneDetector`.
+        When the request is traced, root fields and the nested fields of
+        sampled operations are resolved inside a field span. With
+        ``track_overhead``, the time spent here outside of ``next()`` is added
+        to the request's :class:`~nautobot_graphql_observability.overhead.OverheadTimer`.
 
         Args:
             next (callable): Callable to continue the resolution chain.
@@ -74,93 +179,83 @@ class PrometheusMiddleware:  # pylint: disable=too-few-public-methods
         Returns:
             object: The result of the resolver.
         """
-        config = _get_app_settings()
-
         if root is not None:
-            if config.get("track_field_resolution", False):
-                return self._resolve_field_with_metrics(next, root, info, **kwargs)
-            return next(root, info, **kwargs)
-
-        operation_type = info.operation.operation.value
-        operation_name = self._get_operation_name(info)
-
-        # Stash labels on the request (only for the first root field) so
-        # the Django middleware can record the full-request duration.
+            state = info.context.__dict__.get(_FIELD_STATE_ATTR)
+            if state is None:
+                return next(root, info, **kwargs)
+            if state.overhead is not None:
+                feature = FIELD_RESOLUTION if state.timings is not None else METRICS
+                return state.overhead.measure(feature, state.resolve, next, root, info, **kwargs)
+            return state.resolve(next, root, info, **kwargs)
+
+        if get_app_settings().track_overhead:
+            overhead = getattr(info.context, _OVERHEAD_ATTR, None)
+            if overhead is not None:
+                return overhead.measure(METRICS, self._resolve_root, next, root, info, **kwargs)
+        return self._resolve_root(next, root, info, **kwargs)
+
+    def _resolve_root(self, next, root, info, **kwargs):  # pylint: disable=redefined-builtin
+        """Record the metrics of one root field resolution, see :meth:`resolve`."""
+        config = get_app_settings()
+        # Stash the operation metadata on the request (only for the first root
+        # field) so the Django middleware can record the request-level metrics
+        # once the whole operation has been executed.
         # For DRF views, info.context is a DRF Request wrapping a WSGIRequest.
         # The Django middleware sees the WSGIRequest, so stash on both.
         request = info.context
-        if not hasattr(request, _REQUEST_ATTR):
+        meta = getattr(request, _REQUEST_ATTR, None)
+        if meta is None:
+            analysis = analyze_operation(info)
+            limiters = get_label_limiters(config)
             meta = {
-                "operation_type": operation_type,
-                "operation_name": operation_name,
+                "operation_type": info.operation.operation.value,
+                "operation_name": limiters.operation_name.admit(analysis.operation_name),
+                "analysis": analysis,
+                "operation": info.operation,
+                "config": config,
             }
+            if config.track_query_cost:
+                meta["cost"] = estimate_query_cost(info, config)
+            if config.track_per_user:
+                meta["user"] = limiters.user.admit(get_request_username(request))
+            if config.track_query_fingerprint:
+                meta["fingerprint"] = query_fingerprint(info)
+            if config.persisted_queries_enabled:
+                meta["persisted_query"] = getattr(request, _PERSISTED_QUERY_ATTR, None)
+            if config.track_field_resolution and get_field_sampler(config).should_sample(analysis.operation_name):
+                meta["field_timings"] = FieldTimingBuffer()
             stash_meta_on_request(request, _REQUEST_ATTR, meta)
 
-        try:
-            result = next(root, info, **kwargs)
-            return result
-        except Exception as error:
-            graphql_errors_total.labels(
-                operation_type=operation_type,
-                operation_name=operation_name,
-                error_type=type(error).__name__,
-            ).inc()
-            # Mark the error on the stashed metadata so the Django middleware
-            # records the correct status.
-            meta = getattr(request, _REQUEST_ATTR, None)
-            if meta is not None:
-                meta["error"] = True
-            raise
-        finally:
-            # Counters and advanced metrics are not timing-sensitive, record now.
-            status = "error" if getattr(request, _REQUEST_ATTR, {}).get("error") else "success"
-
-            graphql_requests_total.labels(
-                operation_type=operation_type,
-                operation_name=operation_name,
-                status=status,
-            ).inc()
+            state = _FieldState(
+                meta.get("field_timings"),
+                getattr(request, _N_PLUS_ONE_ATTR, None),
+                getattr(request, _TRACE_ATTR, None),
+                getattr(request, _OVERHEAD_ATTR, None) if config.track_overhead else None,
+            )
+            if state.timings is not None or state.detector is not None or state.overhead is not None:
+                stash_meta_on_request(request, _FIELD_STATE_ATTR, state)
 
-            self._record_advanced_metrics(info, operation_name, config)
+        detector = getattr(request, _N_PLUS_ONE_ATTR, None)
+        if detector is not None:
+            detector.path = info.path
 
-    @staticmethod
-    def _resolve_field_with_metrics(next, root, info, **kwargs):  # pylint: disable=redefined-builtin
-        """Resolve a nested field while recording per-field duration."""
-        type_name = info.parent_type.name if info.parent_type else "Unknown"
-        field_name = info.field_name
-
-        start_time = time.monotonic()
+        operation_trace = getattr(request, _TRACE_ATTR, None)
         try:
+            if operation_trace is not None:
+                with operation_trace.field_span(info):
+                    return next(root, info, **kwargs)
             return next(root, info, **kwargs)
-        finally:
-            duration = time.monotonic() - start_time
-            graphql_field_resolution_duration_seconds.labels(
-                type_name=type_name,
-                field_name=field_name,
-            ).observe(duration)
-
-    @staticmethod
-    def _record_advanced_metrics(info, operation_name, config):
-        """Record query depth, complexity, and per-user metrics if enabled."""
-        if config.get("track_query_depth", True):
-            depth = calculate_query_depth(info.operation.selection_set, info.fragments)
-            graphql_query_depth.labels(operation_name=operation_name).observe(depth)
-
-        if config.get("track_query_complexity", True):
-            complexity = calculate_query_complexity(info.operation.selection_set, info.fragments)
-            graphql_query_complexity.labels(operation_name=operation_name).observe(complexity)
-
-        if config.get("track_per_user", True):
-            user = "anonymous"
-            request = info.context
-            if hasattr(request, "user") and hasattr(request.user, "is_authenticated"):
-                if request.user.is_authenticated:
-                    user = request.user.username
-            graphql_requests_by_user_total.labels(
-                user=user,
-                operation_type=info.operation.operation.value,
-                operation_name=operation_name,
-            ).inc()
+        except Exception as error:
+            if config.graphql_metrics_enabled:
+                graphql_errors_total.labels(
+                    operation_type=meta["operation_type"],
+                    operation_name=meta["operation_name"],
+                    error_type=type(error).__name__,
+                ).inc()
+            # Mark the error on the stashed metadata so the end-of-operation
+            # hook records the aggregated status of all root fields.
+            meta["error"] = True
+            raise
 
     @staticmethod
     def _get_operation_name(info: GraphQLResolveInfo) -> str:
@@ -168,12 +263,124 @@ class PrometheusMiddleware:  # pylint: disable=too-few-public-methods
 
         Uses the explicit operation name if provided, otherwise falls back
         to the sorted, comma-joined root field names (e.g. "devices,locations").
+        The result is served from the per-document analysis cache.
         """
-        if info.operation.name:
-            return info.operation.name.value
-        root_fields = []
-        if info.operation.selection_set:
-            for selection in info.operation.selection_set.selections:
-                if isinstance(selection, FieldNode):
-                    root_fields.append(selection.name.value)
-        return ",".join(sorted(root_fields)) if root_fields else "anonymous"
+        return analyze_operation(info).operation_name
+
+
+def _record_operation_metrics(meta):
+    """Record the request-level metrics of one executed operation.
+
+    Called exactly once per operation, after every root field has been
+    resolved, so the status reflects all root fields: ``error`` if any of
+    them raised, ``success`` otherwise. Depth and complexity come from the
+    cached :class:`~nautobot_graphql_observability.analysis.OperationAnalysis`,
+    the cost from the estimate taken on the first root field, and the SQL
+    statement count, database time and rows from the ``db_stats`` the Django
+    middleware attaches to ``meta``, together with the N+1 findings. The
+    fingerprint and persisted query counters and the paths of N+1 findings go
+    through the ``fingerprint``, ``persisted_query`` and ``path`` label
+    limiters here.
+    The per-field timings buffered during a sampled operation are flushed here.
+
+    Args:
+        meta (dict): The metadata stashed on the request by :class:`PrometheusMiddleware`.
+    """
+    config = meta.get("config") or get_app_settings()
+    operation_type = meta["operation_type"]
+    operation_name = meta["operation_name"]
+
+    graphql_requests_total.labels(
+        operation_type=operation_type,
+        operation_name=operation_name,
+        status="error" if meta.get("error") else "success",
+    ).inc()
+
+    analysis = meta.get("analysis")
+    if analysis is not None:
+        if config.track_query_depth:
+            graphql_query_depth.labels(operation_name=operation_name).observe(analysis.depth)
+
+        if config.track_query_complexity:
+            graphql_query_complexity.labels(operation_name=operation_name).observe(analysis.complexity)
+
+    cost = meta.get("cost")
+    if cost is not None and config.track_query_cost:
+        graphql_query_cost.labels(operation_name=operation_name).observe(cost)
+
+    db_stats = meta.get("db_stats")
+    if db_stats is not None and config.track_db_queries:
+        graphql_db_queries.labels(operation_name=operation_name).observe(db_stats.queries)
+        graphql_db_duration_seconds.labels(operation_name=operation_name).observe(db_stats.duration)
+        graphql_db_rows.labels(operation_name=operation_name).observe(db_stats.rows)
+
+    for finding in meta.get("n_plus_one") or ():
+        path = get_label_limiters(config).path.admit(finding.path)
+        graphql_n_plus_one_detected_total.labels(operation_name=operation_name, path=path).inc()
+
+    field_timings = meta.get("field_timings")
+    if field_timings is not None:
+        field_timings.flush()
+
+    fingerprint = meta.get("fingerprint")
+    if fingerprint is not None and config.track_query_fingerprint:
+        graphql_requests_by_fingerprint_total.labels(
+            operation_type=operation_type,
+            operation_name=operation_name,
+            fingerprint=get_label_limiters(config).fingerprint.admit(fingerprint),
+        ).inc()
+
+    persisted_query = meta.get("persisted_query")
+    if persisted_query is not None:
+        graphql_requests_by_persisted_query_total.labels(
+            operation_type=operation_type,
+            operation_name=operation_name,
+            persisted_query=get_label_limiters(config).persisted_query.admit(persisted_query[:16]),
+        ).inc()
+
+    user = meta.get("user")
+    if user is not None and config.track_per_user:
+        graphql_requests_by_user_total.labels(
+            user=user,
+            operation_type=operation_type,
+            operation_name=operation_name,
+        ).inc()
+
+
+def _failed_operation_meta(phases, config):
+    """Build the metadata of an operation that failed before execution, and count its error.
+
+    No resolver runs for requests failing to parse or validate, so
+    :class:`PrometheusMiddleware` stashes nothing for them. The Django
+    middleware records them from the error kept on their
+    :class:`~nautobot_graphql_observability.phases.RequestPhases` instead,
+    with this metadata in place of the stashed one. Operations of documents
+    that could not be parsed are labelled ``unknown``.
+
+    Args:
+        phases (RequestPhases): The phases of the request, with its error.
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        dict: Metadata shaped like the one stashed by :class:`PrometheusMiddleware`.
+    """
+    operation, fragments = phases.failed_operation()
+    analysis = analyze_operation_node(operation, fragments) if operation is not None else None
+    operation_type = operation.operation.value if operation is not None else UNKNOWN
+    operation_name = get_label_limiters(config).operation_name.admit(
+        analysis.operation_name if analysis is not None else UNKNOWN
+    )
+    if config.graphql_metrics_enabled:
+        graphql_errors_total.labels(
+            operation_type=operation_type,
+            operation_name=operation_name,
+            error_type=type(phases.error).__name__,
+        ).inc()
+    return {
+        "operation_type": operation_type,
+        "operation_name": operation_name,
+        "analysis": analysis,
+        "operation": operation,
+        "config": config,
+        "error": True,
+    }
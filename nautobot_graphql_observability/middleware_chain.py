@@ -0,0 +1,72 @@
+"""The Graphene middleware chain of the GraphQL API, built once per process.
+
+Nautobot's ``GraphQLDRFAPIView`` is instantiated for every request, and
+graphql-core wraps a list of middlewares in a new ``MiddlewareManager`` on
+every execution. Besides instantiating each middleware per request, this
+throws away the manager's cache of wrapped resolvers: every field resolver is
+wrapped in the middleware chain again on each request.
+
+:func:`get_middleware_chain` instantiates ``GRAPHENE["MIDDLEWARE"]`` once and
+hands the same ``MiddlewareManager`` to every request. The middlewares of this
+app keep no state on their instances (per-request state lives on the
+request), so sharing them between requests and threads is safe.
+
+The chain only holds the middlewares with work to do under the current app
+settings: each middleware of this app tells so through its ``is_enabled()``
+static method, and other middlewares are always kept. With every feature
+disabled, operations are executed without any middleware, so without any
+frame of this app per field. The chain is assembled again when the settings
+snapshot changes (see :mod:`~nautobot_graphql_observability.app_settings`),
+or when Graphene-Django reloads its settings, e.g. under ``override_settings``.
+"""
+
+from graphene_django import settings as graphene_django_settings
+from graphene_django.views import instantiate_middleware
+from graphql import MiddlewareManager
+
+# (GRAPHENE["MIDDLEWARE"], the middlewares instantiated from it).
+_middlewares = (None, ())
+
+# ((settings snapshot, middlewares) the chain was assembled for, the middlewares it holds, MiddlewareManager or None).
+_chain = (None, (), None)
+
+
+def _get_middlewares():
+    """Return the middlewares of ``GRAPHENE["MIDDLEWARE"]``, instantiating them on first use."""
+    global _middlewares  # noqa: PLW0603  # pylint: disable=global-statement
+    setting = graphene_django_settings.graphene_settings.MIDDLEWARE
+    source, middlewares = _middlewares
+    if setting is not source:
+        middlewares = tuple(instantiate_middleware(setting or ()))
+        _middlewares = (setting, middlewares)
+    return middlewares
+
+
+def _is_enabled(middleware, config):
+    """Return whether ``middleware`` belongs in the chain under ``config``."""
+    is_enabled = getattr(middleware, "is_enabled", None)
+    return is_enabled is None or is_enabled(config)
+
+
+def get_middleware_chain(config):
+    """Return the shared ``MiddlewareManager`` of the middlewares enabled under ``config``.
+
+    The chain is only assembled again when ``config`` or the middlewares
+    differ from the previous call, and only replaced when the selected
+    middlewares differ, so its cache of wrapped resolvers is kept.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        MiddlewareManager: The middleware chain, or None when no middleware is configured or enabled.
+    """
+    global _chain  # noqa: PLW0603  # pylint: disable=global-statement
+    middlewares = _get_middlewares()
+    source, selected, chain = _chain
+    if source is None or source[0] is not config or source[1] is not middlewares:
+        enabled = tuple(middleware for middleware in middlewares if _is_enabled(middleware, config))
+        if enabled != selected or source is None:
+            chain = MiddlewareManager(*enabled) if enabled else None
+        _chain = ((config, middlewares), enabled, chain)
+    return chain
@@ -0,0 +1,82 @@
+"""Prometheus multiprocess mode support for pre-forking servers (gunicorn, uWSGI).
+
+Each worker of a pre-forking server has its own copy of the metrics. When the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable points to a writable
+directory *before the workers start*, ``prometheus_client`` backs every value
+with an mmap file in that directory, named after the worker's pid, and
+:func:`get_metrics_registry` returns a registry whose collector merges the
+files of all workers, so a single scrape reports totals across the fleet.
+
+Gauges declare how their per-worker values are merged (``multiprocess_mode``
+in :mod:`nautobot_graphql_observability.metrics`). Files of ``live*`` gauges
+must be removed when a worker exits, otherwise a dead worker's last value is
+reported forever: :func:`child_exit` is meant for gunicorn's ``child_exit``
+server hook, and :func:`mark_process_dead` is also registered with
+:mod:`atexit` for servers that let workers exit normally (uWSGI).
+"""
+
+import atexit
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client import multiprocess as prometheus_multiprocess
+
+MULTIPROC_DIR_ENV_VARS = ("PROMETHEUS_MULTIPROC_DIR", "prometheus_multiproc_dir")
+
+
+def get_multiprocess_dir():
+    """Return the multiprocess metrics directory, or ``None`` when multiprocess mode is off."""
+    for name in MULTIPROC_DIR_ENV_VARS:
+        path = os.environ.get(name)
+        if path:
+            return path
+    return None
+
+
+def is_multiprocess_enabled():
+    """Return whether metrics are stored in per-process mmap files."""
+    return get_multiprocess_dir() is not None
+
+
+def get_metrics_registry():
+    """Return the registry to expose metrics from.
+
+    In multiprocess mode this is a fresh registry with a collector merging the
+    value files of every worker; it must not be used to register metrics.
+    Otherwise it is the default in-process registry.
+
+    Returns:
+        CollectorRegistry: The registry to pass to ``generate_latest()``.
+    """
+    path = get_multiprocess_dir()
+    if path is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    prometheus_multiprocess.MultiProcessCollector(registry, path=path)
+    return registry
+
+
+def mark_process_dead(pid=None):
+    """Remove the live gauge files of a worker process that exited.
+
+    Args:
+        pid (int): The pid of the exited worker; defaults to the current process.
+    """
+    path = get_multiprocess_dir()
+    if path is None:
+        return
+    prometheus_multiprocess.mark_process_dead(os.getpid() if pid is None else pid, path)
+
+
+def child_exit(server, worker):  # pylint: disable=unused-argument
+    """Gunicorn ``child_exit`` server hook cleaning up the exited worker's live gauge files.
+
+    Use it from ``gunicorn.conf.py`` with
+    ``from nautobot_graphql_observability.multiprocess import child_exit``.
+    """
+    mark_process_dead(worker.pid)
+
+
+# The handler resolves the pid when it runs, so forked workers inheriting it
+# clean up their own files.
+atexit.register(mark_process_dead)
@@ -0,0 +1,106 @@
+"""Detection of N+1 query patterns per GraphQL field path.
+
+A nested selection such as ``devices { interfaces { ip_addresses { address } } }``
+resolved without prefetching runs one SQL statement per parent object: the
+same statement template, once per device, under the ``devices.interfaces``
+field path.
+
+:class:`PrometheusMiddleware <nautobot_graphql_observability.middleware.PrometheusMiddleware>`
+records the ``info.path`` of each field as it starts resolving on the
+request's :class:`NPlusOneDetector`. The path is deliberately not reset when
+the resolver returns: graphql-core evaluates the returned queryset while
+completing the field's value, after the resolver (and the middleware) returned,
+and those statements belong to the same field. The detector is also installed
+as a Django ``execute_wrapper`` for the duration of the request and counts
+each statement under the current path, with list indices dropped from the path.
+
+At the end of the operation, statements are normalised to templates (literals
+replaced by ``?``, ``IN`` lists collapsed) and every path running the same
+template more than ``n_plus_one_threshold`` times is reported as a
+:class:`NPlusOneFinding`.
+"""
+
+import re
+from collections import Counter
+from typing import NamedTuple
+
+# Literals and parameter lists normalised away to build statement templates.
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Number of findings included in the query log record, worst first.
+MAX_LOGGED_FINDINGS = 5
+
+# Key used to stash the request's detector for the Graphene middleware.
+_REQUEST_ATTR = "_graphql_n_plus_one"
+
+
+class NPlusOneFinding(NamedTuple):
+    """A statement template run repeatedly under one field path."""
+
+    path: str
+    statements: int
+    template: str
+
+
+def normalize_sql(sql):
+    """Return the template of a SQL statement, with literals and parameter lists replaced by ``?``."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _VALUE_LIST.sub("(?)", sql.replace("%s", "?"))
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def format_path(path):
+    """Return the dotted field path of a graphql-core ``Path``, without list indices.
+
+    Args:
+        path (Path): ``info.path`` of a field, or None outside any field.
+    """
+    keys = []
+    while path is not None:
+        if isinstance(path.key, str):
+            keys.append(path.key)
+        path = path.prev
+    return ".".join(reversed(keys))
+
+
+class NPlusOneDetector:
+    """Django ``execute_wrapper`` counting statements per field path and statement.
+
+    Attributes:
+        path (Path): ``info.path`` of the field being resolved, set by the Graphene middleware.
+    """
+
+    __slots__ = ("path", "_counts")
+
+    def __init__(self):
+        """Initialize an empty detector."""
+        self.path = None
+        self._counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Count the statement under the current field path and run it."""
+        self._counts[(format_path(self.path), sql)] += 1
+        return execute(sql, params, many, context)
+
+    def findings(self, threshold):
+        """Return the paths running the same statement template more than ``threshold`` times.
+
+        Args:
+            threshold (int): Maximum number of runs of one template under one path.
+
+        Returns:
+            list[NPlusOneFinding]: The findings, most repeated first.
+        """
+        templates = Counter()
+        for (path, sql), count in self._counts.items():
+            if path:
+                templates[(path, normalize_sql(sql))] += count
+        findings = [
+            NPlusOneFinding(path, count, template) for (path, template), count in templates.items() if count > threshold
+        ]
+        findings.sort(key=lambda finding: finding.statements, reverse=True)
+        return findings
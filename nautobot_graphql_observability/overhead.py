@@ -0,0 +1,151 @@
+"""Self-instrumentation: time spent in the app's own code, per feature.
+
+With ``track_overhead``,
+:class:`~nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware`
+attaches an :class:`OverheadTimer` to every GraphQL request. The Graphene
+middlewares add the time they spend outside of ``next()`` to it, and the
+end-of-request hook the time of each of its steps. Once the request is
+complete, the time of each feature is observed in
+``graphql_observability_overhead_seconds`` and their sum, relative to the
+request duration, in ``graphql_observability_overhead_ratio``, both labelled
+by operation.
+
+Features:
+
+- ``metrics``: ``PrometheusMiddleware`` outside of the resolvers (operation
+  analysis, labels, cost, fingerprint, root field spans, N+1 path tracking) and
+  the recording of the request-level metrics.
+- ``field_resolution``: the nested fields of operations sampled for per-field
+  timing: buffering their durations and their spans.
+- ``query_logging``: ``GraphQLQueryLoggingMiddleware`` on root fields and the
+  emission of the log record.
+- ``tracing``: finishing the request span.
+- ``slow_operations``: writing to the slow operation buffer.
+- ``request``: the rest of the end-of-request hook (N+1 findings, duration
+  histogram).
+
+The SQL execute wrappers of ``track_db_queries`` and ``detect_n_plus_one`` are
+not measured, as timing them would double their cost. Measuring adds a few
+clock reads per field, partly included in the figures.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+
+from nautobot_graphql_observability.metrics import (
+    graphql_observability_overhead_ratio,
+    graphql_observability_overhead_seconds,
+)
+
+METRICS = "metrics"
+FIELD_RESOLUTION = "field_resolution"
+QUERY_LOGGING = "query_logging"
+TRACING = "tracing"
+SLOW_OPERATIONS = "slow_operations"
+REQUEST = "request"
+
+# Key used to stash the timer of a GraphQL request on the request.
+_REQUEST_ATTR = "_graphql_overhead"
+
+
+class OverheadTimer:
+    """Accumulates the time spent in the app's code during one request, per feature.
+
+    Sections may nest: the time of an inner section (or of the ``next()``
+    call of a middleware) is only counted once, for the inner feature.
+    """
+
+    __slots__ = ("seconds", "_claimed")
+
+    def __init__(self):
+        """Start with no time recorded."""
+        self.seconds = {}
+        # Time taken by the inner sections of each open section.
+        self._claimed = [0.0]
+
+    def _enter(self):
+        """Open a section and return its start time."""
+        self._claimed.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, start, feature):
+        """Close the section opened at ``start``, adding its own time to ``feature`` unless None."""
+        elapsed = time.perf_counter() - start
+        inner = self._claimed.pop()
+        self._claimed[-1] += elapsed
+        if feature is not None:
+            self.seconds[feature] = self.seconds.get(feature, 0.0) + elapsed - inner
+
+    @contextmanager
+    def section(self, feature):
+        """Add the time spent in the ``with`` block, minus inner sections, to ``feature``."""
+        start = self._enter()
+        try:
+            yield
+        finally:
+            self._exit(start, feature)
+
+    def measure(self, feature, resolve, next, root, info, **kwargs):  # pylint: disable=redefined-builtin
+        """Call a middleware's ``resolve``, adding its time minus the time of ``next()`` to ``feature``.
+
+        Args:
+            feature (str): The feature the middleware's time is added to.
+            resolve (callable): The middleware's resolve method.
+            next (callable): Callable to continue the resolution chain.
+            root (object): Parent resolved value. None for top-level fields.
+            info (GraphQLResolveInfo): GraphQL resolve info.
+            **kwargs (object): Field arguments.
+
+        Returns:
+            object: The result of ``resolve``.
+        """
+
+        def timed_next(root, info, **kwargs):
+            start = self._enter()
+            try:
+                return next(root, info, **kwargs)
+            finally:
+                self._exit(start, None)
+
+        start = self._enter()
+        try:
+            return resolve(timed_next, root, info, **kwargs)
+        finally:
+            self._exit(start, feature)
+
+    @property
+    def total(self):
+        """Return the time spent in the app's code, all features together, in seconds."""
+        return sum(self.seconds.values())
+
+    def record(self, operation_name, duration):
+        """Observe the time of each feature and the overhead ratio of the request.
+
+        Args:
+            operation_name (str): The operation label, already through the cardinality guard.
+            duration (float): Duration of the request in seconds.
+        """
+        for feature, seconds in self.seconds.items():
+            graphql_observability_overhead_seconds.labels(operation_name=operation_name, feature=feature).observe(
+                seconds
+            )
+        if duration > 0:
+            graphql_observability_overhead_ratio.labels(operation_name=operation_name).observe(self.total / duration)
+
+
+class _NullOverheadTimer:  # pylint: disable=too-few-public-methods
+    """Stand-in for requests without an :class:`OverheadTimer`: sections cost nothing."""
+
+    _section = nullcontext()
+
+    def section(self, feature):  # pylint: disable=unused-argument
+        """Return a no-op context manager."""
+        return self._section
+
+
+NULL_TIMER = _NullOverheadTimer()
+
+
+def get_overhead_timer(request):
+    """Return the :class:`OverheadTimer` of a request, or :data:`NULL_TIMER` when overhead is not tracked."""
+    return getattr(request, _REQUEST_ATTR, None) or NULL_TIMER
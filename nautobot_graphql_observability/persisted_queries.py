@@ -0,0 +1,110 @@
+"""Automatic persisted queries (APQ) for the GraphQL API.
+
+With ``persisted_queries_enabled``, clients of ``/api/graphql/`` may follow
+the Apollo automatic persisted queries protocol: instead of the document,
+they send its SHA-256 hash in the ``extensions`` of the request::
+
+    {"extensions": {"persistedQuery": {"version": 1, "sha256Hash": "<hex digest>"}}, "variables": {...}}
+
+Documents are kept in the Django cache ``persisted_queries_alias``, shared by
+every worker, for ``persisted_queries_ttl`` seconds:
+
+- a hash without document is looked up in the cache. Unknown hashes are
+  answered with a ``PersistedQueryNotFound`` error, upon which the client
+  sends the request again with both the hash and the document;
+- a hash with a document registers the document, after checking that the
+  hash matches it.
+
+The hash of a persisted request is stashed on the request: the operation is
+counted per hash in ``graphql_requests_by_persisted_query_total`` (under
+the first 16 hex digits of the hash), and the query log records the hash
+instead of the document body.
+"""
+
+import hashlib
+import json
+import re
+
+from django.core.cache import caches
+
+from nautobot_graphql_observability.metrics import graphql_persisted_queries_total
+from nautobot_graphql_observability.utils import stash_meta_on_request
+
+KEY_PREFIX = "nautobot_graphql_observability:apq"
+
+# Key used to stash the SHA-256 hash of a persisted request on the request.
+_REQUEST_ATTR = "_graphql_persisted_query"
+
+_SHA256_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def _error(message, code):
+    """Return a GraphQL error response body."""
+    return {"errors": [{"message": message, "extensions": {"code": code}}]}
+
+
+def get_persisted_query(data):
+    """Return the ``persistedQuery`` extension of a GraphQL request body, or None.
+
+    Args:
+        data (dict): Parsed body of the request. ``extensions`` may be a JSON string.
+    """
+    extensions = data.get("extensions") if hasattr(data, "get") else None
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            return None
+    persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+    return persisted if isinstance(persisted, dict) else None
+
+
+def get_persisted_query_response(request, data, get_response, config):
+    """Resolve the document of a persisted request, then return its response.
+
+    Requests without the ``persistedQuery`` extension are passed through.
+
+    Args:
+        request: The DRF request.
+        data (dict): Parsed body of the request.
+        get_response (callable): Returns the ``(result, status_code)`` pair of a request body.
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        tuple: The ``(result, status_code)`` pair of the request.
+    """
+    persisted = get_persisted_query(data)
+    if persisted is None:
+        return get_response(request, data)
+
+    if persisted.get("version") != 1:
+        graphql_persisted_queries_total.labels(result="invalid").inc()
+        return _error("Unsupported persisted query version", "PERSISTED_QUERY_VERSION_NOT_SUPPORTED"), 400
+    sha256_hash = persisted.get("sha256Hash")
+    sha256_hash = sha256_hash.lower() if isinstance(sha256_hash, str) else ""
+    if not _SHA256_RE.fullmatch(sha256_hash):
+        graphql_persisted_queries_total.labels(result="invalid").inc()
+        return _error("Invalid persisted query hash", "BAD_USER_INPUT"), 400
+
+    cache = caches[config.persisted_queries_alias]
+    key = f"{KEY_PREFIX}:{sha256_hash}"
+    query = data.get("query")
+    if query and not isinstance(query, str):
+        graphql_persisted_queries_total.labels(result="invalid").inc()
+        return _error("Invalid persisted query document", "BAD_USER_INPUT"), 400
+    if query:
+        if hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+            graphql_persisted_queries_total.labels(result="invalid").inc()
+            return _error("provided sha does not match query", "BAD_USER_INPUT"), 400
+        cache.set(key, query, config.persisted_queries_ttl or None)
+        graphql_persisted_queries_total.labels(result="registered").inc()
+    else:
+        query = cache.get(key)
+        if query is None:
+            graphql_persisted_queries_total.labels(result="miss").inc()
+            return _error("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND"), 200
+        graphql_persisted_queries_total.labels(result="hit").inc()
+        data = {**data, "query": query}
+
+    stash_meta_on_request(request, _REQUEST_ATTR, sha256_hash)
+    return get_response(request, data)
@@ -0,0 +1,165 @@
+"""Per-phase timing of GraphQL API requests.
+
+A request to Nautobot's GraphQL API (``GraphQLDRFAPIView``) goes through five
+phases:
+
+- ``request_parse``: DRF parses the request body;
+- ``parse``: the document is parsed, or read from the document cache
+  (see :mod:`~nautobot_graphql_observability.document_cache`);
+- ``validate``: the document is validated against the schema, or its result
+  read from the validation cache;
+- ``execute``: the operation is executed, resolvers and Graphene middlewares
+  included;
+- ``serialize``: the response is rendered to JSON.
+
+:class:`~nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware`
+makes a :class:`RequestPhases` current for the duration of each GraphQL
+request. The patched view methods, and the :func:`timed_parse`,
+:func:`timed_validate` and :func:`timed_execute` functions the view uses,
+add their durations to it. With ``track_request_phases``, the durations are
+recorded in ``graphql_request_phase_duration_seconds`` once the request
+completes.
+
+The first error ending the request before execution (an unparsable body, a
+syntax error, a validation error or a request rejected by the view) is kept
+as well. No resolver, hence no Graphene middleware, runs for these requests,
+so the Django middleware counts, times and logs them from it.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from graphql import FragmentDefinitionNode, GraphQLError, OperationDefinitionNode, execute
+
+from nautobot_graphql_observability.document_cache import parse_document, validate_document
+from nautobot_graphql_observability.metrics import graphql_request_phase_duration_seconds
+
+REQUEST_PARSE = "request_parse"
+PARSE = "parse"
+VALIDATE = "validate"
+EXECUTE = "execute"
+SERIALIZE = "serialize"
+
+# Operation type and name of requests failing before their document is parsed.
+UNKNOWN = "unknown"
+
+_current_phases = ContextVar("nautobot_graphql_observability_phases", default=None)
+
+
+class RequestPhases:
+    """Durations of the phases of one GraphQL API request, and the error ending it before execution.
+
+    Attributes:
+        seconds (dict): Duration of each phase, in seconds.
+        error (Exception): The first error ending the request before execution, if any.
+        query (str): The document of the failed request, if it got that far.
+        document (DocumentNode): The parsed document of the failed request, if it got that far.
+    """
+
+    __slots__ = ("seconds", "error", "query", "document")
+
+    def __init__(self):
+        """Start with no phase recorded."""
+        self.seconds = {}
+        self.error = None
+        self.query = None
+        self.document = None
+
+    def add(self, phase, seconds):
+        """Add ``seconds`` to the duration of ``phase``."""
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+    def fail(self, error, query=None, document=None):
+        """Keep ``error`` as the error ending the request, unless one was kept already."""
+        if self.error is None:
+            self.error = error
+            self.query = query
+            self.document = document
+
+    def failed_operation(self):
+        """Return the ``(operation, fragments)`` of the failed document.
+
+        Returns:
+            tuple: The operation, or None when the document was not parsed or holds several
+            operations, and the fragment definitions by name.
+        """
+        if self.document is None:
+            return None, {}
+        operations = [node for node in self.document.definitions if isinstance(node, OperationDefinitionNode)]
+        fragments = {
+            node.name.value: node for node in self.document.definitions if isinstance(node, FragmentDefinitionNode)
+        }
+        return (operations[0] if len(operations) == 1 else None), fragments
+
+    def record(self, operation_name):
+        """Observe the duration of each phase.
+
+        Args:
+            operation_name (str): The operation label, already through the cardinality guard.
+        """
+        for phase, seconds in self.seconds.items():
+            graphql_request_phase_duration_seconds.labels(operation_name=operation_name, phase=phase).observe(seconds)
+
+
+def get_current_phases():
+    """Return the :class:`RequestPhases` of the current GraphQL request, or None."""
+    return _current_phases.get()
+
+
+@contextmanager
+def current_phases(phases):
+    """Make ``phases`` current for the duration of the ``with`` block."""
+    token = _current_phases.set(phases)
+    try:
+        yield phases
+    finally:
+        _current_phases.reset(token)
+
+
+def timed_parse(source):
+    """Parse a document with :func:`parse_document`, timing the ``parse`` phase.
+
+    Raises:
+        GraphQLError: If ``source`` is not a valid GraphQL document, after keeping it as the request error.
+    """
+    phases = _current_phases.get()
+    if phases is None:
+        return parse_document(source)
+    start_time = time.monotonic()
+    try:
+        return parse_document(source)
+    except GraphQLError as error:
+        phases.fail(error, query=source)
+        raise
+    finally:
+        phases.add(PARSE, time.monotonic() - start_time)
+
+
+def timed_validate(schema, document_ast, rules=None, max_errors=None):
+    """Validate a document with :func:`validate_document`, timing the ``validate`` phase.
+
+    The first validation error, if any, is kept as the request error.
+    """
+    phases = _current_phases.get()
+    if phases is None:
+        return validate_document(schema, document_ast, rules, max_errors)
+    start_time = time.monotonic()
+    errors = validate_document(schema, document_ast, rules, max_errors)
+    phases.add(VALIDATE, time.monotonic() - start_time)
+    if errors:
+        query = document_ast.loc.source.body if document_ast.loc is not None else None
+        phases.fail(errors[0], query=query, document=document_ast)
+    return errors
+
+
+def timed_execute(*args, **kwargs):
+    """Execute an operation with ``graphql.execute``, timing the ``execute`` phase."""
+    phases = _current_phases.get()
+    if phases is None:
+        return execute(*args, **kwargs)
+    start_time = time.monotonic()
+    try:
+        return execute(*args, **kwargs)
+    finally:
+        phases.add(EXECUTE, time.monotonic() - start_time)
@@ -0,0 +1,216 @@
+"""Cross-request cache of the responses of read-only GraphQL API queries.
+
+Dashboards re-poll the same queries every few seconds, and each poll runs
+the whole operation again. With ``response_cache_enabled``, the successful
+responses of ``query`` operations served by Nautobot's GraphQL API
+(``GraphQLDRFAPIView``) are kept in the Django cache ``response_cache_alias``
+for ``response_cache_ttl`` seconds, and identical requests are answered from
+it without executing. Entries are keyed by:
+
+- the normalized document: printed back from its AST, so formatting and
+  comments do not matter, together with the operation name;
+- the variables;
+- the permission set of the requester: every superuser shares one key, other
+  users are keyed by the actions and constraints of their object permissions
+  (and by their own id when a constraint refers to ``$user``);
+- a generation number, replaced whenever a change-logged object is created,
+  updated or deleted, which invalidates every entry at once.
+
+Mutations, documents that fail to parse or do not designate a single
+operation, and invalid variables bypass the cache. Responses with errors are
+not stored. Responses served from the cache skip the Graphene middlewares:
+they are counted by the response cache metrics only, not by the request
+metrics or the query log.
+"""
+
+import hashlib
+import json
+import time
+from functools import partial
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from graphene_django.views import GraphQLView, HttpError
+from graphql import GraphQLError, OperationType, get_operation_ast, parse, print_ast
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.cache import LRUCache
+from nautobot_graphql_observability.metrics import (
+    graphql_response_cache_invalidations_total,
+    graphql_response_cache_requests_total,
+    graphql_response_cache_saved_seconds_total,
+)
+
+KEY_PREFIX = "nautobot_graphql_observability:response"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+
+_document_cache = None
+
+
+def _get_document_cache():
+    """Return the process-wide cache of document digests, sized like the analysis cache."""
+    global _document_cache  # noqa: PLW0603  # pylint: disable=global-statement
+    maxsize = get_app_settings().analysis_cache_size
+    if _document_cache is None:
+        _document_cache = LRUCache("response_cache_document", maxsize)
+    elif _document_cache.maxsize != maxsize:
+        _document_cache.resize(maxsize)
+    return _document_cache
+
+
+def _digest(text):
+    """Return a short hex digest of ``text``."""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def document_digest(query, operation_name=None):
+    """Return the digest of the normalized document, or ``""`` if it is not a cacheable query.
+
+    Digests are cached per source text and operation name, so each distinct
+    document is parsed and printed once.
+
+    Args:
+        query (str): The GraphQL document.
+        operation_name (str): The operation of the document to execute.
+
+    Returns:
+        str: The digest, empty for mutations, subscriptions and invalid documents.
+    """
+    cache = _get_document_cache()
+    key = (query, operation_name)
+    digest = cache.get(key)
+    if digest is None:
+        try:
+            document = parse(query)
+        except GraphQLError:
+            digest = ""
+        else:
+            operation = get_operation_ast(document, operation_name)
+            if operation is None or operation.operation != OperationType.QUERY:
+                digest = ""
+            else:
+                digest = _digest(f"{operation_name or ''}\n{print_ast(document)}")
+        cache.set(key, digest)
+    return digest
+
+
+def permission_key(user):
+    """Return a key shared by every user with the same permission set as ``user``.
+
+    Args:
+        user: The requesting user.
+
+    Returns:
+        str: ``"anonymous"``, ``"superuser"`` or the serialized object permissions of the user.
+    """
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+
+    from nautobot.core.authentication import ObjectPermissionBackend  # pylint: disable=import-outside-toplevel
+
+    permissions = ObjectPermissionBackend().get_all_permissions(user)
+    key = json.dumps(
+        {
+            name: sorted(json.dumps(constraint, sort_keys=True, default=str) for constraint in constraints)
+            for name, constraints in permissions.items()
+        },
+        sort_keys=True,
+    )
+    if "$user" in key:
+        key = f"{user.pk}:{key}"
+    return key
+
+
+def _generation(cache):
+    """Return the current generation of the response cache, starting one if there is none."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        if not cache.add(GENERATION_KEY, generation, None):
+            generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def get_response_cache_key(request, query, variables, operation_name, cache):
+    """Return the cache key of a GraphQL request, or None if its response cannot be cached.
+
+    Args:
+        request: The DRF request.
+        query (str): The GraphQL document.
+        variables (dict): The variables of the operation.
+        operation_name (str): The operation of the document to execute.
+        cache: The Django cache holding the responses.
+    """
+    digest = document_digest(query, operation_name) if query else ""
+    if not digest:
+        return None
+    material = json.dumps([digest, variables or {}, permission_key(request.user)], sort_keys=True, default=str)
+    return f"{KEY_PREFIX}:{_generation(cache)}:{_digest(material)}"
+
+
+def get_cached_response(request, data, get_response, config):
+    """Return the response of a GraphQL API request from the cache, or compute and store it.
+
+    Args:
+        request: The DRF request.
+        data (dict): Parsed body of the request.
+        get_response (callable): ``GraphQLDRFAPIView.get_response``, bound to the view.
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        tuple: The ``(result, status_code)`` pair returned by ``get_response``.
+    """
+    cache = caches[config.response_cache_alias]
+    try:
+        query, variables, operation_name, _ = GraphQLView.get_graphql_params(request, data)
+    except HttpError:
+        key = None
+    else:
+        key = get_response_cache_key(request, query, variables, operation_name, cache)
+    if key is None:
+        graphql_response_cache_requests_total.labels(result="bypass").inc()
+        return get_response(request, data)
+
+    entry = cache.get(key)
+    if entry is not None:
+        result, status_code, duration = entry
+        graphql_response_cache_requests_total.labels(result="hit").inc()
+        graphql_response_cache_saved_seconds_total.inc(duration)
+        return result, status_code
+
+    start_time = time.monotonic()
+    result, status_code = get_response(request, data)
+    duration = time.monotonic() - start_time
+    graphql_response_cache_requests_total.labels(result="miss").inc()
+    if status_code == 200 and result is not None and "errors" not in result:
+        cache.set(key, (result, status_code, duration), config.response_cache_ttl)
+    return result, status_code
+
+
+def _start_generation(alias):
+    """Start a new generation of the response cache, orphaning every stored response."""
+    caches[alias].set(GENERATION_KEY, time.time_ns(), None)
+    graphql_response_cache_invalidations_total.inc()
+
+
+@receiver(post_save, dispatch_uid="nautobot_graphql_observability.response_cache.save")
+@receiver(post_delete, dispatch_uid="nautobot_graphql_observability.response_cache.delete")
+@receiver(m2m_changed, dispatch_uid="nautobot_graphql_observability.response_cache.m2m")
+def invalidate_response_cache(sender, instance, raw=False, using=None, **kwargs):  # pylint: disable=unused-argument
+    """Invalidate the response cache once the transaction changing a change-logged object commits.
+
+    Objects without change logging (sessions, tokens, change records...) do
+    not invalidate the cache.
+    """
+    if raw or not hasattr(instance, "to_objectchange"):
+        return
+    action = kwargs.get("action")
+    if action is not None and not action.startswith("post_"):
+        return
+    config = get_app_settings()
+    if config.response_cache_enabled:
+        transaction.on_commit(partial(_start_generation, config.response_cache_alias), using=using)
@@ -0,0 +1,99 @@
+"""Head sampling of operations for per-field resolver timing.
+
+Per-field timing (``track_field_resolution``) is expensive under load, so the
+decision to time the fields of an operation is taken once, when its first root
+field is resolved, and only sampled operations pay for it. An operation is
+sampled when:
+
+1. a random draw falls under its sampling rate, taken from
+   ``field_resolution_sample_rates`` for its operation name or from
+   ``field_resolution_sample_rate`` otherwise, and
+2. the per-worker token bucket allows it, when
+   ``field_resolution_max_traced_per_second`` is set.
+"""
+
+import random
+import threading
+import time
+
+_sampler = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens per second.
+
+    Args:
+        rate (float): Tokens added per second, also the bucket capacity (one second of burst).
+    """
+
+    def __init__(self, rate):
+        """Initialize a full bucket."""
+        self.rate = float(rate)
+        self.capacity = max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take one token if available.
+
+        Returns:
+            bool: True if a token was taken, False if the bucket is empty.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class FieldSampler:
+    """Decide which operations get per-field resolver timing.
+
+    Args:
+        sample_rate (float): Default probability of sampling an operation, between 0 and 1.
+        sample_rates (Mapping): Per-operation-name probabilities overriding ``sample_rate``.
+        max_per_second (float): Maximum number of sampled operations per second in
+            this worker, or ``0`` for no cap.
+    """
+
+    def __init__(self, sample_rate=1.0, sample_rates=None, max_per_second=0):
+        """Initialize the sampler and its token bucket."""
+        self.sample_rate = sample_rate
+        self.sample_rates = sample_rates or {}
+        self.bucket = TokenBucket(max_per_second) if max_per_second > 0 else None
+
+    def should_sample(self, operation_name):
+        """Return whether the fields of the named operation should be timed."""
+        rate = self.sample_rates.get(operation_name, self.sample_rate)
+        if rate <= 0.0:
+            return False
+        if rate < 1.0 and random.random() >= rate:  # noqa: S311
+            return False
+        return self.bucket is None or self.bucket.try_acquire()
+
+
+def get_field_sampler(config):
+    """Return the worker-wide :class:`FieldSampler` for the given app settings.
+
+    The sampler, and therefore its token bucket, is rebuilt only when the
+    settings snapshot changes.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    global _sampler  # noqa: PLW0603  # pylint: disable=global-statement
+    sampler = _sampler
+    if sampler is None or sampler[0] is not config:
+        sampler = _sampler = (
+            config,
+            FieldSampler(
+                sample_rate=config.field_resolution_sample_rate,
+                sample_rates=config.field_resolution_sample_rates,
+                max_per_second=config.field_resolution_max_traced_per_second,
+            ),
+        )
+    return sampler[1]
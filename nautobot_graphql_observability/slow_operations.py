@@ -0,0 +1,334 @@
+"""Ring buffer of the latest slow GraphQL operations, shared by the workers of a host.
+
+The query log only helps when someone searches it. With
+``slow_operations_enabled``, every operation taking at least
+``slow_operation_threshold_ms`` is also written to a :class:`SlowOperationBuffer`:
+a fixed-size ring of ``slow_operation_buffer_size`` records in a memory-mapped
+file (``slow_operation_buffer_path``, by default in ``NAUTOBOT_ROOT``), so
+every worker process of the host writes to and reads from the same buffer.
+The app's *Slow Operations* view lists its content.
+
+The file holds query text, and opening it may reset it: it is created
+readable by its owner only, and a symlink, a file of another user or a file
+accessible to other users is refused rather than written to.
+
+The file starts with a header holding its layout and the sequence number of
+the last record written, followed by fixed-size records. Each record holds
+the operation type, name, user, duration, depth, complexity and the query
+text, truncated to ``slow_operation_query_length`` bytes.
+
+Writers only serialize to claim a slot: the sequence number is incremented
+under a lock of its 8 bytes in the file (and a thread lock, as file locks
+are per process). The record itself is written lock-free, seqlock style: its
+sequence field is cleared, the record packed in place with a precompiled
+:class:`struct.Struct`, then the sequence field set. Readers skip records
+whose sequence changed while they were read. Operations under the threshold
+only pay for a comparison.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import stat
+import struct
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from django.conf import settings
+
+from nautobot_graphql_observability.utils import get_request_username
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GQLSLOW1"
+DEFAULT_BUFFER_FILENAME = "nautobot_graphql_slow_operations.bin"
+
+# Sizes of the fixed-length text fields of a record, in bytes.
+OPERATION_TYPE_LENGTH = 16
+OPERATION_NAME_LENGTH = 128
+USER_LENGTH = 64
+
+# magic, record size, capacity, query length, padding, last sequence number.
+_HEADER = struct.Struct("<8sIII4xQ")
+_SEQUENCE = struct.Struct("<Q")
+_LAST_SEQUENCE_OFFSET = _HEADER.size - _SEQUENCE.size
+
+_buffer = None
+
+
+class SlowOperation(NamedTuple):
+    """One slow operation read back from the buffer."""
+
+    sequence: int
+    timestamp: float
+    duration: float
+    operation_type: str
+    operation_name: str
+    user: str
+    depth: int
+    complexity: int
+    query: str
+
+    @property
+    def recorded_at(self):
+        """Return the end of the operation as an aware datetime."""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+
+    @property
+    def duration_ms(self):
+        """Return the duration of the operation in milliseconds."""
+        return self.duration * 1000
+
+
+def _record_struct(query_length):
+    """Return the struct of a record whose query field holds ``query_length`` bytes."""
+    return struct.Struct(
+        f"<QddII{OPERATION_TYPE_LENGTH}s{OPERATION_NAME_LENGTH}s{USER_LENGTH}s{query_length}s",
+    )
+
+
+def _check_private(fd, path):
+    """Raise PermissionError unless ``fd`` is a regular file of the current user, private to it."""
+    status = os.fstat(fd)
+    if not stat.S_ISREG(status.st_mode) or status.st_uid != os.geteuid() or status.st_mode & 0o077:
+        raise PermissionError(
+            f"{path} must be a regular file owned by the current user, without group or other permissions"
+        )
+
+
+def _decode(value):
+    """Decode a NUL-padded text field, dropping a character cut by truncation."""
+    return value.rstrip(b"\0").decode("utf-8", errors="ignore")
+
+
+class SlowOperationBuffer:
+    """Fixed-size ring of slow operations in a memory-mapped file.
+
+    Opening a file whose layout differs (another capacity or query length)
+    resets it.
+
+    Args:
+        path (str): The buffer file, created if missing.
+        capacity (int): Number of operations kept.
+        query_length (int): Number of bytes of query text kept per operation.
+
+    Raises:
+        OSError: If the file cannot be opened, or is a symlink, not a regular
+            file, owned by another user or accessible to group or others.
+    """
+
+    def __init__(self, path, capacity=1000, query_length=2048):
+        """Open (and create or reset if needed) the buffer file and map it."""
+        self.path = path
+        self.capacity = capacity
+        self._record = _record_struct(query_length)
+        size = _HEADER.size + capacity * self._record.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+        try:
+            _check_private(self._fd, path)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                header = os.pread(self._fd, _HEADER.size, 0)
+                expected = (MAGIC, self._record.size, capacity, query_length)
+                if (
+                    len(header) < _HEADER.size
+                    or _HEADER.unpack(header)[:4] != expected
+                    or os.fstat(self._fd).st_size != size
+                ):
+                    os.ftruncate(self._fd, 0)
+                    os.ftruncate(self._fd, size)
+                    os.pwrite(self._fd, _HEADER.pack(*expected, 0), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._mmap = mmap.mmap(self._fd, size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._close_fd = weakref.finalize(self, os.close, self._fd)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Unmap and close the buffer file; otherwise done when the buffer is garbage collected."""
+        self._mmap.close()
+        self._close_fd()
+
+    def _claim(self):
+        """Return the next sequence number, unique across the workers sharing the file."""
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, _SEQUENCE.size, _LAST_SEQUENCE_OFFSET)
+            try:
+                sequence = _SEQUENCE.unpack_from(self._mmap, _LAST_SEQUENCE_OFFSET)[0] + 1
+                _SEQUENCE.pack_into(self._mmap, _LAST_SEQUENCE_OFFSET, sequence)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, _SEQUENCE.size, _LAST_SEQUENCE_OFFSET)
+        return sequence
+
+    def _offset(self, sequence):
+        """Return the file offset of the slot of ``sequence``."""
+        return _HEADER.size + (sequence - 1) % self.capacity * self._record.size
+
+    def record(self, duration, operation_type, operation_name, user, depth, complexity, query):  # pylint: disable=too-many-arguments
+        """Write one operation over the oldest slot of the ring.
+
+        Text fields longer than their slot are truncated.
+
+        Args:
+            duration (float): Duration of the operation in seconds.
+            operation_type (str): ``query``, ``mutation`` or ``subscription``.
+            operation_name (str): Name of the operation.
+            user (str): Username of the requester.
+            depth (int): Query depth.
+            complexity (int): Query complexity.
+            query (str): Query text.
+        """
+        sequence = self._claim()
+        offset = self._offset(sequence)
+        _SEQUENCE.pack_into(self._mmap, offset, 0)
+        self._record.pack_into(
+            self._mmap,
+            offset,
+            0,
+            time.time(),
+            duration,
+            depth,
+            complexity,
+            operation_type.encode(),
+            operation_name.encode(),
+            user.encode(),
+            query.encode(),
+        )
+        _SEQUENCE.pack_into(self._mmap, offset, sequence)
+
+    def entries(self):
+        """Return the operations in the buffer, most recent first.
+
+        Records being written while they are read are skipped.
+
+        Returns:
+            list[SlowOperation]: The buffered operations.
+        """
+        last = _SEQUENCE.unpack_from(self._mmap, _LAST_SEQUENCE_OFFSET)[0]
+        entries = []
+        for sequence in range(last, max(last - self.capacity, 0), -1):
+            offset = self._offset(sequence)
+            values = self._record.unpack_from(self._mmap, offset)
+            if values[0] != sequence or _SEQUENCE.unpack_from(self._mmap, offset)[0] != sequence:
+                continue
+            entries.append(
+                SlowOperation(
+                    sequence=sequence,
+                    timestamp=values[1],
+                    duration=values[2],
+                    depth=values[3],
+                    complexity=values[4],
+                    operation_type=_decode(values[5]),
+                    operation_name=_decode(values[6]),
+                    user=_decode(values[7]),
+                    query=_decode(values[8]),
+                )
+            )
+        return entries
+
+
+def get_buffer_path(config):
+    """Return the buffer file path: ``slow_operation_buffer_path``, or a file in ``NAUTOBOT_ROOT``.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    return config.slow_operation_buffer_path or os.path.join(settings.NAUTOBOT_ROOT, DEFAULT_BUFFER_FILENAME)
+
+
+def get_slow_operation_buffer(config):
+    """Return the worker's :class:`SlowOperationBuffer` for the given app settings.
+
+    The buffer is opened on first use, in each worker process, and reopened
+    only when the settings snapshot changes. A replaced buffer is closed when
+    the last request using it releases it.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+
+    Returns:
+        SlowOperationBuffer | None: The buffer, or None if its file cannot be opened.
+    """
+    global _buffer  # noqa: PLW0603  # pylint: disable=global-statement
+    buffer = _buffer
+    pid = os.getpid()
+    if buffer is None or buffer[0] is not config or buffer[1] != pid:
+        path = get_buffer_path(config)
+        try:
+            opened = SlowOperationBuffer(path, config.slow_operation_buffer_size, config.slow_operation_query_length)
+        except OSError:
+            logger.exception("Cannot open the slow operation buffer %s", path)
+            opened = None
+        buffer = _buffer = (config, pid, opened)
+    return buffer[2]
+
+
+def record_slow_operation(request, meta, duration, config):
+    """Write the operation to the slow operation buffer if it took at least ``slow_operation_threshold_ms``.
+
+    Args:
+        request: The Django request object.
+        meta (dict): The metadata stashed by ``PrometheusMiddleware``.
+        duration (float): Duration of the request in seconds.
+        config (AppSettings): The current app settings snapshot.
+    """
+    if duration * 1000 < config.slow_operation_threshold_ms:
+        return
+    buffer = get_slow_operation_buffer(config)
+    if buffer is None:
+        return
+
+    analysis = meta.get("analysis")
+    operation = meta.get("operation")
+    query = ""
+    if operation is not None and operation.loc is not None:
+        query = operation.loc.source.body[operation.loc.start : operation.loc.end]
+    buffer.record(
+        duration,
+        meta["operation_type"],
+        analysis.operation_name if analysis is not None else meta["operation_name"],
+        get_request_username(request),
+        analysis.depth if analysis is not None else 0,
+        analysis.complexity if analysis is not None else 0,
+        query,
+    )
+
+
+SORT_FIELDS = ("timestamp", "duration", "operation_type", "operation_name", "user", "depth", "complexity")
+
+
+def select_slow_operations(entries, operation_name="", user="", min_duration_ms=0.0, sort="-timestamp"):
+    """Filter and sort buffered operations.
+
+    Args:
+        entries (list[SlowOperation]): The operations, as returned by :meth:`SlowOperationBuffer.entries`.
+        operation_name (str): Case-insensitive substring of the operation name to keep.
+        user (str): Case-insensitive substring of the username to keep.
+        min_duration_ms (float): Minimum duration to keep, in milliseconds.
+        sort (str): One of :data:`SORT_FIELDS`, prefixed with ``-`` for descending order.
+
+    Returns:
+        list[SlowOperation]: The selected operations.
+    """
+    operation_name = operation_name.lower()
+    user = user.lower()
+    selected = [
+        entry
+        for entry in entries
+        if operation_name in entry.operation_name.lower()
+        and user in entry.user.lower()
+        and entry.duration_ms >= min_duration_ms
+    ]
+    field = sort.lstrip("-")
+    if field not in SORT_FIELDS:
+        field = "timestamp"
+    index = SlowOperation._fields.index(field)
+    selected.sort(key=lambda entry: entry[index], reverse=sort.startswith("-"))
+    return selected
@@ -0,0 +1,72 @@
+"""Tests for the per-document operation analysis cache."""
+
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from graphql import parse
+
+from nautobot_graphql_observability import analysis
+from nautobot_graphql_observability.analysis import analyze_operation
+from nautobot_graphql_observability.cache import LRUCache
+
+
+def _make_info(query_string):
+    """Build a mock GraphQLResolveInfo with a real parsed AST."""
+    doc = parse(query_string)
+    info = MagicMock()
+    info.operation = doc.definitions[0]
+    info.fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
+    return info
+
+
+class AnalyzeOperationTest(TestCase):
+    """Test cases for analyze_operation."""
+
+    def setUp(self):
+        self.cache = LRUCache("test_analysis", 2)
+        patcher = patch.object(analysis, "_analysis_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_named_operation(self):
+        result = analyze_operation(_make_info("query GetDevices { devices { id location { name } } }"))
+
+        self.assertEqual(result.operation_name, "GetDevices")
+        self.assertEqual(result.root_fields, ("devices",))
+        self.assertEqual(result.depth, 3)
+        self.assertEqual(result.complexity, 4)
+
+    def test_anonymous_operation_uses_sorted_root_fields(self):
+        result = analyze_operation(_make_info("{ locations { id } devices { id } }"))
+
+        self.assertEqual(result.operation_name, "devices,locations")
+        self.assertEqual(result.root_fields, ("devices", "locations"))
+
+    def test_repeated_document_is_served_from_cache(self):
+        query = "query Cached { devices { id } }"
+        first = analyze_operation(_make_info(query))
+
+        with patch.object(analysis, "analyze_selection_set") as mock_analyze:
+            second = analyze_operation(_make_info(query))
+
+        mock_analyze.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_operations_of_the_same_document_are_cached_separately(self):
+        query = "query A { devices { id } } query B { locations { id } }"
+        doc = parse(query)
+        info_a = MagicMock(operation=doc.definitions[0], fragments={})
+        info_b = MagicMock(operation=doc.definitions[1], fragments={})
+
+        self.assertEqual(analyze_operation(info_a).operation_name, "A")
+        self.assertEqual(analyze_operation(info_b).operation_name, "B")
+        self.assertEqual(len(self.cache), 2)
+
+    def test_operation_without_location_is_not_cached(self):
+        info = _make_info("{ devices { id } }")
+        info.operation.loc = None
+
+        self.assertEqual(analyze_operation(info).operation_name, "devices")
+        self.assertEqual(len(self.cache), 0)
@@ -0,0 +1,66 @@
+"""Tests for the compiled app settings snapshot."""
+
+from django.test import TestCase, override_settings
+
+from nautobot_graphql_observability.app_settings import AppSettings, get_app_settings
+
+
+class AppSettingsTest(TestCase):
+    """Test cases for AppSettings and get_app_settings."""
+
+    def test_defaults_are_applied(self):
+        config = AppSettings({"track_field_resolution": True})
+
+        self.assertTrue(config.track_field_resolution)
+        self.assertTrue(config.track_query_depth)
+        self.assertFalse(config.query_logging_enabled)
+        self.assertEqual(config.analysis_cache_size, 1000)
+
+    def test_values_are_pre_resolved(self):
+        config = AppSettings({"track_per_user": 0, "analysis_cache_size": "25"})
+
+        self.assertIs(config.track_per_user, False)
+        self.assertEqual(config.analysis_cache_size, 25)
+
+    def test_unknown_drop_policy_falls_back_to_the_default(self):
+        with self.assertLogs("nautobot_graphql_observability.app_settings", level="WARNING"):
+            config = AppSettings({"query_log_queue_drop_policy": "block"})
+
+        self.assertEqual(config.query_log_queue_drop_policy, "drop_newest")
+
+    def test_unknown_query_limits_mode_falls_back_to_off(self):
+        with self.assertLogs("nautobot_graphql_observability.app_settings", level="WARNING"):
+            config = AppSettings({"query_limits_mode": "enforcing"})
+
+        self.assertEqual(config.query_limits_mode, "off")
+        self.assertEqual(AppSettings({"query_limits_mode": "ENFORCE"}).query_limits_mode, "enforce")
+
+    def test_unknown_tracing_exporter_and_protocol_fall_back_to_the_defaults(self):
+        with self.assertLogs("nautobot_graphql_observability.app_settings", level="WARNING") as logs:
+            config = AppSettings({"tracing_exporter": "zipkin", "tracing_otlp_protocol": "https"})
+
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(config.tracing_exporter, "otlp")
+        self.assertEqual(config.tracing_otlp_protocol, "grpc")
+        self.assertEqual(AppSettings({"tracing_otlp_protocol": "HTTP"}).tracing_otlp_protocol, "http")
+
+    def test_snapshot_is_immutable(self):
+        config = AppSettings()
+
+        with self.assertRaises(AttributeError):
+            config.track_per_user = False
+        with self.assertRaises(AttributeError):
+            config.unknown = True
+
+    def test_snapshot_is_shared(self):
+        self.assertIs(get_app_settings(), get_app_settings())
+
+    def test_snapshot_is_rebuilt_on_setting_change(self):
+        before = get_app_settings()
+
+        with override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"track_per_user": False}}):
+            overridden = get_app_settings()
+            self.assertIsNot(overridden, before)
+            self.assertFalse(overridden.track_per_user)
+
+        self.assertTrue(get_app_settings().track_per_user)
@@ -0,0 +1,55 @@
+"""Tests for the LRUCache used by the app's hot paths."""
+
+from django.test import TestCase
+
+from nautobot_graphql_observability.cache import LRUCache
+from nautobot_graphql_observability.metrics import graphql_internal_cache_events_total
+
+
+class LRUCacheTest(TestCase):
+    """Test cases for LRUCache."""
+
+    def test_hit_and_miss_are_counted(self):
+        cache = LRUCache("test_hit_miss", 2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(graphql_internal_cache_events_total.labels(cache="test_hit_miss", event="hit")._value.get(), 1)
+        self.assertEqual(
+            graphql_internal_cache_events_total.labels(cache="test_hit_miss", event="miss")._value.get(), 1
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache("test_eviction", 2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(
+            graphql_internal_cache_events_total.labels(cache="test_eviction", event="eviction")._value.get(), 1
+        )
+
+    def test_resize_evicts_oldest_entries(self):
+        cache = LRUCache("test_resize", 3)
+        for key in "abc":
+            cache.set(key, key)
+        cache.resize(1)
+
+        self.assertEqual(len(cache), 1)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.evictions, 2)
+
+    def test_zero_size_disables_storage(self):
+        cache = LRUCache("test_disabled", 0)
+        cache.set("a", 1)
+
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("a"))
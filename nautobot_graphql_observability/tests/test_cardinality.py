@@ -0,0 +1,70 @@
+"""Tests for the metric label cardinality guard."""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from prometheus_client import CollectorRegistry, Counter
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.cardinality import OVERFLOW_LABEL_VALUE, LabelLimiter, get_label_limiters
+from nautobot_graphql_observability.metrics import graphql_label_values_folded_total
+
+
+class LabelLimiterTest(TestCase):
+    """Test cases for LabelLimiter."""
+
+    def test_values_beyond_the_limit_are_folded(self):
+        limiter = LabelLimiter("test_fold", 2)
+        folded_before = graphql_label_values_folded_total.labels(label="test_fold")._value.get()
+
+        self.assertEqual(limiter.admit("a"), "a")
+        self.assertEqual(limiter.admit("b"), "b")
+        self.assertEqual(limiter.admit("c"), OVERFLOW_LABEL_VALUE)
+        self.assertEqual(limiter.admit("a"), "a")
+
+        self.assertEqual(graphql_label_values_folded_total.labels(label="test_fold")._value.get() - folded_before, 1)
+
+    def test_allowlisted_values_are_always_admitted(self):
+        limiter = LabelLimiter("test_allowlist", 1, allowlist=["GetDevices"])
+        limiter.admit("a")
+
+        self.assertEqual(limiter.admit("GetDevices"), "GetDevices")
+        self.assertEqual(len(limiter), 1)
+
+    def test_zero_limit_disables_the_guard(self):
+        limiter = LabelLimiter("test_unlimited", 0)
+        self.assertEqual([limiter.admit(str(i)) for i in range(10)], [str(i) for i in range(10)])
+
+    @patch("nautobot_graphql_observability.cardinality.time.monotonic")
+    def test_idle_least_recently_used_value_is_evicted(self, mock_monotonic):
+        counter = Counter("test_lru_total", "Test", ["operation_name", "status"], registry=CollectorRegistry())
+        counter.labels(operation_name="a", status="success").inc()
+        counter.labels(operation_name="b", status="success").inc()
+        limiter = LabelLimiter("operation_name", 2, idle_seconds=60, metrics=[counter])
+
+        mock_monotonic.return_value = 0.0
+        limiter.admit("a")
+        limiter.admit("b")
+        mock_monotonic.return_value = 30.0
+        limiter.admit("b")
+        self.assertEqual(limiter.admit("c"), OVERFLOW_LABEL_VALUE)
+
+        mock_monotonic.return_value = 61.0
+        self.assertEqual(limiter.admit("c"), "c")
+        self.assertNotIn(("a", "success"), counter._metrics)
+        self.assertIn(("b", "success"), counter._metrics)
+
+    def test_limiters_follow_settings(self):
+        config = AppSettings({"max_operation_name_labels": 7, "max_user_labels": 3})
+        limiters = get_label_limiters(config)
+
+        self.assertEqual(limiters.operation_name.max_values, 7)
+        self.assertEqual(limiters.user.max_values, 3)
+        self.assertIs(get_label_limiters(config).operation_name, limiters.operation_name)
+
+    @patch("nautobot_graphql_observability.cardinality.is_multiprocess_enabled", return_value=True)
+    def test_values_are_never_evicted_in_multiprocess_mode(self, _):
+        limiters = get_label_limiters(AppSettings({"label_idle_seconds": 0}))
+
+        self.assertEqual(limiters.operation_name.idle_seconds, float("inf"))
+        self.assertEqual(limiters.user.idle_seconds, float("inf"))
@@ -0,0 +1,137 @@
+"""Tests for the schema-aware query cost estimator."""
+
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+from graphql import build_schema, parse
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.cost import FieldWeightIndex, estimate_query_cost, get_field_weight_index
+
+SCHEMA = build_schema("""
+    type Query {
+        devices(limit: Int, offset: Int): [Device!]!
+        device(id: ID): Device
+        tenants(first: Int): [Tenant]
+    }
+
+    interface Named {
+        name: String
+    }
+
+    type Device implements Named {
+        name: String
+        interfaces: [Interface]
+        tenant: Tenant
+    }
+
+    type Interface implements Named {
+        name: String
+    }
+
+    type Tenant implements Named {
+        name: String
+    }
+""")
+
+
+def _estimate(query, variables=None, **kwargs):
+    document = parse(query)
+    operation = document.definitions[0]
+    fragments = {definition.name.value: definition for definition in document.definitions[1:]}
+    return FieldWeightIndex(SCHEMA, **kwargs).estimate(operation, fragments, variables)
+
+
+class FieldWeightIndexTest(TestCase):
+    """Test cases for FieldWeightIndex."""
+
+    def test_index_records_list_fields_and_size_arguments(self):
+        index = FieldWeightIndex(SCHEMA)
+
+        self.assertTrue(index.types["Query"]["devices"].is_list)
+        self.assertEqual(index.types["Query"]["devices"].size_arguments, ("limit",))
+        self.assertEqual(index.types["Query"]["devices"].type_name, "Device")
+        self.assertFalse(index.types["Query"]["device"].is_list)
+        self.assertEqual(index.types["Query"]["tenants"].size_arguments, ("first",))
+
+    def test_scalar_fields_cost_one(self):
+        self.assertEqual(_estimate("{ device { name tenant { name } } }"), 4)
+
+    def test_list_size_argument_multiplies_the_sub_selection(self):
+        self.assertEqual(_estimate("{ devices(limit: 10) { name } }"), 11)
+        self.assertEqual(_estimate("{ tenants(first: 3) { name } }"), 4)
+
+    def test_default_list_size_applies_without_size_argument(self):
+        self.assertEqual(_estimate("{ devices { name } }", default_list_size=50), 51)
+        self.assertEqual(_estimate("{ devices(limit: 10) { name interfaces { name } } }"), 1021)
+
+    def test_size_argument_from_variables(self):
+        query = "query Q($n: Int) { devices(limit: $n) { name } }"
+
+        self.assertEqual(_estimate(query, {"n": 5}), 6)
+        self.assertEqual(_estimate(query, {}, default_list_size=7), 8)
+
+    def test_field_weight_overrides(self):
+        cost = _estimate("{ devices(limit: 2) { name } }", field_weights={"Query.devices": 10, "Device.name": 3})
+
+        self.assertEqual(cost, 10 + 2 * 3)
+
+    def test_fragments_and_inline_fragments(self):
+        query = """
+            { devices(limit: 2) { ...DeviceFields ... on Named { name } } }
+            fragment DeviceFields on Device { interfaces(limit: 1) { name } }
+        """
+
+        self.assertEqual(_estimate(query), 1 + 2 * (1 + 100 * 1) + 2 * 1)
+
+    def test_fragment_fan_out_is_costed_once_per_fragment(self):
+        # Each fragment spreads the next one twice: expanding them in place would take 2**40 steps.
+        levels = 40
+        fragments = " ".join(
+            f"fragment F{level} on Device {{ name ...F{level + 1} ...F{level + 1} }}" for level in range(levels)
+        )
+        query = f"{{ device {{ ...F0 }} }} {fragments} fragment F{levels} on Device {{ name }}"
+
+        self.assertEqual(_estimate(query), 1 + 2 ** (levels + 1) - 1)
+
+    def test_typename_is_free(self):
+        self.assertEqual(_estimate("{ device { __typename name } }"), 2)
+
+    def test_static_estimates_are_cached(self):
+        index = FieldWeightIndex(SCHEMA)
+        operation = parse("{ devices { name } }").definitions[0]
+
+        index.estimate(operation, {})
+        index.estimate(operation, {})
+
+        self.assertEqual(index._costs.hits, 1)
+
+    def test_variable_dependent_estimates_are_not_cached(self):
+        index = FieldWeightIndex(SCHEMA)
+        operation = parse("query Q($n: Int) { devices(limit: $n) { name } }").definitions[0]
+
+        self.assertEqual(index.estimate(operation, {}, {"n": 1}), 2)
+        self.assertEqual(index.estimate(operation, {}, {"n": 2}), 3)
+        self.assertEqual(len(index._costs), 0)
+
+
+class EstimateQueryCostTest(TestCase):
+    """Test cases for estimate_query_cost."""
+
+    def test_estimates_the_executed_operation(self):
+        info = MagicMock()
+        info.schema = SCHEMA
+        info.operation = parse("{ devices(limit: 4) { name } }").definitions[0]
+        info.fragments = {}
+        info.variable_values = {}
+
+        self.assertEqual(estimate_query_cost(info, AppSettings()), 5)
+
+    def test_index_follows_schema_and_settings(self):
+        config = AppSettings({"query_cost_default_list_size": 9, "query_cost_field_weights": {"Device.name": 2}})
+        index = get_field_weight_index(SCHEMA, config)
+
+        self.assertEqual(index.default_list_size, 9)
+        self.assertEqual(index.types["Device"]["name"].weight, 2.0)
+        self.assertIs(get_field_weight_index(SCHEMA, config), index)
+        self.assertIsNot(get_field_weight_index(SCHEMA, AppSettings()), index)
@@ -0,0 +1,48 @@
+"""Tests for the SQL statement attribution."""
+
+from unittest.mock import MagicMock
+
+from django.db import connection
+from django.test import TestCase
+
+from nautobot_graphql_observability.db_tracking import QueryStatsWrapper, execute_wrappers
+
+
+class QueryStatsWrapperTest(TestCase):
+    """Test cases for QueryStatsWrapper."""
+
+    def test_counts_statements_time_and_rows(self):
+        wrapper = QueryStatsWrapper()
+        execute = MagicMock(return_value="result")
+
+        result = wrapper(execute, "SELECT 1", (), False, {"cursor": MagicMock(rowcount=7)})
+        wrapper(execute, "SELECT 2", (), False, {"cursor": MagicMock(rowcount=-1)})
+
+        self.assertEqual(result, "result")
+        self.assertEqual(wrapper.queries, 2)
+        self.assertEqual(wrapper.rows, 7)
+        self.assertGreaterEqual(wrapper.duration, 0)
+
+    def test_failed_statements_are_counted(self):
+        wrapper = QueryStatsWrapper()
+        execute = MagicMock(side_effect=RuntimeError("boom"))
+
+        with self.assertRaises(RuntimeError):
+            wrapper(execute, "SELECT 1", (), False, {"cursor": MagicMock(rowcount=-1)})
+
+        self.assertEqual(wrapper.queries, 1)
+
+
+class ExecuteWrappersTest(TestCase):
+    """Test cases for execute_wrappers."""
+
+    def test_tracks_statements_inside_the_block_only(self):
+        stats = QueryStatsWrapper()
+        with execute_wrappers(stats):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+        self.assertEqual(stats.queries, 1)
+        self.assertEqual(connection.execute_wrappers, [])
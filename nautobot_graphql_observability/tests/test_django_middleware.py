@@ -2,8 +2,11 @@
 
 from unittest.mock import MagicMock
 
-from django.test import RequestFactory, TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from graphql.pyutils import Path
 
+from nautobot_graphql_observability.db_tracking import QueryStatsWrapper
 from nautobot_graphql_observability.django_middleware import (
     GraphQLObservabilityDjangoMiddleware,
     _record_observability,
@@ -12,11 +15,14 @@ from nautobot_graphql_observability.logging_middleware import (
     _REQUEST_ATTR as _LOGGING_ATTR,
 )
 from nautobot_graphql_observability.metrics import (
+    graphql_db_queries,
     graphql_request_duration_seconds,
+    graphql_requests_total,
 )
 from nautobot_graphql_observability.middleware import (
     _REQUEST_ATTR as _PROM_ATTR,
 )
+from nautobot_graphql_observability.n_plus_one import _REQUEST_ATTR as _N_PLUS_ONE_ATTR
 
 
 class GraphQLObservabilityDjangoMiddlewareTest(TestCase):
@@ -68,6 +74,46 @@ class GraphQLObservabilityDjangoMiddlewareTest(TestCase):
         after = graphql_request_duration_seconds.labels(operation_type="query", operation_name="UIPathTest")._sum.get()
         self.assertGreater(after, before)
 
+    def test_sql_statements_are_attributed_to_the_operation(self):
+        def run_queries(request):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.execute("SELECT 2")
+            return MagicMock(status_code=200)
+
+        middleware = GraphQLObservabilityDjangoMiddleware(run_queries)
+        request = self.factory.post("/api/graphql/")
+        setattr(request, _PROM_ATTR, {"operation_type": "query", "operation_name": "DBTest"})
+        before = graphql_db_queries.labels(operation_name="DBTest")._sum.get()
+
+        middleware(request)
+
+        self.assertEqual(graphql_db_queries.labels(operation_name="DBTest")._sum.get() - before, 2)
+        self.assertEqual(getattr(request, _PROM_ATTR)["db_stats"].queries, 2)
+
+    @override_settings(
+        PLUGINS_CONFIG={"nautobot_graphql_observability": {"detect_n_plus_one": True, "n_plus_one_threshold": 2}}
+    )
+    def test_n_plus_one_findings_reach_the_log(self):
+        def run_queries(request):
+            detector = getattr(request, _N_PLUS_ONE_ATTR)
+            for index in range(3):
+                detector.path = Path(Path(Path(None, "devices", None), index, None), "interfaces", None)
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT %s", [index])
+            return MagicMock(status_code=200)
+
+        middleware = GraphQLObservabilityDjangoMiddleware(run_queries)
+        request = self.factory.post("/api/graphql/")
+        setattr(request, _LOGGING_ATTR, {"operation_type": "query", "operation_name": "NPlusOne", "user": "admin"})
+
+        with self.assertLogs("nautobot_graphql_observability.graphql_query_log", level="INFO") as logs:
+            middleware(request)
+
+        self.assertEqual(
+            logs.records[0].n_plus_one, [{"path": "devices.interfaces", "statements": 3, "template": "SELECT ?"}]
+        )
+
     def test_no_stashed_metadata_is_safe(self):
         request = self.factory.post("/api/graphql/")
         # No metadata stashed — should not raise
@@ -94,6 +140,38 @@ class RecordObservabilityTest(TestCase):
         after = graphql_request_duration_seconds.labels(operation_type="query", operation_name="PromTest")._sum.get()
         self.assertAlmostEqual(after - before, 0.123, places=3)
 
+    def test_records_request_counter_once(self):
+        request = MagicMock()
+        setattr(
+            request,
+            _PROM_ATTR,
+            {"operation_type": "query", "operation_name": "CounterTest", "error": True},
+        )
+        delattr(request, _LOGGING_ATTR)
+
+        before = graphql_requests_total.labels(
+            operation_type="query", operation_name="CounterTest", status="error"
+        )._value.get()
+
+        _record_observability(request, 0.010)
+
+        after = graphql_requests_total.labels(
+            operation_type="query", operation_name="CounterTest", status="error"
+        )._value.get()
+        self.assertEqual(after - before, 1)
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"graphql_metrics_enabled": False}})
+    def test_metrics_disabled_records_nothing(self):
+        request = MagicMock()
+        setattr(request, _PROM_ATTR, {"operation_type": "query", "operation_name": "DisabledTest"})
+        delattr(request, _LOGGING_ATTR)
+        counter = graphql_requests_total.labels(operation_type="query", operation_name="DisabledTest", status="success")
+        before = counter._value.get()
+
+        _record_observability(request, 0.010)
+
+        self.assertEqual(counter._value.get(), before)
+
     def test_emits_log(self):
         request = MagicMock()
         delattr(request, _PROM_ATTR)
@@ -109,3 +187,17 @@ class RecordObservabilityTest(TestCase):
 
         self.assertEqual(len(logs.output), 1)
         self.assertEqual(logs.records[0].duration_ms, 50.0)
+
+    def test_log_includes_db_stats(self):
+        request = MagicMock()
+        delattr(request, _PROM_ATTR)
+        setattr(request, _LOGGING_ATTR, {"operation_type": "query", "operation_name": "LogDBTest", "user": "admin"})
+        db_stats = QueryStatsWrapper()
+        db_stats.queries, db_stats.duration, db_stats.rows = 3, 0.0123, 42
+
+        with self.assertLogs("nautobot_graphql_observability.graphql_query_log", level="INFO") as logs:
+            _record_observability(request, 0.050, db_stats)
+
+        self.assertEqual(logs.records[0].db_queries, 3)
+        self.assertEqual(logs.records[0].db_time_ms, 12.3)
+        self.assertEqual(logs.records[0].db_rows, 42)
@@ -0,0 +1,94 @@
+"""Tests for the cache of parsed and validated GraphQL documents."""
+
+from django.test import TestCase, override_settings
+from graphql import GraphQLSyntaxError, build_schema
+from nautobot.core.api import views
+
+from nautobot_graphql_observability.document_cache import _get_caches, parse_document, validate_document
+from nautobot_graphql_observability.metrics import (
+    graphql_document_parse_duration_seconds,
+    graphql_document_validation_duration_seconds,
+)
+
+SCHEMA = build_schema("type Query { devices: [Device] } type Device { name: String }")
+OTHER_SCHEMA = build_schema("type Query { locations: [String] }")
+
+
+def _observations(histogram):
+    """Return the number of observations of an unlabelled histogram."""
+    return next(sample.value for sample in histogram.collect()[0].samples if sample.name.endswith("_count"))
+
+
+class ParseDocumentTest(TestCase):
+    """Test cases for parse_document."""
+
+    def setUp(self):
+        for cache in _get_caches():
+            cache.clear()
+
+    def test_documents_are_parsed_once(self):
+        parses = _observations(graphql_document_parse_duration_seconds)
+
+        first = parse_document("{ devices { name } }")
+        second = parse_document("{ devices { name } }")
+
+        self.assertIs(first, second)
+        self.assertEqual(_observations(graphql_document_parse_duration_seconds) - parses, 1)
+
+    def test_syntax_errors_are_raised_and_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(GraphQLSyntaxError):
+                parse_document("{ devices {")
+
+        self.assertNotIn("{ devices {", _get_caches()[0])
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"document_cache_size": 0}})
+    def test_zero_size_disables_the_cache(self):
+        self.assertIsNot(parse_document("{ devices { name } }"), parse_document("{ devices { name } }"))
+
+
+class ValidateDocumentTest(TestCase):
+    """Test cases for validate_document."""
+
+    def setUp(self):
+        for cache in _get_caches():
+            cache.clear()
+
+    def test_documents_are_validated_once_per_schema(self):
+        validations = _observations(graphql_document_validation_duration_seconds)
+        document = parse_document("{ devices { name } }")
+
+        self.assertEqual(validate_document(SCHEMA, document), [])
+        self.assertEqual(validate_document(SCHEMA, document), [])
+        self.assertEqual(len(validate_document(OTHER_SCHEMA, document)), 1)
+
+        self.assertEqual(_observations(graphql_document_validation_duration_seconds) - validations, 2)
+
+    def test_validation_errors_are_cached(self):
+        document = parse_document("{ devices { serial } }")
+
+        first = validate_document(SCHEMA, document)
+        second = validate_document(SCHEMA, document)
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual([error.message for error in second], [error.message for error in first])
+
+    def test_max_errors_is_part_of_the_key(self):
+        document = parse_document("{ devices { serial model } }")
+
+        errors = validate_document(SCHEMA, document)
+        truncated = validate_document(SCHEMA, document, max_errors=1)
+
+        self.assertNotIn("Too many validation errors", errors[-1].message)
+        self.assertIn("Too many validation errors", truncated[-1].message)
+
+
+class PatchTest(TestCase):
+    """Test cases for the patch of Nautobot's GraphQL API view."""
+
+    def test_api_view_parses_through_the_cache(self):
+        document = views.parse("{ devices { name } }")
+
+        self.assertIs(views.parse("{ devices { name } }"), document)
+        self.assertEqual(views.validate(SCHEMA, document), [])
+        self.assertIn((SCHEMA, "{ devices { name } }", None, None), _get_caches()[1])
@@ -0,0 +1,72 @@
+"""Tests for the cached rendering of the app metrics."""
+
+import gzip
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from nautobot_graphql_observability.exposition import AppMetricsCollector, clear_rendered_metrics, render_metrics
+from nautobot_graphql_observability.metrics import graphql_metrics_render_duration_seconds, graphql_requests_total
+
+
+class RenderMetricsTest(TestCase):
+    """Test cases for render_metrics."""
+
+    def setUp(self):
+        clear_rendered_metrics()
+        self.addCleanup(clear_rendered_metrics)
+        graphql_requests_total.labels(operation_type="query", operation_name="Exposed", status="success").inc()
+
+    def test_renders_only_app_metrics(self):
+        body, content_type, encoding = render_metrics("text/plain", "", ttl=0)
+
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIsNone(encoding)
+        self.assertIn(b'graphql_requests_total{operation_name="Exposed"', body)
+        self.assertNotIn(b"python_gc_objects_collected_total", body)
+        self.assertNotIn(b"process_cpu_seconds_total", body)
+
+    def test_openmetrics_negotiation(self):
+        body, content_type, _ = render_metrics("application/openmetrics-text; version=1.0.0", "", ttl=0)
+
+        self.assertTrue(content_type.startswith("application/openmetrics-text"))
+        self.assertTrue(body.endswith(b"# EOF\n"))
+
+    def test_gzip_encoding(self):
+        body, _, encoding = render_metrics("text/plain", "gzip, deflate", ttl=0)
+
+        self.assertEqual(encoding, "gzip")
+        self.assertIn(b"graphql_requests_total", gzip.decompress(body))
+
+    def test_render_is_reused_within_ttl(self):
+        first, _, _ = render_metrics("text/plain", "", ttl=60)
+        graphql_requests_total.labels(operation_type="query", operation_name="AfterRender", status="success").inc()
+        second, _, _ = render_metrics("text/plain", "", ttl=60)
+
+        self.assertIs(first, second)
+        self.assertNotIn(b"AfterRender", second)
+
+    def test_expired_render_is_refreshed(self):
+        with patch("nautobot_graphql_observability.exposition.time.monotonic", side_effect=[0.0, 100.0, 100.0]):
+            render_metrics("text/plain", "", ttl=5)
+            graphql_requests_total.labels(operation_type="query", operation_name="Refreshed", status="success").inc()
+            body, _, _ = render_metrics("text/plain", "", ttl=5)
+
+        self.assertIn(b"Refreshed", body)
+
+    def test_render_time_is_observed(self):
+        before = sum(bucket.get() for bucket in graphql_metrics_render_duration_seconds._buckets)
+        render_metrics("text/plain", "", ttl=0)
+        after = sum(bucket.get() for bucket in graphql_metrics_render_duration_seconds._buckets)
+
+        self.assertEqual(after - before, 1)
+
+
+class AppMetricsCollectorTest(TestCase):
+    """Test cases for AppMetricsCollector."""
+
+    def test_discovers_app_metric_families(self):
+        collector = AppMetricsCollector()
+
+        self.assertIn("graphql_requests", collector.family_names)
+        self.assertIn("graphql_metrics_render_duration_seconds", collector.family_names)
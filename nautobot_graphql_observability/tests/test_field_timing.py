@@ -0,0 +1,77 @@
+"""Tests for the request-local per-field timing buffer."""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from prometheus_client import CollectorRegistry, Histogram
+
+from nautobot_graphql_observability.field_timing import FieldTimingBuffer
+
+
+class FieldTimingBufferTest(TestCase):
+    """Test cases for FieldTimingBuffer."""
+
+    def setUp(self):
+        self.histogram = Histogram(
+            "test_field_timing_seconds",
+            "Test histogram",
+            ["type_name", "field_name"],
+            buckets=[0.1, 1.0],
+            registry=CollectorRegistry(),
+        )
+
+    def _bucket_counts(self, type_name, field_name):
+        return [bucket.get() for bucket in self.histogram.labels(type_name=type_name, field_name=field_name)._buckets]
+
+    def test_observations_are_buffered_until_flush(self):
+        buffer = FieldTimingBuffer(self.histogram)
+        buffer.observe("Device", "name", 0.05)
+
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(self._bucket_counts("Device", "name"), [0, 0, 0])
+
+    def test_flush_matches_direct_observations(self):
+        reference = Histogram("test_reference_seconds", "Reference", buckets=[0.1, 1.0], registry=CollectorRegistry())
+        buffer = FieldTimingBuffer(self.histogram)
+        durations = [0.05, 0.1, 0.5, 1.0, 3.0, 0.01]
+        for duration in durations:
+            buffer.observe("Device", "name", duration)
+            reference.observe(duration)
+
+        buffer.flush()
+
+        child = self.histogram.labels(type_name="Device", field_name="name")
+        self.assertEqual([bucket.get() for bucket in child._buckets], [bucket.get() for bucket in reference._buckets])
+        self.assertAlmostEqual(child._sum.get(), sum(durations))
+        self.assertEqual(len(buffer), 0)
+
+    def test_memory_does_not_grow_with_observations(self):
+        buffer = FieldTimingBuffer(self.histogram)
+        for _ in range(5000):
+            buffer.observe("Device", "name", 0.05)
+
+        self.assertEqual(len(buffer._entries[("Device", "name")]), 4)
+
+    def test_durations_are_observed_without_bucket_bounds(self):
+        with patch.object(self.histogram, "_upper_bounds", None):
+            buffer = FieldTimingBuffer(self.histogram)
+        for duration in (0.05, 0.5, 3.0):
+            buffer.observe("Device", "name", duration)
+        child = self.histogram.labels(type_name="Device", field_name="name")
+
+        with patch.object(child, "observe", wraps=child.observe) as observe:
+            buffer.flush()
+
+        self.assertEqual([call.args[0] for call in observe.call_args_list], [0.05, 0.5, 3.0])
+        self.assertEqual(self._bucket_counts("Device", "name"), [1, 1, 1])
+
+    def test_fields_are_kept_apart(self):
+        buffer = FieldTimingBuffer(self.histogram)
+        buffer.observe("Device", "name", 0.05)
+        buffer.observe("Interface", "name", 2.0)
+        buffer.observe("Interface", "name", 2.0)
+
+        buffer.flush()
+
+        self.assertEqual(self._bucket_counts("Device", "name"), [1, 0, 0])
+        self.assertEqual(self._bucket_counts("Interface", "name"), [0, 0, 2])
@@ -0,0 +1,106 @@
+"""Tests for the normalized query fingerprints."""
+
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+from graphql import FieldNode, NameNode, OperationDefinitionNode, OperationType, SelectionSetNode, parse
+
+from nautobot_graphql_observability.fingerprint import fingerprint_operation, normalize_operation, query_fingerprint
+
+
+def _normalize(query_string):
+    """Return the normalized text of the first operation of a document."""
+    document = parse(query_string)
+    fragments = {definition.name.value: definition for definition in document.definitions[1:]}
+    return normalize_operation(document.definitions[0], fragments)
+
+
+def _fingerprint(query_string):
+    """Return the fingerprint of the first operation of a document."""
+    return fingerprint_operation(parse(query_string).definitions[0])
+
+
+class NormalizeOperationTest(TestCase):
+    """Test cases for normalize_operation."""
+
+    def test_argument_values_are_stripped(self):
+        self.assertEqual(
+            _normalize('{ devices(name: "sw1", limit: 10) { id } }'),
+            "query { devices(limit: ?, name: ?) { id } }",
+        )
+
+    def test_variables_names_and_aliases_are_dropped(self):
+        self.assertEqual(
+            _normalize("query Named($n: String) { switches: devices(name: $n) { id } }"),
+            "query { devices(name: ?) { id } }",
+        )
+
+    def test_directives_are_kept_without_values(self):
+        self.assertEqual(
+            _normalize("query ($x: Boolean!) { devices { id @include(if: $x) } }"),
+            "query { devices { id @include(if: ?) } }",
+        )
+
+    def test_fragments_are_referenced_by_digest(self):
+        normalized = _normalize("{ devices { ...DeviceFields } } fragment DeviceFields on DeviceType { name }")
+
+        self.assertRegex(normalized, r"^query \{ devices \{ \.\.\. on DeviceType #[0-9a-f]{16} \} \}$")
+        self.assertEqual(
+            _normalize("{ devices { ...Other } } fragment Other on DeviceType { name }"),
+            normalized,
+        )
+        self.assertNotEqual(
+            _normalize("{ devices { ...DeviceFields } } fragment DeviceFields on DeviceType { id }"),
+            normalized,
+        )
+
+    def test_recursive_fragments_are_left_out_of_themselves(self):
+        self.assertEqual(
+            _normalize("{ devices { ...A } } fragment A on DeviceType { name ...A }"),
+            _normalize("{ devices { ...A } } fragment A on DeviceType { name }"),
+        )
+
+    def test_fragment_fan_out_is_normalized_once_per_fragment(self):
+        # Each fragment spreads the next one twice: inlining them would produce 2**40 copies.
+        levels = 40
+        fragments = " ".join(
+            f"fragment F{level} on DeviceType {{ name ...F{level + 1} ...F{level + 1} }}" for level in range(levels)
+        )
+
+        normalized = _normalize(f"{{ devices {{ ...F0 }} }} {fragments} fragment F{levels} on DeviceType {{ name }}")
+
+        self.assertLess(len(normalized), 100)
+
+    def test_deep_documents_do_not_recurse(self):
+        selection_set = SelectionSetNode(selections=(FieldNode(name=NameNode(value="id")),))
+        for _ in range(5000):
+            selection_set = SelectionSetNode(
+                selections=(FieldNode(name=NameNode(value="child"), selection_set=selection_set),)
+            )
+        operation = OperationDefinitionNode(operation=OperationType.QUERY, selection_set=selection_set)
+
+        self.assertEqual(normalize_operation(operation).count("child"), 5000)
+
+
+class FingerprintTest(TestCase):
+    """Test cases for fingerprint_operation and query_fingerprint."""
+
+    def test_formatting_does_not_change_the_fingerprint(self):
+        self.assertEqual(
+            _fingerprint('{ devices(name: "a") { id } }'),
+            _fingerprint('query Devices {\n  list: devices(name: "b") {\n    id\n  }\n}'),
+        )
+
+    def test_selection_changes_the_fingerprint(self):
+        self.assertNotEqual(_fingerprint("{ devices { id } }"), _fingerprint("{ devices { id name } }"))
+        self.assertRegex(_fingerprint("{ devices { id } }"), r"^[0-9a-f]{16}$")
+
+    def test_fingerprint_is_cached_per_document(self):
+        document = parse("query Cached { devices { id } }")
+        info = MagicMock(operation=document.definitions[0], fragments={})
+
+        first = query_fingerprint(info)
+        info.operation = parse("query Cached { devices { id } }").definitions[0]
+        info.operation.selection_set = None  # Would fail if normalized again.
+
+        self.assertEqual(query_fingerprint(info), first)
@@ -0,0 +1,152 @@
+"""Tests for the pre-execution query limits."""
+
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from graphql import GraphQLError, build_schema, parse
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.limits import QueryLimitMiddleware, QueryLimits, get_query_limits
+from nautobot_graphql_observability.metrics import graphql_query_limit_exceeded_total
+
+SCHEMA = build_schema("""
+    type Query { devices(limit: Int): [Device] }
+    type Device { name: String location: Location }
+    type Location { name: String parent: Location }
+""")
+
+
+def _make_info(query_string, username="alice", groups=()):
+    """Build a mock GraphQLResolveInfo for ``query_string`` sent by ``username``."""
+    info = MagicMock()
+    info.operation = parse(query_string).definitions[0]
+    info.fragments = {}
+    info.schema = SCHEMA
+    info.variable_values = {}
+    info.context.user.is_authenticated = True
+    info.context.user.username = username
+    info.context.user.groups.values_list.return_value = list(groups)
+    del info.context._graphql_query_limit_error
+    return info
+
+
+def _exceeded(limit, action):
+    return graphql_query_limit_exceeded_total.labels(limit=limit, action=action)._value.get()
+
+
+class GetQueryLimitsTest(TestCase):
+    """Test cases for get_query_limits."""
+
+    def test_global_limits(self):
+        config = AppSettings({"max_query_depth": 5, "max_query_cost": 100})
+
+        self.assertEqual(get_query_limits(_make_info("{ devices { name } }").context, config), QueryLimits(5, 100))
+
+    def test_user_override_wins(self):
+        config = AppSettings(
+            {
+                "max_query_depth": 5,
+                "max_query_cost": 100,
+                "query_limit_user_overrides": {"alice": {"max_query_cost": 0}},
+                "query_limit_group_overrides": {"automation": {"max_query_depth": 20}},
+            }
+        )
+        request = _make_info("{ devices { name } }", groups=["automation"]).context
+
+        self.assertEqual(get_query_limits(request, config), QueryLimits(5, 0))
+        request.user.groups.values_list.assert_not_called()
+
+    def test_most_permissive_group_override(self):
+        config = AppSettings(
+            {
+                "max_query_depth": 5,
+                "max_query_cost": 100,
+                "query_limit_group_overrides": {
+                    "automation": {"max_query_depth": 20, "max_query_cost": 1000},
+                    "reporting": {"max_query_depth": 8, "max_query_cost": 0},
+                },
+            }
+        )
+        request = _make_info("{ devices { name } }", groups=["automation", "reporting", "other"]).context
+
+        self.assertEqual(get_query_limits(request, config), QueryLimits(20, 0))
+
+
+class QueryLimitMiddlewareTest(TestCase):
+    """Test cases for QueryLimitMiddleware."""
+
+    def setUp(self):
+        self.middleware = QueryLimitMiddleware()
+        self.next_func = MagicMock(return_value="resolved_value")
+
+    def _resolve(self, config, info):
+        with patch("nautobot_graphql_observability.limits.get_app_settings", return_value=config):
+            return self.middleware.resolve(self.next_func, None, info)
+
+    def test_off_mode_does_not_check(self):
+        config = AppSettings({"max_query_depth": 1})
+        info = _make_info("{ devices { location { parent { name } } } }")
+
+        self.assertEqual(self._resolve(config, info), "resolved_value")
+
+    def test_enforce_mode_rejects_deep_operation(self):
+        config = AppSettings({"query_limits_mode": "enforce", "max_query_depth": 3})
+        info = _make_info("{ devices { location { parent { name } } } }")
+        before = _exceeded("depth", "rejected")
+
+        with self.assertLogs("nautobot_graphql_observability.limits", level="WARNING"):
+            with self.assertRaises(GraphQLError) as context:
+                self._resolve(config, info)
+
+        self.assertEqual(str(context.exception), "Query depth 4 exceeds the limit of 3.")
+        self.next_func.assert_not_called()
+        self.assertEqual(_exceeded("depth", "rejected") - before, 1)
+
+    def test_enforce_mode_rejects_costly_operation(self):
+        config = AppSettings({"query_limits_mode": "enforce", "max_query_cost": 50})
+        info = _make_info("{ devices(limit: 100) { name } }")
+        before = _exceeded("cost", "rejected")
+
+        with self.assertLogs("nautobot_graphql_observability.limits", level="WARNING"):
+            with self.assertRaises(GraphQLError):
+                self._resolve(config, info)
+
+        self.assertEqual(_exceeded("cost", "rejected") - before, 1)
+
+    def test_decision_applies_to_every_root_field(self):
+        config = AppSettings({"query_limits_mode": "enforce", "max_query_depth": 1})
+        info = _make_info("{ devices { name } }")
+
+        with self.assertLogs("nautobot_graphql_observability.limits", level="WARNING") as logs:
+            for _ in range(2):
+                with self.assertRaises(GraphQLError):
+                    self._resolve(config, info)
+
+        self.assertEqual(len(logs.records), 1)
+
+    def test_log_mode_runs_the_operation(self):
+        config = AppSettings({"query_limits_mode": "log", "max_query_depth": 1})
+        info = _make_info("{ devices { name } }")
+        before = _exceeded("depth", "logged")
+
+        with self.assertLogs("nautobot_graphql_observability.limits", level="WARNING"):
+            result = self._resolve(config, info)
+
+        self.assertEqual(result, "resolved_value")
+        self.assertEqual(_exceeded("depth", "logged") - before, 1)
+
+    def test_operation_within_limits_runs(self):
+        config = AppSettings({"query_limits_mode": "enforce", "max_query_depth": 5, "max_query_cost": 1000})
+        info = _make_info("{ devices(limit: 10) { name } }")
+
+        self.assertEqual(self._resolve(config, info), "resolved_value")
+
+    def test_nested_fields_pass_through(self):
+        config = AppSettings({"query_limits_mode": "enforce", "max_query_depth": 1})
+        info = _make_info("{ devices { location { name } } }")
+
+        with patch("nautobot_graphql_observability.limits.get_app_settings", return_value=config) as settings:
+            self.middleware.resolve(self.next_func, {"parent": True}, info)
+
+        settings.assert_not_called()
+        self.next_func.assert_called_once()
@@ -0,0 +1,112 @@
+"""Tests for the queued query log emission."""
+
+import logging
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.log_queue import DROP_OLDEST, QueryLogQueue
+from nautobot_graphql_observability.logging_middleware import _emit_log
+from nautobot_graphql_observability.metrics import graphql_query_log_dropped_total
+
+LOGGER_NAME = "nautobot_graphql_observability.graphql_query_log"
+
+
+class _BlockingHandler(logging.Handler):
+    """Handler that records messages and can be held to simulate slow I/O."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.records = []
+
+    def emit(self, record):
+        self.entered.set()
+        self.release.wait(5)
+        self.records.append(record)
+
+
+def _make_record(logger, message):
+    return logger.makeRecord(logger.name, logging.INFO, "(unknown file)", 0, message, (), None)
+
+
+class QueryLogQueueTest(TestCase):
+    """Test cases for QueryLogQueue."""
+
+    def setUp(self):
+        self.logger = logging.getLogger("test_query_log_queue")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = _BlockingHandler()
+        self.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_records_are_handled_in_the_background(self):
+        queue = QueryLogQueue(maxsize=10, batch_size=2)
+        self.addCleanup(queue.stop)
+        for i in range(5):
+            self.assertTrue(queue.submit(self.logger, _make_record(self.logger, f"m{i}")))
+
+        self.assertTrue(queue.flush(timeout=5))
+        self.assertEqual([record.msg for record in self.handler.records], [f"m{i}" for i in range(5)])
+
+    def test_drop_newest_when_full(self):
+        queue = QueryLogQueue(maxsize=1, batch_size=1)
+        self.addCleanup(queue.stop)
+        dropped_before = graphql_query_log_dropped_total.labels(policy="drop_newest")._value.get()
+        self.handler.release.clear()
+
+        queue.submit(self.logger, _make_record(self.logger, "in-flight"))
+        # Wait until the worker is held by the handler, so "queued" fills the queue.
+        self.assertTrue(self.handler.entered.wait(5))
+        queue.submit(self.logger, _make_record(self.logger, "queued"))
+        accepted = queue.submit(self.logger, _make_record(self.logger, "dropped"))
+        self.handler.release.set()
+        queue.flush(timeout=5)
+
+        self.assertFalse(accepted)
+        self.assertNotIn("dropped", [record.msg for record in self.handler.records])
+        self.assertGreaterEqual(
+            graphql_query_log_dropped_total.labels(policy="drop_newest")._value.get() - dropped_before, 1
+        )
+
+    def test_drop_oldest_when_full(self):
+        queue = QueryLogQueue(maxsize=2, batch_size=1, drop_policy=DROP_OLDEST)
+        self.addCleanup(queue.stop)
+        self.handler.release.clear()
+
+        queue.submit(self.logger, _make_record(self.logger, "in-flight"))
+        self.assertTrue(self.handler.entered.wait(5))
+        for message in ("old", "middle", "new"):
+            queue.submit(self.logger, _make_record(self.logger, message))
+        self.handler.release.set()
+        queue.flush(timeout=5)
+
+        self.assertEqual([record.msg for record in self.handler.records], ["in-flight", "middle", "new"])
+
+    def test_unknown_drop_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            QueryLogQueue(drop_policy="block")
+
+
+class QueuedEmitLogTest(TestCase):
+    """Test cases for _emit_log with the queue enabled."""
+
+    def test_emit_log_goes_through_the_queue(self):
+        config = AppSettings({"query_log_queue_enabled": True})
+        meta = {"operation_type": "query", "operation_name": "Queued", "user": "admin", "config": config}
+        queue = QueryLogQueue()
+        self.addCleanup(queue.stop)
+
+        with patch("nautobot_graphql_observability.logging_middleware.get_log_queue", return_value=queue):
+            with self.assertLogs(LOGGER_NAME, level="INFO") as logs:
+                _emit_log(meta, 12.34)
+                self.assertTrue(queue.flush(timeout=5))
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].operation_name, "Queued")
+        self.assertEqual(logs.records[0].duration_ms, 12.3)
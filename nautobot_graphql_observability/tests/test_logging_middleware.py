@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 from django.test import TestCase
 from graphql import parse
 
+from nautobot_graphql_observability.app_settings import AppSettings
 from nautobot_graphql_observability.logging_middleware import (
     _REQUEST_ATTR,
     GraphQLQueryLoggingMiddleware,
@@ -19,6 +20,7 @@ _LOGGING_ENABLED = {
     "log_query_body": False,
     "log_query_variables": False,
 }
+_LOGGING_ENABLED_SETTINGS = AppSettings(_LOGGING_ENABLED)
 
 
 def _make_info(query_string="{ devices { id } }", authenticated=True, username="testuser", variables=None):
@@ -46,8 +48,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.next_func = MagicMock(return_value="resolved_value")
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_root_resolver_stashes_metadata(self, _mock_settings):
         info = _make_info("query GetDevices { devices { id } }")
@@ -61,8 +63,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertEqual(meta["user"], "testuser")
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_nested_resolver_skips_stashing(self, _mock_settings):
         info = _make_info()
@@ -74,8 +76,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertFalse(hasattr(info.context, _REQUEST_ATTR))
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_error_records_error_in_metadata(self, _mock_settings):
         info = _make_info("query FailQuery { devices { id } }")
@@ -88,8 +90,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertIsInstance(meta["error"], ValueError)
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value={"query_logging_enabled": False},
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=AppSettings({"query_logging_enabled": False}),
     )
     def test_logging_disabled_skips_stashing(self, _mock_settings):
         info = _make_info()
@@ -100,8 +102,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertFalse(hasattr(info.context, _REQUEST_ATTR))
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value={**_LOGGING_ENABLED, "log_query_body": True},
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=AppSettings({**_LOGGING_ENABLED, "log_query_body": True}),
     )
     def test_stashes_query_body_when_enabled(self, _mock_settings):
         info = _make_info("{ devices { id name } }")
@@ -112,8 +114,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertIn("{ devices { id name } }", meta["query_body"])
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_no_query_body_when_disabled(self, _mock_settings):
         info = _make_info("{ devices { id name } }")
@@ -124,8 +126,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertNotIn("query_body", meta)
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value={**_LOGGING_ENABLED, "log_query_variables": True},
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=AppSettings({**_LOGGING_ENABLED, "log_query_variables": True}),
     )
     def test_stashes_variables_when_enabled(self, _mock_settings):
         info = _make_info("{ devices { id } }", variables={"name": "test"})
@@ -136,8 +138,34 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertEqual(meta["variables"], '{"name":"test"}')
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=AppSettings({**_LOGGING_ENABLED, "log_query_fingerprint": True}),
+    )
+    def test_stashes_fingerprint_when_enabled(self, _mock_settings):
+        info = _make_info('{ devices(name: "sw1") { id } }')
+
+        self.middleware.resolve(self.next_func, None, info)
+
+        meta = getattr(info.context, _REQUEST_ATTR)
+        self.assertRegex(meta["fingerprint"], r"^[0-9a-f]{16}$")
+
+    @patch(
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=AppSettings({**_LOGGING_ENABLED, "log_query_body": True, "persisted_queries_enabled": True}),
+    )
+    def test_persisted_queries_log_the_hash_instead_of_the_body(self, _mock_settings):
+        info = _make_info()
+        info.context._graphql_persisted_query = "ab" * 32
+
+        self.middleware.resolve(self.next_func, None, info)
+
+        meta = getattr(info.context, _REQUEST_ATTR)
+        self.assertEqual(meta["persisted_query"], "ab" * 32)
+        self.assertNotIn("query_body", meta)
+
+    @patch(
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_anonymous_user(self, _mock_settings):
         info = _make_info(authenticated=False)
@@ -148,8 +176,8 @@ class GraphQLQueryLoggingMiddlewareTest(TestCase):
         self.assertEqual(meta["user"], "anonymous")
 
     @patch(
-        "nautobot_graphql_observability.logging_middleware._get_app_settings",
-        return_value=_LOGGING_ENABLED,
+        "nautobot_graphql_observability.logging_middleware.get_app_settings",
+        return_value=_LOGGING_ENABLED_SETTINGS,
     )
     def test_unnamed_operation_uses_root_fields(self, _mock_settings):
         info = _make_info("{ devices { id } locations { id } }")
@@ -221,3 +249,16 @@ class EmitLogTest(TestCase):
             _emit_log(meta, duration_ms=5.0)
 
         self.assertEqual(logs.records[0].variables, '{"name":"test"}')
+
+    def test_fingerprint_in_log(self):
+        meta = {
+            "operation_type": "query",
+            "operation_name": "ShapeOp",
+            "user": "admin",
+            "fingerprint": "0123456789abcdef",
+        }
+
+        with self.assertLogs(LOGGER_NAME, level="INFO") as logs:
+            _emit_log(meta, duration_ms=5.0)
+
+        self.assertEqual(logs.records[0].fingerprint, "0123456789abcdef")
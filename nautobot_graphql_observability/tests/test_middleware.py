@@ -3,20 +3,30 @@
 from unittest.mock import MagicMock, patch
 
 from django.test import TestCase
-from graphql import parse
+from graphql import build_schema, parse
+from graphql.pyutils import Path
 
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.field_timing import FieldTimingBuffer
+from nautobot_graphql_observability.fingerprint import query_fingerprint
 from nautobot_graphql_observability.metrics import (
     graphql_errors_total,
     graphql_field_resolution_duration_seconds,
+    graphql_n_plus_one_detected_total,
     graphql_query_complexity,
+    graphql_query_cost,
     graphql_query_depth,
+    graphql_requests_by_fingerprint_total,
     graphql_requests_by_user_total,
     graphql_requests_total,
 )
 from nautobot_graphql_observability.middleware import (
+    _FIELD_STATE_ATTR,
     _REQUEST_ATTR,
     PrometheusMiddleware,
+    _record_operation_metrics,
 )
+from nautobot_graphql_observability.n_plus_one import NPlusOneDetector, NPlusOneFinding
 
 
 def _make_info(operation_type="query", operation_name="TestQuery"):
@@ -27,8 +37,13 @@ def _make_info(operation_type="query", operation_name="TestQuery"):
         info.operation.name.value = operation_name
     else:
         info.operation.name = None
-    # Ensure hasattr(_REQUEST_ATTR) returns False initially.
+    # Ensure the request carries none of the stashed attributes initially.
     del info.context._graphql_prometheus_meta
+    del info.context._graphql_field_state
+    del info.context._graphql_n_plus_one
+    del info.context._graphql_trace
+    del info.context._graphql_overhead
+    del info.context._graphql_persisted_query
     return info
 
 
@@ -47,21 +62,41 @@ def _make_info_with_ast(query_string, operation_name=None):
     info.fragments = fragments
     info.context.user.is_authenticated = True
     info.context.user.username = "testuser"
-    # Ensure hasattr(_REQUEST_ATTR) returns False initially.
+    # Ensure the request carries none of the stashed attributes initially.
     del info.context._graphql_prometheus_meta
+    del info.context._graphql_field_state
+    del info.context._graphql_n_plus_one
+    del info.context._graphql_trace
+    del info.context._graphql_overhead
+    del info.context._graphql_persisted_query
     if operation_name is not None:
         info.operation.name = MagicMock()
         info.operation.name.value = operation_name
     return info
 
 
+def _run_operation(middleware, next_func, info, root_fields=1):
+    """Resolve root fields through the middleware, then run the end-of-operation hook.
+
+    Mirrors what GraphQLObservabilityDjangoMiddleware does once the response is built.
+    """
+    try:
+        for _ in range(root_fields):
+            result = middleware.resolve(next_func, None, info)
+        return result
+    finally:
+        _record_operation_metrics(getattr(info.context, _REQUEST_ATTR))
+
+
 # Default config enabling all advanced metrics
-_DEFAULT_CONFIG = {
-    "track_query_depth": True,
-    "track_query_complexity": True,
-    "track_per_user": True,
-    "track_field_resolution": False,
-}
+_DEFAULT_CONFIG = AppSettings(
+    {
+        "track_query_depth": True,
+        "track_query_complexity": True,
+        "track_per_user": True,
+        "track_field_resolution": False,
+    }
+)
 
 
 class PrometheusMiddlewareBasicTest(TestCase):
@@ -71,14 +106,14 @@ class PrometheusMiddlewareBasicTest(TestCase):
         self.middleware = PrometheusMiddleware()
         self.next_func = MagicMock(return_value="resolved_value")
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_root_resolver_increments_request_counter(self, _mock_settings):
         info = _make_info(operation_type="query", operation_name="GetDevices")
         before = graphql_requests_total.labels(
             operation_type="query", operation_name="GetDevices", status="success"
         )._value.get()
 
-        result = self.middleware.resolve(self.next_func, None, info)
+        result = _run_operation(self.middleware, self.next_func, info)
 
         self.assertEqual(result, "resolved_value")
         self.next_func.assert_called_once_with(None, info)
@@ -88,7 +123,7 @@ class PrometheusMiddlewareBasicTest(TestCase):
         )._value.get()
         self.assertEqual(after - before, 1)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_nested_resolver_skips_metrics(self, _mock_settings):
         info = _make_info()
         parent = {"some": "parent"}
@@ -97,35 +132,35 @@ class PrometheusMiddlewareBasicTest(TestCase):
         self.assertEqual(result, "resolved_value")
         self.next_func.assert_called_once_with(parent, info)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_unnamed_operation_uses_root_field(self, _mock_settings):
         info = _make_info_with_ast("{ devices { id } }")
         before = graphql_requests_total.labels(
             operation_type="query", operation_name="devices", status="success"
         )._value.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_requests_total.labels(
             operation_type="query", operation_name="devices", status="success"
         )._value.get()
         self.assertEqual(after - before, 1)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_unnamed_operation_multiple_root_fields(self, _mock_settings):
         info = _make_info_with_ast("{ devices { id } locations { id } }")
         before = graphql_requests_total.labels(
             operation_type="query", operation_name="devices,locations", status="success"
         )._value.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_requests_total.labels(
             operation_type="query", operation_name="devices,locations", status="success"
         )._value.get()
         self.assertEqual(after - before, 1)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_error_increments_error_counter(self, _mock_settings):
         info = _make_info(operation_type="mutation", operation_name="CreateDevice")
         self.next_func.side_effect = ValueError("bad input")
@@ -138,7 +173,7 @@ class PrometheusMiddlewareBasicTest(TestCase):
         )._value.get()
 
         with self.assertRaises(ValueError):
-            self.middleware.resolve(self.next_func, None, info)
+            _run_operation(self.middleware, self.next_func, info)
 
         error_after = graphql_errors_total.labels(
             operation_type="mutation", operation_name="CreateDevice", error_type="ValueError"
@@ -150,16 +185,76 @@ class PrometheusMiddlewareBasicTest(TestCase):
         )._value.get()
         self.assertEqual(request_after - request_before, 1)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_root_resolver_stashes_labels_for_duration(self, _mock_settings):
         info = _make_info(operation_type="query", operation_name="StashTest")
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         meta = getattr(info.context, _REQUEST_ATTR)
         self.assertEqual(meta["operation_type"], "query")
         self.assertEqual(meta["operation_name"], "StashTest")
 
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_multiple_root_fields_count_one_operation(self, _mock_settings):
+        info = _make_info_with_ast("query OncePerOp { devices { id } locations { id } }")
+        requests_before = graphql_requests_total.labels(
+            operation_type="query", operation_name="OncePerOp", status="success"
+        )._value.get()
+        user_before = graphql_requests_by_user_total.labels(
+            user="testuser", operation_type="query", operation_name="OncePerOp"
+        )._value.get()
+        depth_before = graphql_query_depth.labels(operation_name="OncePerOp")._sum.get()
+
+        _run_operation(self.middleware, self.next_func, info, root_fields=5)
+
+        self.assertEqual(self.next_func.call_count, 5)
+        self.assertEqual(
+            graphql_requests_total.labels(
+                operation_type="query", operation_name="OncePerOp", status="success"
+            )._value.get()
+            - requests_before,
+            1,
+        )
+        self.assertEqual(
+            graphql_requests_by_user_total.labels(
+                user="testuser", operation_type="query", operation_name="OncePerOp"
+            )._value.get()
+            - user_before,
+            1,
+        )
+        self.assertEqual(graphql_query_depth.labels(operation_name="OncePerOp")._sum.get() - depth_before, 2)
+
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_status_aggregates_all_root_fields(self, _mock_settings):
+        info = _make_info_with_ast("query PartialFailure { devices { id } locations { id } }")
+        self.next_func.side_effect = ["ok", ValueError("bad root field")]
+        success_before = graphql_requests_total.labels(
+            operation_type="query", operation_name="PartialFailure", status="success"
+        )._value.get()
+        error_before = graphql_requests_total.labels(
+            operation_type="query", operation_name="PartialFailure", status="error"
+        )._value.get()
+
+        self.middleware.resolve(self.next_func, None, info)
+        with self.assertRaises(ValueError):
+            self.middleware.resolve(self.next_func, None, info)
+        _record_operation_metrics(getattr(info.context, _REQUEST_ATTR))
+
+        self.assertEqual(
+            graphql_requests_total.labels(
+                operation_type="query", operation_name="PartialFailure", status="success"
+            )._value.get(),
+            success_before,
+        )
+        self.assertEqual(
+            graphql_requests_total.labels(
+                operation_type="query", operation_name="PartialFailure", status="error"
+            )._value.get()
+            - error_before,
+            1,
+        )
+
 
 class PrometheusMiddlewareAdvancedTest(TestCase):
     """Test cases for advanced metrics: depth, complexity, per-user, per-field."""
@@ -168,7 +263,7 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
         self.middleware = PrometheusMiddleware()
         self.next_func = MagicMock(return_value="resolved_value")
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_query_depth_recorded(self, _mock_settings):
         info = _make_info_with_ast(
             "query DepthTest { devices { location { parent { name } } } }",
@@ -176,13 +271,13 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
         )
         before = graphql_query_depth.labels(operation_name="DepthTest")._sum.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_query_depth.labels(operation_name="DepthTest")._sum.get()
         # depth of devices.location.parent.name = 4
         self.assertEqual(after - before, 4)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_query_complexity_recorded(self, _mock_settings):
         info = _make_info_with_ast(
             "query ComplexityTest { devices { id name location { name } } }",
@@ -190,13 +285,26 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
         )
         before = graphql_query_complexity.labels(operation_name="ComplexityTest")._sum.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_query_complexity.labels(operation_name="ComplexityTest")._sum.get()
         # devices + id + name + location + name = 5
         self.assertEqual(after - before, 5)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_query_cost_recorded(self, _mock_settings):
+        info = _make_info_with_ast("query CostTest { devices(limit: 10) { id name } }", operation_name="CostTest")
+        info.schema = build_schema("type Query { devices(limit: Int): [Device] } type Device { id: ID name: String }")
+        info.variable_values = {}
+        before = graphql_query_cost.labels(operation_name="CostTest")._sum.get()
+
+        _run_operation(self.middleware, self.next_func, info)
+
+        after = graphql_query_cost.labels(operation_name="CostTest")._sum.get()
+        # devices + 10 * (id + name) = 21
+        self.assertEqual(after - before, 21)
+
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_per_user_metric_authenticated(self, _mock_settings):
         info = _make_info_with_ast("query UserTest { devices { id } }", operation_name="UserTest")
         info.context.user.is_authenticated = True
@@ -206,14 +314,14 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
             user="admin", operation_type="query", operation_name="UserTest"
         )._value.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_requests_by_user_total.labels(
             user="admin", operation_type="query", operation_name="UserTest"
         )._value.get()
         self.assertEqual(after - before, 1)
 
-    @patch("nautobot_graphql_observability.middleware._get_app_settings", return_value=_DEFAULT_CONFIG)
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
     def test_per_user_metric_anonymous(self, _mock_settings):
         info = _make_info_with_ast("query AnonTest { devices { id } }", operation_name="AnonTest")
         info.context.user.is_authenticated = False
@@ -222,7 +330,7 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
             user="anonymous", operation_type="query", operation_name="AnonTest"
         )._value.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         after = graphql_requests_by_user_total.labels(
             user="anonymous", operation_type="query", operation_name="AnonTest"
@@ -230,8 +338,28 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
         self.assertEqual(after - before, 1)
 
     @patch(
-        "nautobot_graphql_observability.middleware._get_app_settings",
-        return_value={"track_query_depth": False, "track_query_complexity": False, "track_per_user": False},
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"track_query_fingerprint": True}),
+    )
+    def test_fingerprint_metric_recorded(self, _mock_settings):
+        info = _make_info_with_ast('query ShapeTest { devices(name: "sw1") { id } }', operation_name="ShapeTest")
+        fingerprint = query_fingerprint(info)
+        before = graphql_requests_by_fingerprint_total.labels(
+            operation_type="query", operation_name="ShapeTest", fingerprint=fingerprint
+        )._value.get()
+
+        _run_operation(self.middleware, self.next_func, info)
+
+        after = graphql_requests_by_fingerprint_total.labels(
+            operation_type="query", operation_name="ShapeTest", fingerprint=fingerprint
+        )._value.get()
+        self.assertEqual(after - before, 1)
+
+    @patch(
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings(
+            {"track_query_depth": False, "track_query_complexity": False, "track_per_user": False}
+        ),
     )
     def test_advanced_metrics_disabled(self, _mock_settings):
         info = _make_info_with_ast("query DisabledTest { devices { id } }", operation_name="DisabledTest")
@@ -242,7 +370,7 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
             user="testuser", operation_type="query", operation_name="DisabledTest"
         )._value.get()
 
-        self.middleware.resolve(self.next_func, None, info)
+        _run_operation(self.middleware, self.next_func, info)
 
         self.assertEqual(graphql_query_depth.labels(operation_name="DisabledTest")._sum.get(), depth_before)
         self.assertEqual(graphql_query_complexity.labels(operation_name="DisabledTest")._sum.get(), complexity_before)
@@ -254,28 +382,36 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
         )
 
     @patch(
-        "nautobot_graphql_observability.middleware._get_app_settings",
-        return_value={"track_field_resolution": True},
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"track_field_resolution": True}),
     )
     def test_field_resolution_tracking(self, _mock_settings):
-        info = MagicMock()
+        info = _make_info_with_ast("query FieldTracking { devices { name } }")
+        parent = {"some": "parent"}
+        child = graphql_field_resolution_duration_seconds.labels(type_name="DeviceType", field_name="name")
+        sum_before = child._sum.get()
+        count_before = sum(bucket.get() for bucket in child._buckets)
+
+        self.middleware.resolve(self.next_func, None, info)
         info.parent_type.name = "DeviceType"
         info.field_name = "name"
+        for _ in range(3):
+            self.middleware.resolve(self.next_func, parent, info)
 
-        parent = {"some": "parent"}
-        before = graphql_field_resolution_duration_seconds.labels(type_name="DeviceType", field_name="name")._sum.get()
+        # Nothing is observed until the operation completes.
+        self.assertEqual(child._sum.get(), sum_before)
 
-        self.middleware.resolve(self.next_func, parent, info)
+        _record_operation_metrics(getattr(info.context, _REQUEST_ATTR))
 
-        after = graphql_field_resolution_duration_seconds.labels(type_name="DeviceType", field_name="name")._sum.get()
-        self.assertGreater(after, before)
+        self.assertGreater(child._sum.get(), sum_before)
+        self.assertEqual(sum(bucket.get() for bucket in child._buckets) - count_before, 3)
 
     @patch(
-        "nautobot_graphql_observability.middleware._get_app_settings",
-        return_value={"track_field_resolution": False},
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"track_field_resolution": False}),
     )
     def test_field_resolution_disabled(self, _mock_settings):
-        info = MagicMock()
+        info = _make_info_with_ast("query FieldTrackingDisabled { devices { name } }")
         info.parent_type.name = "DeviceType"
         info.field_name = "disabled_field"
 
@@ -284,9 +420,109 @@ class PrometheusMiddlewareAdvancedTest(TestCase):
             type_name="DeviceType", field_name="disabled_field"
         )._sum.get()
 
+        self.middleware.resolve(self.next_func, None, info)
         self.middleware.resolve(self.next_func, parent, info)
+        _record_operation_metrics(getattr(info.context, _REQUEST_ATTR))
 
+        self.assertFalse(hasattr(info.context, _FIELD_STATE_ATTR))
         after = graphql_field_resolution_duration_seconds.labels(
             type_name="DeviceType", field_name="disabled_field"
         )._sum.get()
         self.assertEqual(after, before)
+
+    @patch(
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"track_field_resolution": True, "field_resolution_sample_rates": {"Sampled": 1.0}}),
+    )
+    def test_root_resolver_stashes_timing_buffer_for_sampled_operation(self, _mock_settings):
+        info = _make_info_with_ast("query Sampled { devices { id } }")
+
+        self.middleware.resolve(self.next_func, None, info)
+
+        self.assertIsInstance(getattr(info.context, _FIELD_STATE_ATTR).timings, FieldTimingBuffer)
+
+    @patch(
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"track_field_resolution": True, "field_resolution_sample_rate": 0.0}),
+    )
+    def test_root_resolver_skips_unsampled_operation(self, _mock_settings):
+        info = _make_info_with_ast("query NotSampled { devices { id } }")
+
+        self.middleware.resolve(self.next_func, None, info)
+
+        self.assertFalse(hasattr(info.context, _FIELD_STATE_ATTR))
+
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_nested_fields_only_read_the_settings_on_the_root_field(self, mock_settings):
+        info = _make_info_with_ast("query SettingsOnce { devices { name } }")
+
+        self.middleware.resolve(self.next_func, None, info)
+        calls = mock_settings.call_count
+        for _ in range(3):
+            self.middleware.resolve(self.next_func, {"parent": True}, info)
+
+        self.assertEqual(mock_settings.call_count, calls)
+
+    @patch(
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"max_operation_name_labels": 1, "max_user_labels": 1}),
+    )
+    def test_labels_over_the_cardinality_limit_are_folded(self, _mock_settings):
+        first = _make_info_with_ast("query CardinalityFirst { devices { id } }")
+        second = _make_info_with_ast("query CardinalitySecond { devices { id } }")
+        second.context.user.username = "otheruser"
+
+        _run_operation(self.middleware, self.next_func, first)
+        _run_operation(self.middleware, self.next_func, second)
+
+        self.assertEqual(getattr(first.context, _REQUEST_ATTR)["operation_name"], "CardinalityFirst")
+        self.assertEqual(getattr(second.context, _REQUEST_ATTR)["operation_name"], "__other__")
+        self.assertEqual(getattr(second.context, _REQUEST_ATTR)["user"], "__other__")
+
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_fields_record_their_path_on_the_n_plus_one_detector(self, _mock_settings):
+        info = _make_info_with_ast("query PathTest { devices { name } }")
+        detector = NPlusOneDetector()
+        info.context._graphql_n_plus_one = detector
+
+        info.path = Path(None, "devices", "Query")
+        self.middleware.resolve(self.next_func, None, info)
+        self.assertIs(detector.path, info.path)
+
+        info.path = Path(Path(info.path, 0, None), "name", "Device")
+        self.middleware.resolve(self.next_func, {"parent": True}, info)
+        self.assertIs(detector.path, info.path)
+
+    @patch("nautobot_graphql_observability.middleware.get_app_settings", return_value=_DEFAULT_CONFIG)
+    def test_n_plus_one_findings_are_counted(self, _mock_settings):
+        info = _make_info_with_ast("query NPlusOneTest { devices { interfaces { name } } }")
+        self.middleware.resolve(self.next_func, None, info)
+        meta = getattr(info.context, _REQUEST_ATTR)
+        meta["n_plus_one"] = [NPlusOneFinding("devices.interfaces", 50, "SELECT ...")]
+        counter = graphql_n_plus_one_detected_total.labels(operation_name="NPlusOneTest", path="devices.interfaces")
+        before = counter._value.get()
+
+        _record_operation_metrics(meta)
+
+        self.assertEqual(counter._value.get() - before, 1)
+
+    @patch(
+        "nautobot_graphql_observability.middleware.get_app_settings",
+        return_value=AppSettings({"max_n_plus_one_path_labels": 1}),
+    )
+    def test_n_plus_one_paths_over_the_cardinality_limit_are_folded(self, _mock_settings):
+        info = _make_info_with_ast("query NPlusOnePaths { devices { interfaces { name } } }")
+        self.middleware.resolve(self.next_func, None, info)
+        meta = getattr(info.context, _REQUEST_ATTR)
+        meta["n_plus_one"] = [
+            NPlusOneFinding("devices.interfaces", 50, "SELECT ..."),
+            NPlusOneFinding("devices.tenant", 50, "SELECT ..."),
+        ]
+        labels = {"operation_name": "NPlusOnePaths"}
+        folded = graphql_n_plus_one_detected_total.labels(**labels, path="__other__")
+        before = folded._value.get()
+
+        _record_operation_metrics(meta)
+
+        self.assertEqual(graphql_n_plus_one_detected_total.labels(**labels, path="devices.interfaces")._value.get(), 1)
+        self.assertEqual(folded._value.get() - before, 1)
@@ -0,0 +1,108 @@
+"""Tests for the shared Graphene middleware chain."""
+
+import graphene
+from django.test import TestCase, override_settings
+from graphql import MiddlewareManager
+from nautobot.core.api.views import GraphQLDRFAPIView
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.limits import QueryLimitMiddleware
+from nautobot_graphql_observability.logging_middleware import GraphQLQueryLoggingMiddleware
+from nautobot_graphql_observability.middleware import PrometheusMiddleware
+from nautobot_graphql_observability.middleware_chain import get_middleware_chain
+
+_GRAPHENE = {
+    "MIDDLEWARE": [
+        "nautobot_graphql_observability.limits.QueryLimitMiddleware",
+        "nautobot_graphql_observability.logging_middleware.GraphQLQueryLoggingMiddleware",
+        "nautobot_graphql_observability.middleware.PrometheusMiddleware",
+    ],
+}
+_ALL_ENABLED = AppSettings({"query_logging_enabled": True, "query_limits_mode": "enforce"})
+_ALL_DISABLED = AppSettings({"graphql_metrics_enabled": False})
+
+
+class Query(graphene.ObjectType):
+    """Minimal query type, so the views do not load Nautobot's schema."""
+
+    name = graphene.String()
+
+
+def passthrough_middleware(next_, root, info, **kwargs):
+    """Graphene middleware that is not part of the app."""
+    return next_(root, info, **kwargs)
+
+
+def _types(chain):
+    return [type(middleware) for middleware in chain.middlewares]
+
+
+@override_settings(GRAPHENE=_GRAPHENE)
+class GetMiddlewareChainTest(TestCase):
+    """Test cases for get_middleware_chain."""
+
+    def test_chain_is_built_from_the_setting(self):
+        chain = get_middleware_chain(_ALL_ENABLED)
+
+        self.assertIsInstance(chain, MiddlewareManager)
+        self.assertEqual(_types(chain), [QueryLimitMiddleware, GraphQLQueryLoggingMiddleware, PrometheusMiddleware])
+
+    def test_chain_is_reused(self):
+        self.assertIs(get_middleware_chain(_ALL_ENABLED), get_middleware_chain(_ALL_ENABLED))
+
+    def test_chain_is_rebuilt_when_the_setting_changes(self):
+        chain = get_middleware_chain(_ALL_ENABLED)
+
+        with override_settings(GRAPHENE={"MIDDLEWARE": _GRAPHENE["MIDDLEWARE"][2:]}):
+            rebuilt = get_middleware_chain(_ALL_ENABLED)
+
+        self.assertIsNot(rebuilt, chain)
+        self.assertEqual(_types(rebuilt), [PrometheusMiddleware])
+
+    def test_no_middleware_gives_no_chain(self):
+        with override_settings(GRAPHENE={"MIDDLEWARE": []}):
+            self.assertIsNone(get_middleware_chain(_ALL_ENABLED))
+
+    def test_disabled_middlewares_are_left_out(self):
+        self.assertEqual(_types(get_middleware_chain(AppSettings({}))), [PrometheusMiddleware])
+        self.assertEqual(
+            _types(
+                get_middleware_chain(AppSettings({"graphql_metrics_enabled": False, "query_logging_enabled": True}))
+            ),
+            [GraphQLQueryLoggingMiddleware],
+        )
+
+    def test_features_needing_the_operation_metadata_keep_the_prometheus_middleware(self):
+        for setting in ("slow_operations_enabled", "tracing_enabled", "detect_n_plus_one"):
+            with self.subTest(setting=setting):
+                chain = get_middleware_chain(AppSettings({"graphql_metrics_enabled": False, setting: True}))
+                self.assertEqual(_types(chain), [PrometheusMiddleware])
+
+    def test_nothing_enabled_gives_no_chain(self):
+        self.assertIsNone(get_middleware_chain(_ALL_DISABLED))
+
+    def test_other_middlewares_are_always_kept(self):
+        with override_settings(GRAPHENE={"MIDDLEWARE": [f"{__name__}.passthrough_middleware"]}):
+            self.assertEqual(get_middleware_chain(_ALL_DISABLED).middlewares, (passthrough_middleware,))
+
+    def test_chain_is_kept_when_the_selection_does_not_change(self):
+        chain = get_middleware_chain(AppSettings({}))
+
+        self.assertIs(get_middleware_chain(AppSettings({"track_query_depth": True})), chain)
+
+    def test_views_share_the_chain(self):
+        views = [GraphQLDRFAPIView(schema=graphene.Schema(query=Query)) for _ in range(2)]
+
+        for view in views:
+            view.init_graphql()
+
+        self.assertIsInstance(views[0].middleware, MiddlewareManager)
+        self.assertIs(views[1].middleware, views[0].middleware)
+
+    def test_views_follow_the_app_settings(self):
+        view = GraphQLDRFAPIView(schema=graphene.Schema(query=Query))
+
+        with override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"graphql_metrics_enabled": False}}):
+            view.init_graphql()
+
+        self.assertIsNone(view.middleware)
@@ -0,0 +1,65 @@
+"""Tests for the Prometheus multiprocess mode helpers."""
+
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import TestCase
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from nautobot_graphql_observability.multiprocess import (
+    child_exit,
+    get_metrics_registry,
+    is_multiprocess_enabled,
+    mark_process_dead,
+)
+
+
+class MultiprocessTest(TestCase):
+    """Test cases for the multiprocess helpers."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+        self.path = self.directory.name
+
+    def _touch(self, name):
+        with open(os.path.join(self.path, name), "wb"):
+            pass
+
+    def test_default_registry_without_multiproc_dir(self):
+        with patch.dict(os.environ, clear=True):
+            self.assertFalse(is_multiprocess_enabled())
+            self.assertIs(get_metrics_registry(), REGISTRY)
+
+    def test_merging_registry_with_multiproc_dir(self):
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": self.path}, clear=True):
+            registry = get_metrics_registry()
+
+            self.assertTrue(is_multiprocess_enabled())
+            self.assertIsInstance(registry, CollectorRegistry)
+            self.assertIsNot(registry, REGISTRY)
+            self.assertEqual(list(registry.collect()), [])
+
+    def test_mark_process_dead_removes_live_gauge_files(self):
+        self._touch("gauge_livesum_4242.db")
+        self._touch("gauge_all_4242.db")
+        self._touch("counter_4242.db")
+
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": self.path}, clear=True):
+            mark_process_dead(4242)
+
+        self.assertEqual(sorted(os.listdir(self.path)), ["counter_4242.db", "gauge_all_4242.db"])
+
+    def test_child_exit_hook_uses_the_worker_pid(self):
+        self._touch("gauge_livesum_4343.db")
+
+        with patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": self.path}, clear=True):
+            child_exit(server=None, worker=SimpleNamespace(pid=4343))
+
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_mark_process_dead_is_a_noop_without_multiproc_dir(self):
+        with patch.dict(os.environ, clear=True):
+            mark_process_dead(4242)
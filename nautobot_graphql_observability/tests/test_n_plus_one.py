@@ -0,0 +1,87 @@
+"""Tests for the N+1 query pattern detection."""
+
+from unittest.mock import MagicMock
+
+from django.test import TestCase
+from graphql.pyutils import Path
+
+from nautobot_graphql_observability.n_plus_one import NPlusOneDetector, format_path, normalize_sql
+
+
+def _path(*keys):
+    path = None
+    for key in keys:
+        path = Path(path, key, None)
+    return path
+
+
+class NormalizeSqlTest(TestCase):
+    """Test cases for normalize_sql."""
+
+    def test_parameters_and_literals_become_placeholders(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t1 WHERE  id = %s AND name = 'x''y' LIMIT 21"),
+            "SELECT * FROM t1 WHERE id = ? AND name = ? LIMIT ?",
+        )
+
+    def test_in_lists_of_any_length_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            normalize_sql("SELECT * FROM t WHERE id IN (%s)"),
+        )
+
+
+class FormatPathTest(TestCase):
+    """Test cases for format_path."""
+
+    def test_list_indices_are_dropped(self):
+        self.assertEqual(format_path(_path("devices", 3, "interfaces", 0, "name")), "devices.interfaces.name")
+
+    def test_no_path(self):
+        self.assertEqual(format_path(None), "")
+
+
+class NPlusOneDetectorTest(TestCase):
+    """Test cases for NPlusOneDetector."""
+
+    def _run(self, detector, sql, times):
+        execute = MagicMock(return_value=None)
+        for _ in range(times):
+            detector(execute, sql, (), False, {})
+
+    def test_repeated_template_under_one_path_is_reported(self):
+        detector = NPlusOneDetector()
+        detector.path = _path("devices")
+        self._run(detector, "SELECT * FROM dcim_device", 1)
+        for index in range(12):
+            detector.path = _path("devices", index, "interfaces")
+            self._run(detector, "SELECT * FROM dcim_interface WHERE device_id = %s", 1)
+
+        findings = detector.findings(threshold=10)
+
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0].path, "devices.interfaces")
+        self.assertEqual(findings[0].statements, 12)
+        self.assertEqual(findings[0].template, "SELECT * FROM dcim_interface WHERE device_id = ?")
+
+    def test_below_threshold_is_not_reported(self):
+        detector = NPlusOneDetector()
+        detector.path = _path("devices", 0, "interfaces")
+        self._run(detector, "SELECT 1", 10)
+
+        self.assertEqual(detector.findings(threshold=10), [])
+
+    def test_statements_outside_fields_are_ignored(self):
+        detector = NPlusOneDetector()
+        self._run(detector, "SELECT * FROM users_user WHERE id = %s", 50)
+
+        self.assertEqual(detector.findings(threshold=10), [])
+
+    def test_findings_are_sorted_worst_first(self):
+        detector = NPlusOneDetector()
+        detector.path = _path("devices", 0, "interfaces")
+        self._run(detector, "SELECT 1", 20)
+        detector.path = _path("devices", 0, "location")
+        self._run(detector, "SELECT 2", 30)
+
+        self.assertEqual([finding.path for finding in detector.findings(5)], ["devices.location", "devices.interfaces"])
@@ -0,0 +1,138 @@
+"""Tests for the measurement of the app's own overhead."""
+
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from graphql import build_schema, graphql_sync
+
+from nautobot_graphql_observability.django_middleware import GraphQLObservabilityDjangoMiddleware
+from nautobot_graphql_observability.logging_middleware import GraphQLQueryLoggingMiddleware
+from nautobot_graphql_observability.metrics import (
+    graphql_observability_overhead_ratio,
+    graphql_observability_overhead_seconds,
+)
+from nautobot_graphql_observability.middleware import PrometheusMiddleware
+from nautobot_graphql_observability.overhead import NULL_TIMER, OverheadTimer, get_overhead_timer
+
+SCHEMA = build_schema("""
+    type Query { devices: [Device] }
+    type Device { name: String }
+""")
+SCHEMA.query_type.fields["devices"].resolve = lambda root, info: [{"name": "sw1"}, {"name": "sw2"}]
+
+QUERY = "query OverheadDevices { devices { name } }"
+
+
+def _histogram_count(histogram, **labels):
+    """Return the number of observations of one histogram series."""
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+class OverheadTimerTest(TestCase):
+    """Test cases for OverheadTimer."""
+
+    def test_time_in_next_is_not_counted(self):
+        timer = OverheadTimer()
+
+        def resolve(next, root, info):  # pylint: disable=redefined-builtin
+            return next(root, info)
+
+        def slow_next(root, info):  # pylint: disable=unused-argument
+            time.sleep(0.05)
+            return "resolved"
+
+        self.assertEqual(timer.measure("metrics", resolve, slow_next, None, None), "resolved")
+        self.assertLess(timer.seconds["metrics"], 0.025)
+
+    def test_nested_sections_are_counted_once(self):
+        timer = OverheadTimer()
+
+        with timer.section("request"):
+            with timer.section("tracing"):
+                time.sleep(0.05)
+
+        self.assertGreaterEqual(timer.seconds["tracing"], 0.05)
+        self.assertLess(timer.seconds["request"], 0.025)
+        self.assertAlmostEqual(timer.total, timer.seconds["request"] + timer.seconds["tracing"])
+
+    def test_time_is_counted_when_next_raises(self):
+        timer = OverheadTimer()
+
+        def failing_next(root, info):
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            timer.measure("metrics", lambda next, root, info: next(root, info), failing_next, None, None)
+
+        self.assertIn("metrics", timer.seconds)
+
+    def test_requests_without_timer_get_the_null_timer(self):
+        request = RequestFactory().get("/api/graphql/")
+
+        self.assertIs(get_overhead_timer(request), NULL_TIMER)
+        with NULL_TIMER.section("metrics"):
+            pass
+
+
+class OverheadRecordingTest(TestCase):
+    """Test cases for the overhead recorded by the Django middleware."""
+
+    def _execute(self):
+        """Run QUERY through the Django and Graphene middlewares."""
+
+        def get_response(request):
+            middleware = [GraphQLQueryLoggingMiddleware(), PrometheusMiddleware()]
+            result = graphql_sync(SCHEMA, QUERY, context_value=request, middleware=middleware)
+            self.assertIsNone(result.errors)
+            return HttpResponse()
+
+        request = RequestFactory().post("/api/graphql/")
+        request.user = AnonymousUser()
+        GraphQLObservabilityDjangoMiddleware(get_response)(request)
+
+    @override_settings(
+        PLUGINS_CONFIG={
+            "nautobot_graphql_observability": {
+                "track_overhead": True,
+                "track_field_resolution": True,
+                "query_logging_enabled": True,
+            }
+        }
+    )
+    def test_overhead_is_recorded_per_feature(self):
+        before = {
+            feature: _histogram_count(
+                graphql_observability_overhead_seconds, operation_name="OverheadDevices", feature=feature
+            )
+            for feature in ("metrics", "field_resolution", "query_logging", "request")
+        }
+        ratios = _histogram_count(graphql_observability_overhead_ratio, operation_name="OverheadDevices")
+
+        self._execute()
+
+        for feature, count in before.items():
+            self.assertEqual(
+                _histogram_count(
+                    graphql_observability_overhead_seconds, operation_name="OverheadDevices", feature=feature
+                ),
+                count + 1,
+                feature,
+            )
+        self.assertEqual(
+            _histogram_count(graphql_observability_overhead_ratio, operation_name="OverheadDevices"), ratios + 1
+        )
+
+    def test_overhead_is_not_recorded_by_default(self):
+        ratios = _histogram_count(graphql_observability_overhead_ratio, operation_name="OverheadDevices")
+
+        self._execute()
+
+        self.assertEqual(
+            _histogram_count(graphql_observability_overhead_ratio, operation_name="OverheadDevices"), ratios
+        )
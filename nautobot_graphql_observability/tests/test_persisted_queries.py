@@ -0,0 +1,134 @@
+"""Tests for the automatic persisted queries of the GraphQL API."""
+
+import hashlib
+import json
+from unittest.mock import MagicMock
+
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from graphql import ExecutionResult
+from nautobot.core.api.views import GraphQLDRFAPIView
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.metrics import (
+    graphql_persisted_queries_total,
+    graphql_requests_by_persisted_query_total,
+)
+from nautobot_graphql_observability.middleware import _record_operation_metrics
+from nautobot_graphql_observability.persisted_queries import _REQUEST_ATTR, get_persisted_query_response
+
+QUERY = "query Devices { devices { name } }"
+QUERY_HASH = hashlib.sha256(QUERY.encode()).hexdigest()
+_CONFIG = AppSettings({"persisted_queries_enabled": True})
+
+
+def _extensions(sha256_hash=QUERY_HASH, version=1):
+    return {"persistedQuery": {"version": version, "sha256Hash": sha256_hash}}
+
+
+class GetPersistedQueryResponseTest(TestCase):
+    """Test cases for get_persisted_query_response."""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=({"data": {"devices": []}}, 200))
+
+    def _request(self, data):
+        request = self.factory.post("/api/graphql/")
+        return request, get_persisted_query_response(request, data, self.get_response, _CONFIG)
+
+    def _result_count(self, result):
+        return graphql_persisted_queries_total.labels(result=result)._value.get()
+
+    def test_requests_without_extension_are_passed_through(self):
+        data = {"query": QUERY}
+
+        request, response = self._request(data)
+
+        self.assertEqual(response, ({"data": {"devices": []}}, 200))
+        self.get_response.assert_called_once_with(request, data)
+        self.assertFalse(hasattr(request, _REQUEST_ATTR))
+
+    def test_unknown_hash_asks_for_the_document(self):
+        misses = self._result_count("miss")
+
+        _, (result, status_code) = self._request({"extensions": _extensions()})
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(result["errors"][0]["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+        self.get_response.assert_not_called()
+        self.assertEqual(self._result_count("miss") - misses, 1)
+
+    def test_registered_document_is_executed_from_its_hash(self):
+        hits = self._result_count("hit")
+        self._request({"query": QUERY, "extensions": _extensions()})
+
+        request, _ = self._request({"extensions": json.dumps(_extensions()), "variables": {"a": 1}})
+
+        self.assertEqual(self.get_response.call_args.args[1]["query"], QUERY)
+        self.assertEqual(self.get_response.call_args.args[1]["variables"], {"a": 1})
+        self.assertEqual(getattr(request, _REQUEST_ATTR), QUERY_HASH)
+        self.assertEqual(self._result_count("hit") - hits, 1)
+
+    def test_mismatching_hash_is_rejected(self):
+        _, (result, status_code) = self._request({"query": "{ devices { id } }", "extensions": _extensions()})
+
+        self.assertEqual(status_code, 400)
+        self.assertEqual(result["errors"][0]["message"], "provided sha does not match query")
+        self.assertIsNone(caches["default"].get(f"nautobot_graphql_observability:apq:{QUERY_HASH}"))
+
+    def test_non_string_document_is_rejected(self):
+        for query in ({"devices": "id"}, ["{ devices { id } }"], 42):
+            _, (result, status_code) = self._request({"query": query, "extensions": _extensions()})
+            self.assertEqual(status_code, 400)
+            self.assertEqual(result["errors"][0]["extensions"]["code"], "BAD_USER_INPUT")
+        self.get_response.assert_not_called()
+
+    def test_unsupported_version_and_invalid_hash_are_rejected(self):
+        for extensions in (_extensions(version=2), _extensions(sha256_hash="not-a-hash")):
+            _, (_, status_code) = self._request({"extensions": extensions})
+            self.assertEqual(status_code, 400)
+        self.get_response.assert_not_called()
+
+
+class PersistedQueryMetricsTest(TestCase):
+    """Test cases for the per-hash request counter."""
+
+    def test_requests_are_counted_per_hash_prefix(self):
+        labels = {"operation_type": "query", "operation_name": "Devices", "persisted_query": QUERY_HASH[:16]}
+        before = graphql_requests_by_persisted_query_total.labels(**labels)._value.get()
+
+        _record_operation_metrics(
+            {
+                "operation_type": "query",
+                "operation_name": "Devices",
+                "persisted_query": QUERY_HASH,
+                "config": _CONFIG,
+            }
+        )
+
+        self.assertEqual(graphql_requests_by_persisted_query_total.labels(**labels)._value.get() - before, 1)
+
+
+class PatchedViewTest(TestCase):
+    """Test cases for the patched GraphQLDRFAPIView.get_response."""
+
+    @override_settings(
+        PLUGINS_CONFIG={
+            "nautobot_graphql_observability": {"persisted_queries_enabled": True, "response_cache_enabled": True}
+        }
+    )
+    def test_persisted_queries_are_resolved_before_the_response_cache(self):
+        caches["default"].clear()
+        request = RequestFactory().post("/api/graphql/")
+        request.user = MagicMock(is_authenticated=True, is_superuser=True)
+        view = GraphQLDRFAPIView()
+        view.execute_graphql_request = MagicMock(return_value=ExecutionResult(data={"devices": []}))
+
+        view.get_response(request, {"query": QUERY, "extensions": _extensions()})
+        response = view.get_response(request, {"extensions": _extensions()})
+
+        self.assertEqual(response, ({"data": {"devices": []}}, 200))
+        self.assertEqual(view.execute_graphql_request.call_count, 1)
+        self.assertEqual(view.execute_graphql_request.call_args.args[2], QUERY)
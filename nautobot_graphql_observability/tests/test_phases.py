@@ -0,0 +1,167 @@
+"""Tests for the per-phase timing of GraphQL API requests."""
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from graphene_django.views import HttpError
+from graphql import GraphQLSyntaxError, build_schema
+from nautobot.core.api.views import GraphQLDRFAPIView
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+
+from nautobot_graphql_observability.django_middleware import GraphQLObservabilityDjangoMiddleware
+from nautobot_graphql_observability.metrics import (
+    graphql_errors_total,
+    graphql_request_phase_duration_seconds,
+    graphql_requests_total,
+)
+from nautobot_graphql_observability.middleware import PrometheusMiddleware
+from nautobot_graphql_observability.phases import (
+    PARSE,
+    REQUEST_PARSE,
+    RequestPhases,
+    current_phases,
+    get_current_phases,
+    timed_execute,
+    timed_parse,
+    timed_validate,
+)
+
+LOGGER_NAME = "nautobot_graphql_observability.graphql_query_log"
+
+SCHEMA = build_schema("""
+    type Query { devices: [Device] }
+    type Device { name: String }
+""")
+SCHEMA.query_type.fields["devices"].resolve = lambda root, info: [{"name": "sw1"}]
+
+
+def _histogram_count(histogram, **labels):
+    """Return the number of observations of one histogram series."""
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+def _execute(query, request=None):
+    """Parse, validate and execute ``query`` like GraphQLDRFAPIView does, returning the status code."""
+    try:
+        document = timed_parse(query)
+    except GraphQLSyntaxError:
+        return 400
+    if timed_validate(SCHEMA, document):
+        return 400
+    timed_execute(schema=SCHEMA, document=document, context_value=request, middleware=[PrometheusMiddleware()])
+    return 200
+
+
+class RequestPhasesTest(TestCase):
+    """Test cases for the timed functions and RequestPhases."""
+
+    def test_functions_run_without_current_phases(self):
+        self.assertIsNone(get_current_phases())
+
+        self.assertEqual(_execute("{ devices { name } }"), 200)
+
+    def test_phases_are_timed(self):
+        with current_phases(RequestPhases()) as phases:
+            _execute("{ devices { name } }")
+
+        self.assertEqual(set(phases.seconds), {"parse", "validate", "execute"})
+        self.assertIsNone(phases.error)
+        self.assertIsNone(get_current_phases())
+
+    def test_syntax_errors_are_kept(self):
+        with current_phases(RequestPhases()) as phases:
+            _execute("{ devices {")
+
+        self.assertIsInstance(phases.error, GraphQLSyntaxError)
+        self.assertEqual(phases.query, "{ devices {")
+        self.assertEqual(phases.failed_operation(), (None, {}))
+        self.assertIn(PARSE, phases.seconds)
+
+    def test_validation_errors_keep_the_operation(self):
+        with current_phases(RequestPhases()) as phases:
+            _execute("query Serials { devices { serial } }")
+
+        operation, _ = phases.failed_operation()
+        self.assertEqual(operation.name.value, "Serials")
+        self.assertIn("serial", phases.error.message)
+
+    def test_first_error_wins(self):
+        phases = RequestPhases()
+
+        phases.fail(ValueError("first"))
+        phases.fail(ValueError("second"))
+
+        self.assertEqual(str(phases.error), "first")
+
+    def test_invalid_body_is_kept(self):
+        request = Request(
+            RequestFactory().post("/api/graphql/", data="{bad", content_type="application/json"),
+            parsers=[JSONParser()],
+        )
+
+        with current_phases(RequestPhases()) as phases:
+            with self.assertRaises(HttpError):
+                GraphQLDRFAPIView().parse_body(request)
+
+        self.assertIsInstance(phases.error, HttpError)
+        self.assertIn(REQUEST_PARSE, phases.seconds)
+
+
+class FailedOperationTest(TestCase):
+    """Test cases for the recording of operations failing before execution."""
+
+    def _request(self, query):
+        def get_response(request):
+            return HttpResponse(status=_execute(query, request))
+
+        request = RequestFactory().post("/api/graphql/")
+        request.user = AnonymousUser()
+        GraphQLObservabilityDjangoMiddleware(get_response)(request)
+
+    def test_syntax_errors_are_counted_as_unknown_operations(self):
+        labels = {"operation_type": "unknown", "operation_name": "unknown"}
+        requests = graphql_requests_total.labels(**labels, status="error")._value.get()
+        errors = graphql_errors_total.labels(**labels, error_type="GraphQLSyntaxError")._value.get()
+
+        self._request("{ devices {")
+
+        self.assertEqual(graphql_requests_total.labels(**labels, status="error")._value.get() - requests, 1)
+        self.assertEqual(
+            graphql_errors_total.labels(**labels, error_type="GraphQLSyntaxError")._value.get() - errors, 1
+        )
+
+    def test_validation_errors_are_counted_under_the_operation_name(self):
+        labels = {"operation_type": "query", "operation_name": "PhaseSerials"}
+        requests = graphql_requests_total.labels(**labels, status="error")._value.get()
+
+        self._request("query PhaseSerials { devices { serial } }")
+
+        self.assertEqual(graphql_requests_total.labels(**labels, status="error")._value.get() - requests, 1)
+
+    @override_settings(
+        PLUGINS_CONFIG={"nautobot_graphql_observability": {"query_logging_enabled": True, "log_query_body": True}}
+    )
+    def test_failed_operations_are_logged(self):
+        with self.assertLogs(LOGGER_NAME, level="WARNING") as logs:
+            self._request("query PhaseSerials {\n  devices { serial }\n}")
+
+        record = logs.records[0]
+        self.assertEqual(record.operation_name, "PhaseSerials")
+        self.assertEqual(record.error_type, "GraphQLError")
+        self.assertEqual(record.query, "query PhaseSerials {   devices { serial } }")
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"track_request_phases": True}})
+    def test_phases_are_recorded_per_operation(self):
+        before = _histogram_count(graphql_request_phase_duration_seconds, operation_name="devices", phase="execute")
+
+        self._request("{ devices { name } }")
+
+        self.assertEqual(
+            _histogram_count(graphql_request_phase_duration_seconds, operation_name="devices", phase="execute"),
+            before + 1,
+        )
@@ -0,0 +1,170 @@
+"""Tests for the GraphQL API response cache."""
+
+from unittest.mock import MagicMock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from graphql import ExecutionResult
+from nautobot.core.api.views import GraphQLDRFAPIView
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.metrics import (
+    graphql_response_cache_requests_total,
+    graphql_response_cache_saved_seconds_total,
+)
+from nautobot_graphql_observability.response_cache import (
+    document_digest,
+    get_cached_response,
+    invalidate_response_cache,
+    permission_key,
+)
+
+QUERY = "query Devices($name: [String]) { devices(name: $name) { name } }"
+_CONFIG = AppSettings({"response_cache_enabled": True})
+
+
+def _make_user(username, permissions=None, is_superuser=False):
+    """Build an unsaved user whose object permissions are already resolved."""
+    user = get_user_model()(username=username, is_superuser=is_superuser)
+    user._object_perm_cache = permissions or {}  # pylint: disable=protected-access
+    return user
+
+
+class DocumentDigestTest(TestCase):
+    """Test cases for document_digest."""
+
+    def test_formatting_does_not_change_the_digest(self):
+        self.assertEqual(
+            document_digest("{ devices { name } }"),
+            document_digest("# Dashboard\nquery {\n  devices {\n    name\n  }\n}"),
+        )
+
+    def test_literals_and_operation_names_change_the_digest(self):
+        self.assertNotEqual(document_digest('{ devices(name: "a") { id } }'), document_digest("{ devices { id } }"))
+        document = "query A { devices { id } } query B { locations { id } }"
+        self.assertNotEqual(document_digest(document, "A"), document_digest(document, "B"))
+
+    def test_non_cacheable_documents_have_no_digest(self):
+        self.assertEqual(document_digest("mutation { createDevice { id } }"), "")
+        self.assertEqual(document_digest("{ devices { id }"), "")
+        self.assertEqual(document_digest("query A { a } query B { b }"), "")
+
+
+class PermissionKeyTest(TestCase):
+    """Test cases for permission_key."""
+
+    def test_users_with_the_same_permissions_share_a_key(self):
+        permissions = {"dcim.view_device": [{"location__name": "dc1"}]}
+
+        self.assertEqual(
+            permission_key(_make_user("alice", permissions)), permission_key(_make_user("bob", permissions))
+        )
+        self.assertNotEqual(
+            permission_key(_make_user("alice", permissions)),
+            permission_key(_make_user("carol", {"dcim.view_device": [None]})),
+        )
+
+    def test_superusers_and_anonymous_users(self):
+        self.assertEqual(permission_key(_make_user("admin", is_superuser=True)), "superuser")
+        self.assertEqual(permission_key(AnonymousUser()), "anonymous")
+
+    def test_constraints_on_the_user_are_keyed_per_user(self):
+        permissions = {"extras.view_job": [{"owner": "$user"}]}
+        alice = _make_user("alice", permissions)
+        bob = _make_user("bob", permissions)
+
+        self.assertNotEqual(permission_key(alice), permission_key(bob))
+
+
+class GetCachedResponseTest(TestCase):
+    """Test cases for get_cached_response."""
+
+    def setUp(self):
+        caches["default"].clear()
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=({"data": {"devices": [{"name": "sw1"}]}}, 200))
+
+    def _request(self, query=QUERY, variables=None, user=None):
+        request = self.factory.post("/api/graphql/")
+        request.user = user or _make_user("alice", is_superuser=True)
+        data = {"query": query, "variables": variables}
+        return get_cached_response(request, data, self.get_response, _CONFIG)
+
+    def test_identical_queries_are_served_from_the_cache(self):
+        hits = graphql_response_cache_requests_total.labels(result="hit")._value.get()
+        saved = graphql_response_cache_saved_seconds_total._value.get()
+
+        first = self._request(variables={"name": ["sw1"]})
+        second = self._request(variables='{"name": ["sw1"]}')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.get_response.call_count, 1)
+        self.assertEqual(graphql_response_cache_requests_total.labels(result="hit")._value.get() - hits, 1)
+        self.assertGreaterEqual(graphql_response_cache_saved_seconds_total._value.get(), saved)
+
+    def test_variables_and_permissions_are_part_of_the_key(self):
+        self._request(variables={"name": ["sw1"]})
+        self._request(variables={"name": ["sw2"]})
+        self._request(variables={"name": ["sw1"]}, user=_make_user("bob", {"dcim.view_device": [None]}))
+
+        self.assertEqual(self.get_response.call_count, 3)
+
+    def test_mutations_bypass_the_cache(self):
+        bypassed = graphql_response_cache_requests_total.labels(result="bypass")._value.get()
+
+        self._request("mutation { createDevice { id } }")
+        self._request("mutation { createDevice { id } }")
+
+        self.assertEqual(self.get_response.call_count, 2)
+        self.assertEqual(graphql_response_cache_requests_total.labels(result="bypass")._value.get() - bypassed, 2)
+
+    def test_responses_with_errors_are_not_stored(self):
+        self.get_response.return_value = ({"errors": [{"message": "boom"}], "data": None}, 200)
+
+        self._request()
+        self._request()
+
+        self.assertEqual(self.get_response.call_count, 2)
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"response_cache_enabled": True}})
+    def test_object_changes_invalidate_the_cache(self):
+        self._request()
+        changed = MagicMock(spec=["to_objectchange"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_response_cache(sender=type(changed), instance=changed, created=False)
+        self._request()
+
+        self.assertEqual(self.get_response.call_count, 2)
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"response_cache_enabled": True}})
+    def test_objects_without_change_logging_do_not_invalidate_the_cache(self):
+        self._request()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            invalidate_response_cache(sender=object, instance=object(), created=False)
+        self._request()
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.get_response.call_count, 1)
+
+
+class PatchedViewTest(TestCase):
+    """Test cases for the patched GraphQLDRFAPIView.get_response."""
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_graphql_observability": {"response_cache_enabled": True}})
+    def test_view_goes_through_the_cache(self):
+        caches["default"].clear()
+        request = RequestFactory().post("/api/graphql/")
+        request.user = _make_user("admin", is_superuser=True)
+        view = GraphQLDRFAPIView()
+        view.execute_graphql_request = MagicMock(return_value=ExecutionResult(data={"devices": []}))
+
+        first = view.get_response(request, {"query": "{ devices { id } }"})
+        second = view.get_response(request, {"query": "{ devices { id } }"})
+
+        self.assertEqual(first, ({"data": {"devices": []}}, 200))
+        self.assertEqual(second, first)
+        self.assertEqual(view.execute_graphql_request.call_count, 1)
@@ -0,0 +1,61 @@
+"""Tests for the per-field timing head sampler."""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.sampling import FieldSampler, TokenBucket, get_field_sampler
+
+
+class TokenBucketTest(TestCase):
+    """Test cases for TokenBucket."""
+
+    @patch("nautobot_graphql_observability.sampling.time.monotonic")
+    def test_bucket_caps_and_refills(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(2)
+
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+        mock_monotonic.return_value = 100.5
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+
+
+class FieldSamplerTest(TestCase):
+    """Test cases for FieldSampler."""
+
+    def test_full_rate_always_samples(self):
+        sampler = FieldSampler(sample_rate=1.0)
+        self.assertTrue(all(sampler.should_sample("Op") for _ in range(100)))
+
+    def test_zero_rate_never_samples(self):
+        sampler = FieldSampler(sample_rate=0.0)
+        self.assertFalse(any(sampler.should_sample("Op") for _ in range(100)))
+
+    @patch("nautobot_graphql_observability.sampling.random.random", return_value=0.3)
+    def test_fractional_rate(self, _mock_random):
+        self.assertTrue(FieldSampler(sample_rate=0.5).should_sample("Op"))
+        self.assertFalse(FieldSampler(sample_rate=0.2).should_sample("Op"))
+
+    def test_per_operation_rate_overrides_default(self):
+        sampler = FieldSampler(sample_rate=0.0, sample_rates={"Hot": 1.0})
+
+        self.assertTrue(sampler.should_sample("Hot"))
+        self.assertFalse(sampler.should_sample("Other"))
+
+    def test_token_bucket_caps_sampled_operations(self):
+        sampler = FieldSampler(sample_rate=1.0, max_per_second=3)
+        sampled = sum(sampler.should_sample("Op") for _ in range(10))
+        self.assertEqual(sampled, 3)
+
+    def test_sampler_is_rebuilt_with_settings(self):
+        first = AppSettings({"field_resolution_sample_rate": 0.5})
+        second = AppSettings({"field_resolution_sample_rate": 0.1})
+
+        sampler = get_field_sampler(first)
+        self.assertIs(get_field_sampler(first), sampler)
+        self.assertEqual(get_field_sampler(second).sample_rate, 0.1)
@@ -0,0 +1,195 @@
+"""Tests for the shared slow operation buffer."""
+
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from django.test import TestCase, override_settings
+from graphql import parse
+
+from nautobot_graphql_observability.analysis import OperationAnalysis
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.slow_operations import (
+    SlowOperationBuffer,
+    get_buffer_path,
+    get_slow_operation_buffer,
+    record_slow_operation,
+    select_slow_operations,
+)
+
+
+class SlowOperationBufferTest(TestCase):
+    """Test cases for SlowOperationBuffer."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "slow.bin")
+
+    def _open(self, capacity=3, query_length=32):
+        buffer = SlowOperationBuffer(self.path, capacity, query_length)
+        self.addCleanup(buffer.close)
+        return buffer
+
+    def test_records_are_read_back_most_recent_first(self):
+        buffer = self._open()
+        buffer.record(1.5, "query", "Devices", "alice", 3, 12, "{ devices { name } }")
+        buffer.record(2.0, "mutation", "Update", "bob", 2, 4, "mutation { x }")
+
+        entries = buffer.entries()
+
+        self.assertEqual([entry.operation_name for entry in entries], ["Update", "Devices"])
+        self.assertEqual(entries[1].user, "alice")
+        self.assertEqual(entries[1].duration, 1.5)
+        self.assertEqual((entries[1].depth, entries[1].complexity), (3, 12))
+        self.assertEqual(entries[1].query, "{ devices { name } }")
+
+    def test_oldest_records_are_overwritten(self):
+        buffer = self._open(capacity=3)
+        for index in range(5):
+            buffer.record(1.0, "query", f"Op{index}", "alice", 1, 1, "")
+
+        self.assertEqual([entry.operation_name for entry in buffer.entries()], ["Op4", "Op3", "Op2"])
+
+    def test_query_text_is_truncated(self):
+        buffer = self._open(query_length=8)
+        buffer.record(1.0, "query", "Op", "alice", 1, 1, "{ devices { name } }")
+
+        self.assertEqual(buffer.entries()[0].query, "{ device")
+
+    def test_buffer_is_shared_through_the_file(self):
+        writer = self._open()
+        reader = self._open()
+        writer.record(1.0, "query", "Shared", "alice", 1, 1, "")
+        reader.record(1.0, "query", "Other", "bob", 1, 1, "")
+
+        self.assertEqual([entry.sequence for entry in writer.entries()], [2, 1])
+        self.assertEqual([entry.operation_name for entry in reader.entries()], ["Other", "Shared"])
+
+    def test_file_with_another_layout_is_reset(self):
+        self._open(capacity=3).record(1.0, "query", "Old", "alice", 1, 1, "")
+
+        self.assertEqual(self._open(capacity=5).entries(), [])
+
+    def test_records_being_written_are_skipped(self):
+        buffer = self._open()
+        buffer.record(1.0, "query", "Done", "alice", 1, 1, "")
+        buffer.record(1.0, "query", "Torn", "alice", 1, 1, "")
+        # Simulate a writer interrupted between clearing and setting the sequence of its slot.
+        buffer._mmap[buffer._offset(2) : buffer._offset(2) + 8] = bytes(8)  # pylint: disable=protected-access
+
+        self.assertEqual([entry.operation_name for entry in buffer.entries()], ["Done"])
+
+    def test_file_is_created_private(self):
+        self._open()
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_symlinks_are_refused(self):
+        target = f"{self.path}.target"
+        with open(target, "wb") as file:
+            file.write(b"keep")
+        os.chmod(target, 0o600)
+        os.symlink(target, self.path)
+
+        with self.assertRaises(OSError):
+            self._open()
+        with open(target, "rb") as file:
+            self.assertEqual(file.read(), b"keep")
+
+    def test_files_accessible_to_others_are_refused(self):
+        with open(self.path, "wb") as file:
+            file.write(b"keep")
+        os.chmod(self.path, 0o644)
+
+        with self.assertRaises(PermissionError):
+            self._open()
+        self.assertEqual(os.path.getsize(self.path), 4)
+
+
+class GetBufferPathTest(TestCase):
+    """Test cases for get_buffer_path."""
+
+    def test_configured_path_wins(self):
+        self.assertEqual(get_buffer_path(AppSettings({"slow_operation_buffer_path": "/srv/slow.bin"})), "/srv/slow.bin")
+
+    @override_settings(NAUTOBOT_ROOT="/opt/nautobot")
+    def test_default_path_is_in_nautobot_root(self):
+        self.assertEqual(get_buffer_path(AppSettings()), "/opt/nautobot/nautobot_graphql_slow_operations.bin")
+
+
+class SelectSlowOperationsTest(TestCase):
+    """Test cases for select_slow_operations."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        buffer = SlowOperationBuffer(os.path.join(directory.name, "slow.bin"), 10, 16)
+        self.addCleanup(buffer.close)
+        buffer.record(3.0, "query", "DeviceList", "alice", 2, 10, "")
+        buffer.record(1.0, "query", "LocationList", "bob", 4, 5, "")
+        buffer.record(2.0, "query", "DeviceDetail", "Bob", 3, 20, "")
+        self.entries = buffer.entries()
+
+    def test_filters_on_name_user_and_duration(self):
+        self.assertEqual(
+            [entry.operation_name for entry in select_slow_operations(self.entries, operation_name="device")],
+            ["DeviceDetail", "DeviceList"],
+        )
+        self.assertEqual(
+            [entry.operation_name for entry in select_slow_operations(self.entries, user="bob", min_duration_ms=1500)],
+            ["DeviceDetail"],
+        )
+
+    def test_sorts_on_any_field(self):
+        self.assertEqual(
+            [entry.duration for entry in select_slow_operations(self.entries, sort="duration")], [1.0, 2.0, 3.0]
+        )
+        self.assertEqual(
+            [entry.complexity for entry in select_slow_operations(self.entries, sort="-complexity")], [20, 10, 5]
+        )
+
+    def test_unknown_sort_field_falls_back_to_time(self):
+        self.assertEqual(
+            [entry.operation_name for entry in select_slow_operations(self.entries, sort="-query")],
+            ["DeviceDetail", "LocationList", "DeviceList"],
+        )
+
+
+class RecordSlowOperationTest(TestCase):
+    """Test cases for record_slow_operation."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.config = AppSettings(
+            {
+                "slow_operations_enabled": True,
+                "slow_operation_threshold_ms": 500,
+                "slow_operation_buffer_path": os.path.join(directory.name, "slow.bin"),
+            }
+        )
+        document = parse("query Devices { devices { name } }")
+        self.meta = {
+            "operation_type": "query",
+            "operation_name": "Devices",
+            "analysis": OperationAnalysis("Devices", ("devices",), 2, 2, 0, 0, 1),
+            "operation": document.definitions[0],
+        }
+        self.request = MagicMock()
+        self.request.user.is_authenticated = True
+        self.request.user.username = "alice"
+
+    def test_operations_over_the_threshold_are_recorded(self):
+        record_slow_operation(self.request, self.meta, 0.75, self.config)
+
+        entry = get_slow_operation_buffer(self.config).entries()[0]
+        self.assertEqual(entry.operation_name, "Devices")
+        self.assertEqual(entry.user, "alice")
+        self.assertEqual(entry.depth, 2)
+        self.assertEqual(entry.query, "query Devices { devices { name } }")
+
+    def test_operations_under_the_threshold_are_ignored(self):
+        record_slow_operation(self.request, self.meta, 0.25, self.config)
+
+        self.assertEqual(get_slow_operation_buffer(self.config).entries(), [])
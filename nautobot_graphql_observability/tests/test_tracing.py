@@ -0,0 +1,190 @@
+"""Tests for the OpenTelemetry tracing of GraphQL operations."""
+
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from graphql import build_schema, graphql_sync
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from nautobot_graphql_observability.app_settings import AppSettings
+from nautobot_graphql_observability.django_middleware import GraphQLObservabilityDjangoMiddleware
+from nautobot_graphql_observability.middleware import PrometheusMiddleware
+from nautobot_graphql_observability.tracing import (
+    _REQUEST_ATTR,
+    JsonLinesSpanExporter,
+    build_span_exporter,
+    get_tracer,
+    shutdown_tracing,
+)
+
+SCHEMA = build_schema("""
+    type Query { devices: [Device] }
+    type Device { name: String }
+""")
+SCHEMA.query_type.fields["devices"].resolve = lambda root, info: [{"name": "sw1"}, {"name": "sw2"}]
+
+QUERY = "query DeviceNames { devices { name } }"
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+def _tracing_config(**settings):
+    return {"nautobot_graphql_observability": {"tracing_enabled": True, "tracing_exporter": "jsonl", **settings}}
+
+
+class JsonLinesSpanExporterTest(TestCase):
+    """Test cases for JsonLinesSpanExporter."""
+
+    def test_writes_one_json_object_per_span(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            config = AppSettings({"tracing_exporter": "jsonl", "tracing_jsonl_path": path})
+            tracer = get_tracer(config)
+            with tracer.start_as_current_span("parent"):
+                with tracer.start_as_current_span("child"):
+                    pass
+            shutdown_tracing()
+
+            with open(path, encoding="utf-8") as stream:
+                spans = [json.loads(line) for line in stream]
+
+        self.assertEqual([span["name"] for span in spans], ["child", "parent"])
+        self.assertEqual(spans[0]["parent_id"], spans[1]["context"]["span_id"])
+
+    def test_unwritable_path_fails_the_export(self):
+        exporter = JsonLinesSpanExporter(os.path.join(tempfile.gettempdir(), "missing", "spans.jsonl"))
+
+        with self.assertLogs("nautobot_graphql_observability.tracing", level="ERROR"):
+            result = exporter.export([])
+
+        self.assertEqual(result.name, "FAILURE")
+
+
+class GetTracerTest(TestCase):
+    """Test cases for get_tracer."""
+
+    def tearDown(self):
+        shutdown_tracing()
+
+    def test_tracer_is_reused_for_the_same_settings(self):
+        config = AppSettings({"tracing_exporter": "jsonl", "tracing_jsonl_path": os.devnull})
+
+        self.assertIs(get_tracer(config), get_tracer(config))
+
+    def test_missing_opentelemetry_disables_tracing(self):
+        config = AppSettings({"tracing_exporter": "jsonl", "tracing_jsonl_path": os.devnull})
+
+        with patch("nautobot_graphql_observability.tracing.trace", None):
+            with self.assertLogs("nautobot_graphql_observability.tracing", level="WARNING"):
+                self.assertIsNone(get_tracer(config))
+
+    def test_missing_jsonl_path_disables_tracing(self):
+        with self.assertLogs("nautobot_graphql_observability.tracing", level="WARNING"):
+            self.assertIsNone(get_tracer(AppSettings({"tracing_exporter": "jsonl"})))
+
+    def test_otlp_exporter_uses_the_configured_endpoint(self):
+        config = AppSettings(
+            {"tracing_otlp_protocol": "http", "tracing_otlp_endpoint": "http://collector:4318/v1/traces"}
+        )
+
+        exporter = build_span_exporter(config)
+
+        self.assertEqual(type(exporter).__module__, "opentelemetry.exporter.otlp.proto.http.trace_exporter")
+        self.assertEqual(exporter._endpoint, "http://collector:4318/v1/traces")  # pylint: disable=protected-access
+
+    def test_unknown_protocol_falls_back_to_grpc(self):
+        with self.assertLogs("nautobot_graphql_observability.app_settings", level="WARNING"):
+            config = AppSettings({"tracing_otlp_protocol": "https", "tracing_otlp_endpoint": "collector:4317"})
+
+        exporter = build_span_exporter(config)
+
+        self.assertEqual(type(exporter).__module__, "opentelemetry.exporter.otlp.proto.grpc.trace_exporter")
+
+
+class RequestTracingTest(TestCase):
+    """Test cases for the request and field spans."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.exporter = InMemorySpanExporter()
+        patcher = patch("nautobot_graphql_observability.tracing.build_span_exporter", return_value=self.exporter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutdown_tracing)
+
+    def _execute(self, **headers):
+        """Run QUERY through the Django and Graphene middlewares and return the finished spans by name."""
+
+        def get_response(request):
+            result = graphql_sync(SCHEMA, QUERY, context_value=request, middleware=[PrometheusMiddleware()])
+            self.assertIsNone(result.errors)
+            return HttpResponse()
+
+        request = self.factory.post("/api/graphql/", **headers)
+        request.user = AnonymousUser()
+        GraphQLObservabilityDjangoMiddleware(get_response)(request)
+        shutdown_tracing()
+        return {span.name: span for span in self.exporter.get_finished_spans()}
+
+    @override_settings(PLUGINS_CONFIG=_tracing_config())
+    def test_request_span_is_named_after_the_operation(self):
+        spans = self._execute()
+
+        span = spans["query DeviceNames"]
+        self.assertEqual(span.attributes["graphql.operation.type"], "query")
+        self.assertEqual(span.attributes["graphql.operation.name"], "DeviceNames")
+        self.assertEqual(span.attributes["graphql.query.depth"], 2)
+        self.assertEqual(span.attributes["http.status_code"], 200)
+        self.assertIsNone(span.parent)
+
+    @override_settings(PLUGINS_CONFIG=_tracing_config())
+    def test_incoming_traceparent_is_continued(self):
+        spans = self._execute(HTTP_TRACEPARENT=TRACEPARENT)
+
+        span = spans["query DeviceNames"]
+        self.assertEqual(f"{span.context.trace_id:032x}", "0af7651916cd43dd8448eb211c80319c")
+        self.assertEqual(f"{span.parent.span_id:016x}", "b7ad6b7169203331")
+
+    @override_settings(PLUGINS_CONFIG=_tracing_config())
+    def test_root_fields_are_children_of_the_request_span(self):
+        spans = self._execute()
+
+        self.assertEqual(spans["Query.devices"].parent.span_id, spans["query DeviceNames"].context.span_id)
+        self.assertEqual(spans["Query.devices"].attributes["graphql.field.path"], "devices")
+        self.assertNotIn("Device.name", spans)
+
+    @override_settings(
+        PLUGINS_CONFIG=_tracing_config(track_field_resolution=True, field_resolution_sample_rate=1.0),
+    )
+    def test_nested_fields_of_sampled_operations_are_traced(self):
+        self._execute()
+
+        spans = self.exporter.get_finished_spans()
+        root_field = next(span for span in spans if span.name == "Query.devices")
+        nested = [span for span in spans if span.name == "Device.name"]
+        self.assertEqual(len(nested), 2)
+        for span in nested:
+            self.assertEqual(span.parent.span_id, root_field.context.span_id)
+
+    @override_settings(PLUGINS_CONFIG=_tracing_config(tracing_sample_rate=0.0))
+    def test_unsampled_traces_are_not_recorded(self):
+        request_attrs = []
+
+        def get_response(request):
+            request_attrs.append(hasattr(request, _REQUEST_ATTR))
+            return HttpResponse()
+
+        GraphQLObservabilityDjangoMiddleware(get_response)(self.factory.post("/api/graphql/"))
+        shutdown_tracing()
+
+        self.assertEqual(request_attrs, [False])
+        self.assertEqual(self.exporter.get_finished_spans(), ())
+
+    def test_tracing_is_disabled_by_default(self):
+        spans = self._execute()
+
+        self.assertEqual(spans, {})
@@ -2,8 +2,10 @@
 
 from django.test import TestCase
 from graphql import parse
+from graphql.language.ast import FieldNode, NameNode, SelectionSetNode
 
 from nautobot_graphql_observability.utils import (
+    analyze_selection_set,
     calculate_query_complexity,
     calculate_query_depth,
 )
@@ -92,3 +94,98 @@ class CalculateQueryComplexityTest(TestCase):
         fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
         # devices + id + name = 3
         self.assertEqual(calculate_query_complexity(op.selection_set, fragments), 3)
+
+
+class AnalyzeSelectionSetTest(TestCase):
+    """Test cases for the single-pass analyze_selection_set walker."""
+
+    def test_all_statistics_in_one_pass(self):
+        doc = parse("""
+            query Stats {
+                first: devices { id name ...Loc }
+                locations { id }
+            }
+            fragment Loc on DeviceType {
+                location { name parent { name } }
+            }
+        """)
+        op = doc.definitions[0]
+        fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
+
+        stats = analyze_selection_set(op.selection_set, fragments)
+
+        self.assertEqual(stats.depth, 4)
+        # devices + id + name + location + name + parent + name + locations + id = 9
+        self.assertEqual(stats.field_count, 9)
+        self.assertEqual(stats.root_fields, ("devices", "locations"))
+        self.assertEqual(stats.alias_count, 1)
+        self.assertEqual(stats.fragment_count, 1)
+        # devices { id name location } once the fragment is expanded
+        self.assertEqual(stats.max_breadth, 3)
+        self.assertFalse(stats.has_fragment_cycle)
+
+    def test_empty_selection_set(self):
+        stats = analyze_selection_set(None)
+
+        self.assertEqual(stats.depth, 0)
+        self.assertEqual(stats.field_count, 0)
+        self.assertEqual(stats.root_fields, ())
+
+    def test_reused_fragments_are_expanded_at_each_spread(self):
+        doc = parse("""
+            { a: devices { ...F } b: devices { ...F } }
+            fragment F on DeviceType { id name }
+        """)
+        op = doc.definitions[0]
+        fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
+
+        stats = analyze_selection_set(op.selection_set, fragments)
+
+        # 2 x (devices + id + name) = 6
+        self.assertEqual(stats.field_count, 6)
+        self.assertEqual(stats.fragment_count, 1)
+        self.assertEqual(stats.alias_count, 2)
+
+    def test_nested_fragment_fan_out_is_linear(self):
+        # Each fragment spreads the next one twice: full expansion is 2**40 leaf fields.
+        levels = 40
+        definitions = [f"fragment F{i} on T {{ a: x {{ ...F{i + 1} }} b: x {{ ...F{i + 1} }} }}" for i in range(levels)]
+        definitions.append(f"fragment F{levels} on T {{ id }}")
+        doc = parse("{ root { ...F0 } } " + " ".join(definitions))
+        op = doc.definitions[0]
+        fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
+
+        stats = analyze_selection_set(op.selection_set, fragments)
+
+        self.assertEqual(stats.depth, levels + 2)
+        self.assertEqual(stats.fragment_count, levels + 1)
+        self.assertEqual(stats.field_count, 1 + sum(2**i for i in range(1, levels + 1)) + 2**levels)
+
+    def test_deep_document_does_not_recurse(self):
+        # Built directly as an AST: graphql-core's own parser is recursive too.
+        depth = 5000
+        selection_set = SelectionSetNode(selections=(FieldNode(name=NameNode(value="id")),))
+        for _ in range(depth):
+            selection_set = SelectionSetNode(
+                selections=(FieldNode(name=NameNode(value="a"), selection_set=selection_set),)
+            )
+
+        stats = analyze_selection_set(selection_set)
+
+        self.assertEqual(stats.depth, depth + 1)
+        self.assertEqual(stats.field_count, depth + 1)
+
+    def test_fragment_cycle_is_detected(self):
+        doc = parse("""
+            { devices { ...A } }
+            fragment A on DeviceType { id ...B }
+            fragment B on DeviceType { name ...A }
+        """)
+        op = doc.definitions[0]
+        fragments = {frag.name.value: frag for frag in doc.definitions[1:]}
+
+        stats = analyze_selection_set(op.selection_set, fragments)
+
+        self.assertTrue(stats.has_fragment_cycle)
+        # devices + id + name
+        self.assertEqual(stats.field_count, 3)
@@ -0,0 +1,103 @@
+"""Tests for the app views."""
+
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import PermissionDenied
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.exposition import clear_rendered_metrics
+from nautobot_graphql_observability.slow_operations import get_slow_operation_buffer
+from nautobot_graphql_observability.views import AppMetricsView, SlowOperationsView
+
+
+class AppMetricsViewTest(TestCase):
+    """Test cases for AppMetricsView."""
+
+    def setUp(self):
+        clear_rendered_metrics()
+        self.addCleanup(clear_rendered_metrics)
+        self.factory = RequestFactory()
+        self.view = AppMetricsView.as_view()
+
+    def _get(self, **headers):
+        request = self.factory.get(reverse("plugins:nautobot_graphql_observability:metrics"), **headers)
+        request.user = AnonymousUser()
+        return self.view(request)
+
+    def test_prometheus_accept_header_is_honoured(self):
+        response = self._get(HTTP_ACCEPT="text/plain;version=0.0.4;q=0.5,*/*;q=0.1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"# TYPE graphql_requests_total counter", response.content)
+
+    def test_openmetrics_and_gzip(self):
+        response = self._get(
+            HTTP_ACCEPT="application/openmetrics-text;version=1.0.0,text/plain;q=0.5",
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("application/openmetrics-text"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    @override_settings(METRICS_AUTHENTICATED=True)
+    def test_authentication_follows_nautobot_setting(self):
+        response = self._get()
+
+        self.assertIn(response.status_code, (401, 403))
+
+
+class SlowOperationsViewTest(TestCase):
+    """Test cases for SlowOperationsView."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            PLUGINS_CONFIG={
+                "nautobot_graphql_observability": {
+                    "slow_operations_enabled": True,
+                    "slow_operation_buffer_path": os.path.join(directory.name, "slow.bin"),
+                }
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        buffer = get_slow_operation_buffer(get_app_settings())
+        buffer.record(2.5, "query", "DeviceList", "alice", 3, 30, "query DeviceList { devices { name } }")
+        buffer.record(1.5, "query", "LocationList", "bob", 2, 10, "query LocationList { locations { name } }")
+        self.factory = RequestFactory()
+
+    def _get(self, requester, **params):
+        request = self.factory.get(reverse("plugins:nautobot_graphql_observability:slow_operations"), params)
+        request.user = requester
+        return SlowOperationsView.as_view()(request)
+
+    def _staff_user(self):
+        return MagicMock(is_authenticated=True, is_active=True, is_staff=True)
+
+    def test_lists_filtered_and_sorted_operations(self):
+        response = self._get(self._staff_user(), user="ali", sort="duration")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry.operation_name for entry in response.context_data["operations"]], ["DeviceList"])
+        self.assertEqual(
+            response.context_data["sort_links"]["duration"], "?operation_name=&user=ali&min_duration_ms=&sort=-duration"
+        )
+
+    def test_invalid_minimum_duration_is_ignored(self):
+        response = self._get(self._staff_user(), min_duration_ms="slow")
+
+        self.assertEqual(len(response.context_data["operations"]), 2)
+
+    def test_requires_a_staff_user(self):
+        self.assertEqual(self._get(AnonymousUser()).status_code, 302)
+        with self.assertRaises(PermissionDenied):
+            self._get(MagicMock(is_authenticated=True, is_active=True, is_staff=False, is_superuser=False))
@@ -0,0 +1,342 @@
+"""OpenTelemetry tracing of GraphQL operations and fields.
+
+Histograms say that an operation is slow; a trace says which field of which
+request. With ``tracing_enabled``:
+
+- :class:`GraphQLObservabilityDjangoMiddleware
+  <nautobot_graphql_observability.django_middleware.GraphQLObservabilityDjangoMiddleware>`
+  opens a server span per GraphQL request, renamed ``<operation type>
+  <operation name>`` once the operation is known. The span continues the
+  trace of the incoming W3C ``traceparent`` header, or is the child of the
+  span already active when another instrumentation (such as Nautobot's own
+  OpenTelemetry Django instrumentation) traces the request.
+- :class:`PrometheusMiddleware <nautobot_graphql_observability.middleware.PrometheusMiddleware>`
+  opens a child span per root field and, in operations sampled for per-field
+  timing (see :mod:`~nautobot_graphql_observability.sampling`), per nested
+  field. A nested field span is the child of the span of the field it belongs
+  to, so the trace follows the shape of the response.
+
+Spans are recorded by a tracer provider private to the app: enabling tracing
+here leaves the global provider used by other instrumentations untouched. The
+provider samples traces with ``tracing_sample_rate`` (respecting the decision
+of a sampled parent) and hands them to a batch span processor, which exports
+them from a background thread with:
+
+- ``"otlp"``: the OTLP exporter (``tracing_otlp_protocol`` ``"grpc"`` or
+  ``"http"``), to ``tracing_otlp_endpoint`` or, when empty, Nautobot's
+  ``OTEL_EXPORTER_OTLP_ENDPOINT``.
+- ``"jsonl"``: :class:`JsonLinesSpanExporter`, appending one JSON object per
+  span to ``tracing_jsonl_path``; no collector is needed.
+
+The provider is built on the first traced request of each worker, never
+before the server forks: the gRPC channel of the OTLP exporter does not
+survive a fork.
+
+The OpenTelemetry SDK and OTLP exporter come with the app's ``tracing``
+extra. Without them, the module still imports and tracing stays disabled,
+with a warning, when ``tracing_enabled`` is set.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+except ImportError:  # Without the "tracing" extra.
+    trace = None
+    SpanExporter = object
+
+from nautobot_graphql_observability import __version__
+from nautobot_graphql_observability.n_plus_one import format_path
+
+logger = logging.getLogger(__name__)
+
+EXPORTER_OTLP = "otlp"
+EXPORTER_JSONL = "jsonl"
+TRACING_EXPORTERS = (EXPORTER_OTLP, EXPORTER_JSONL)
+OTLP_PROTOCOL_GRPC = "grpc"
+OTLP_PROTOCOL_HTTP = "http"
+OTLP_PROTOCOLS = (OTLP_PROTOCOL_GRPC, OTLP_PROTOCOL_HTTP)
+
+# Key used to stash the request's OperationTrace for the Graphene middleware.
+_REQUEST_ATTR = "_graphql_trace"
+
+# Incoming headers read by the W3C trace-context propagator.
+_TRACE_CONTEXT_HEADERS = ("traceparent", "tracestate")
+
+_propagator = TraceContextTextMapPropagator() if trace is not None else None
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Span exporter appending one JSON object per span to a file.
+
+    Args:
+        path (str): The file spans are appended to.
+    """
+
+    def __init__(self, path):
+        """Initialize the exporter; the file is opened on each export."""
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        """Append a batch of finished spans to the file."""
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as stream:
+                stream.write(lines)
+        except OSError:
+            logger.exception("Cannot write GraphQL spans to %s", self.path)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        """Nothing to release: the file is closed after each export."""
+
+
+def build_span_exporter(config):
+    """Return the span exporter selected by ``tracing_exporter``, or None if it cannot be built.
+
+    ``tracing_exporter`` and ``tracing_otlp_protocol`` are validated with the
+    app settings, so any exporter other than ``"jsonl"`` is OTLP.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    if config.tracing_exporter == EXPORTER_JSONL:
+        if not config.tracing_jsonl_path:
+            logger.warning("tracing_exporter is %r but tracing_jsonl_path is not set.", EXPORTER_JSONL)
+            return None
+        return JsonLinesSpanExporter(config.tracing_jsonl_path)
+
+    from django.conf import settings  # pylint: disable=import-outside-toplevel
+
+    options = {}
+    endpoint = config.tracing_otlp_endpoint or getattr(settings, "OTEL_EXPORTER_OTLP_ENDPOINT", "")
+    if endpoint:
+        options["endpoint"] = endpoint
+    try:
+        if config.tracing_otlp_protocol == OTLP_PROTOCOL_HTTP:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (  # pylint: disable=import-outside-toplevel
+                OTLPSpanExporter,
+            )
+        else:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (  # pylint: disable=import-outside-toplevel
+                OTLPSpanExporter,
+            )
+    except ImportError:
+        logger.warning("The OTLP %s span exporter is not installed.", config.tracing_otlp_protocol)
+        return None
+    return OTLPSpanExporter(**options)
+
+
+def build_tracer_provider(config):
+    """Return a tracer provider exporting through a batch span processor, or None without OpenTelemetry or exporter.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    if trace is None:
+        logger.warning(
+            "tracing_enabled is set but OpenTelemetry is not installed; "
+            "install nautobot-graphql-observability[tracing] to record spans."
+        )
+        return None
+    exporter = build_span_exporter(config)
+    if exporter is None:
+        return None
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(config.tracing_sample_rate)),
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(
+            exporter,
+            max_queue_size=config.tracing_max_queue_size,
+            max_export_batch_size=min(config.tracing_max_export_batch_size, config.tracing_max_queue_size),
+        )
+    )
+    return provider
+
+
+def get_tracer(config):
+    """Return the worker-wide tracer for the given app settings, or None if tracing cannot be set up.
+
+    The tracer provider is built on first use and rebuilt only when the
+    settings snapshot changes; the previous provider is then shut down,
+    flushing its pending spans.
+
+    Args:
+        config (AppSettings): The current app settings snapshot.
+    """
+    global _tracer  # noqa: PLW0603  # pylint: disable=global-statement
+    tracer = _tracer
+    if tracer is None or tracer[0] is not config:
+        with _tracer_lock:
+            tracer = _tracer
+            if tracer is None or tracer[0] is not config:
+                if tracer is not None and tracer[1] is not None:
+                    tracer[1].shutdown()
+                provider = build_tracer_provider(config)
+                tracer = _tracer = (
+                    config,
+                    provider,
+                    provider.get_tracer(__name__, __version__) if provider is not None else None,
+                )
+    return tracer[2]
+
+
+def shutdown_tracing():
+    """Flush and shut down the tracer provider, if any; the next traced request builds a new one."""
+    global _tracer  # noqa: PLW0603  # pylint: disable=global-statement
+    with _tracer_lock:
+        tracer, _tracer = _tracer, None
+    if tracer is not None and tracer[1] is not None:
+        tracer[1].shutdown()
+
+
+def extract_parent_context(request):
+    """Return the parent context of the request span.
+
+    The span active when the request reaches the middleware wins (another
+    instrumentation already continued the incoming trace); otherwise the
+    incoming ``traceparent`` header, if any, is continued.
+
+    Args:
+        request: The Django request object.
+
+    Returns:
+        Context | None: The parent context, or None to use the current one.
+    """
+    if trace.get_current_span().get_span_context().is_valid:
+        return None
+    carrier = {name: request.headers[name] for name in _TRACE_CONTEXT_HEADERS if name in request.headers}
+    return _propagator.extract(carrier) if carrier else None
+
+
+class OperationTrace:
+    """The spans of one traced GraphQL request.
+
+    Args:
+        tracer (Tracer): The app tracer.
+        span (Span): The request span, parent of the root field spans.
+    """
+
+    __slots__ = ("tracer", "span", "context", "_field_contexts")
+
+    def __init__(self, tracer, span):
+        """Initialize the trace of a request whose span is already started."""
+        self.tracer = tracer
+        self.span = span
+        self.context = trace.set_span_in_context(span)
+        self._field_contexts = {}
+
+    @contextmanager
+    def field_span(self, info):
+        """Record the resolution of a field in a span, current for the duration of the block.
+
+        The span is the child of the span of the closest parent field, or of
+        the request span for root fields and parents that were not traced.
+
+        Args:
+            info (GraphQLResolveInfo): GraphQL resolve info of the field.
+
+        Yields:
+            Span: The field span.
+        """
+        parent = info.path.prev
+        while parent is not None and not isinstance(parent.key, str):
+            parent = parent.prev
+        context = self._field_contexts.get(parent, self.context) if parent is not None else self.context
+        parent_type = info.parent_type.name if info.parent_type else "Unknown"
+        with self.tracer.start_as_current_span(
+            f"{parent_type}.{info.field_name}",
+            context=context,
+            attributes={
+                "graphql.field.name": info.field_name,
+                "graphql.field.parent_type": parent_type,
+                "graphql.field.path": format_path(info.path),
+            },
+        ) as span:
+            self._field_contexts[info.path] = trace.set_span_in_context(span, context)
+            yield span
+
+    def finish(self, meta, response, db_stats=None, n_plus_one=None):
+        """Name the request span after its operation and record the operation's attributes.
+
+        Args:
+            meta (dict): The metadata stashed by ``PrometheusMiddleware``, or None if no operation ran.
+            response (HttpResponse): The response of the request.
+            db_stats (QueryStatsWrapper): SQL statements run during the request, if tracked.
+            n_plus_one (list[NPlusOneFinding]): N+1 findings of the operation, if detected.
+        """
+        span = self.span
+        span.set_attribute("http.status_code", response.status_code)
+        if meta is not None:
+            operation_type = meta["operation_type"]
+            span.set_attribute("graphql.operation.type", operation_type)
+            analysis = meta.get("analysis")
+            if analysis is not None:
+                span.update_name(f"{operation_type} {analysis.operation_name}")
+                span.set_attribute("graphql.operation.name", analysis.operation_name)
+                span.set_attribute("graphql.query.depth", analysis.depth)
+                span.set_attribute("graphql.query.complexity", analysis.complexity)
+            if meta.get("fingerprint") is not None:
+                span.set_attribute("graphql.operation.fingerprint", meta["fingerprint"])
+            if meta.get("persisted_query") is not None:
+                span.set_attribute("graphql.persisted_query.hash", meta["persisted_query"])
+            if meta.get("cost") is not None:
+                span.set_attribute("graphql.query.cost", meta["cost"])
+            if meta.get("error"):
+                span.set_status(trace.StatusCode.ERROR)
+        if db_stats is not None:
+            span.set_attribute("graphql.db.queries", db_stats.queries)
+            span.set_attribute("graphql.db.duration_ms", round(db_stats.duration * 1000, 3))
+            span.set_attribute("graphql.db.rows", db_stats.rows)
+        for finding in n_plus_one or ():
+            span.add_event(
+                "graphql.n_plus_one",
+                {
+                    "graphql.field.path": finding.path,
+                    "db.statements": finding.statements,
+                    "db.query.text": finding.template,
+                },
+            )
+
+
+@contextmanager
+def trace_request(request, config):
+    """Open the span of a GraphQL request and stash its :class:`OperationTrace` on the request.
+
+    Args:
+        request: The Django request object.
+        config (AppSettings): The current app settings snapshot.
+
+    Yields:
+        OperationTrace | None: The trace of the request, or None if it is not recorded
+        (tracing cannot be set up, or the trace was not sampled).
+    """
+    tracer = get_tracer(config)
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(
+        "graphql",
+        context=extract_parent_context(request),
+        kind=trace.SpanKind.SERVER,
+        attributes={"http.request.method": request.method, "url.path": request.path},
+    ) as span:
+        if not span.is_recording():
+            yield None
+            return
+        operation_trace = OperationTrace(tracer, span)
+        setattr(request, _REQUEST_ATTR, operation_trace)
+        yield operation_trace
@@ -5,10 +5,14 @@ from django.urls import path
 from django.views.generic import RedirectView
 from nautobot.apps.urls import NautobotUIViewSetRouter
 
+from nautobot_graphql_observability.views import AppMetricsView, SlowOperationsView
+
 app_name = "nautobot_graphql_observability"
 router = NautobotUIViewSetRouter()
 
 urlpatterns = [
+    path("metrics/", AppMetricsView.as_view(), name="metrics"),
+    path("slow-operations/", SlowOperationsView.as_view(), name="slow_operations"),
     path("docs/", RedirectView.as_view(url=static("nautobot_graphql_observability/docs/index.html")), name="docs"),
 ]
 
@@ -1,5 +1,7 @@
 """Utilities for analyzing GraphQL query AST and request handling."""
 
+from typing import NamedTuple
+
 from graphql.language.ast import (
     FieldNode,
     FragmentSpreadNode,
@@ -8,35 +10,163 @@ from graphql.language.ast import (
 )
 
 
-def calculate_query_depth(selection_set, fragments=None, current_depth=0):
-    """Calculate the maximum nesting depth of a GraphQL selection set.
+class QueryStats(NamedTuple):
+    """Structural statistics of a GraphQL selection set, as computed by :func:`analyze_selection_set`."""
+
+    depth: int
+    field_count: int
+    root_fields: tuple
+    alias_count: int
+    fragment_count: int
+    max_breadth: int
+    has_fragment_cycle: bool
+
+
+class _Frame:  # pylint: disable=too-few-public-methods
+    """Traversal state of one selection set on the explicit stack of :func:`analyze_selection_set`."""
+
+    __slots__ = ("selections", "index", "kind", "fragment_name", "depth", "fields", "aliases", "breadth", "max_breadth")
+
+    def __init__(self, selection_set, kind, fragment_name=None):
+        self.selections = selection_set.selections
+        self.index = 0
+        self.kind = kind
+        self.fragment_name = fragment_name
+        self.depth = 0
+        self.fields = 0
+        self.aliases = 0
+        self.breadth = 0
+        self.max_breadth = 0
+
+    def merge(self, depth, fields, aliases, breadth, max_breadth):
+        """Fold the summary of a fragment selected at this level into the frame."""
+        self.depth = max(self.depth, depth)
+        self.fields += fields
+        self.aliases += aliases
+        self.breadth += breadth
+        self.max_breadth = max(self.max_breadth, max_breadth)
+
+    def summary(self):
+        """Return ``(depth, fields, aliases, breadth, max_breadth)`` for the completed selection set."""
+        return self.depth, self.fields, self.aliases, self.breadth, max(self.max_breadth, self.breadth)
+
+
+# Kinds of selection set a _Frame can walk, i.e. what its summary is folded into.
+_ROOT, _FIELD, _INLINE, _FRAGMENT = range(4)
+
+
+def analyze_selection_set(selection_set, fragments=None):  # noqa: C901  # pylint: disable=too-many-branches
+    """Compute the structural statistics of a GraphQL selection set in a single pass.
+
+    The walk uses an explicit stack instead of recursion, so arbitrarily deep
+    documents cannot hit Python's recursion limit. Each fragment definition is
+    summarized once and the summary is reused for every later spread of it, which
+    keeps the cost linear in the size of the document even when fragments are
+    nested and reused. A spread of a fragment that is still being walked is a
+    cycle: it is skipped and reported through ``has_fragment_cycle``.
+
+    Statistics are computed as if every fragment were expanded in place:
+
+    - ``depth``: maximum field nesting level.
+    - ``field_count``: total number of fields selected.
+    - ``root_fields``: names of the fields selected directly at the top level, in document order.
+    - ``alias_count``: number of aliased fields.
+    - ``fragment_count``: number of distinct named fragments used.
+    - ``max_breadth``: largest number of fields selected in a single selection set.
 
     Args:
         selection_set: A GraphQL SelectionSetNode to walk.
         fragments: Dict of fragment name to FragmentDefinitionNode for resolving spreads.
-        current_depth: The current recursion depth (used internally).
 
     Returns:
-        int: The maximum depth found.
+        QueryStats: The statistics of the selection set.
     """
     if not selection_set or not isinstance(selection_set, SelectionSetNode):
-        return current_depth
+        return QueryStats(0, 0, (), 0, 0, 0, False)
+
+    fragments = fragments or {}
+    memo = {}
+    in_progress = set()
+    has_cycle = False
+    root_fields = []
+    result = None
+
+    stack = [_Frame(selection_set, _ROOT)]
+    while stack:
+        frame = stack[-1]
+        if frame.index < len(frame.selections):
+            selection = frame.selections[frame.index]
+            frame.index += 1
+            if isinstance(selection, FieldNode):
+                frame.fields += 1
+                frame.breadth += 1
+                if selection.alias is not None:
+                    frame.aliases += 1
+                if frame.kind == _ROOT:
+                    root_fields.append(selection.name.value)
+                if selection.selection_set and selection.selection_set.selections:
+                    stack.append(_Frame(selection.selection_set, _FIELD))
+                else:
+                    frame.depth = max(frame.depth, 1)
+            elif isinstance(selection, InlineFragmentNode):
+                if selection.selection_set:
+                    stack.append(_Frame(selection.selection_set, _INLINE))
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                summary = memo.get(name)
+                if summary is not None:
+                    frame.merge(*summary)
+                elif name in in_progress:
+                    has_cycle = True
+                else:
+                    fragment = fragments.get(name)
+                    if fragment is not None and fragment.selection_set:
+                        in_progress.add(name)
+                        stack.append(_Frame(fragment.selection_set, _FRAGMENT, name))
+            continue
+
+        stack.pop()
+        summary = frame.summary()
+        if frame.kind == _FRAGMENT:
+            memo[frame.fragment_name] = summary
+            in_progress.discard(frame.fragment_name)
+
+        if not stack:
+            result = summary
+            break
+        parent = stack[-1]
+        if frame.kind == _FIELD:
+            depth, fields, aliases, _breadth, max_breadth = summary
+            parent.depth = max(parent.depth, depth + 1)
+            parent.fields += fields
+            parent.aliases += aliases
+            parent.max_breadth = max(parent.max_breadth, max_breadth)
+        else:
+            parent.merge(*summary)
+
+    depth, fields, aliases, _breadth, max_breadth = result
+    return QueryStats(
+        depth=depth,
+        field_count=fields,
+        root_fields=tuple(root_fields),
+        alias_count=aliases,
+        fragment_count=len(memo),
+        max_breadth=max_breadth,
+        has_fragment_cycle=has_cycle,
+    )
+
+
+def calculate_query_depth(selection_set, fragments=None):
+    """Calculate the maximum nesting depth of a GraphQL selection set.
 
-    max_depth = current_depth
-    for selection in selection_set.selections:
-        if isinstance(selection, FieldNode):
-            child_depth = calculate_query_depth(selection.selection_set, fragments, current_depth + 1)
-            max_depth = max(max_depth, child_depth)
-        elif isinstance(selection, InlineFragmentNode):
-            child_depth = calculate_query_depth(selection.selection_set, fragments, current_depth)
-            max_depth = max(max_depth, child_depth)
-        elif isinstance(selection, FragmentSpreadNode) and fragments:
-            fragment = fragments.get(selection.name.value)
-            if fragment:
-                child_depth = calculate_query_depth(fragment.selection_set, fragments, current_depth)
-                max_depth = max(max_depth, child_depth)
+    Args:
+        selection_set: A GraphQL SelectionSetNode to walk.
+        fragments: Dict of fragment name to FragmentDefinitionNode for resolving spreads.
 
-    return max_depth
+    Returns:
+        int: The maximum depth found.
+    """
+    return analyze_selection_set(selection_set, fragments).depth
 
 
 def calculate_query_complexity(selection_set, fragments=None):
@@ -49,22 +179,7 @@ def calculate_query_complexity(selection_set, fragments=None):
     Returns:
         int: The total number of fields in the query.
     """
-    if not selection_set or not isinstance(selection_set, SelectionSetNode):
-        return 0
-
-    count = 0
-    for selection in selection_set.selections:
-        if isinstance(selection, FieldNode):
-            count += 1
-            count += calculate_query_complexity(selection.selection_set, fragments)
-        elif isinstance(selection, InlineFragmentNode):
-            count += calculate_query_complexity(selection.selection_set, fragments)
-        elif isinstance(selection, FragmentSpreadNode) and fragments:
-            fragment = fragments.get(selection.name.value)
-            if fragment:
-                count += calculate_query_complexity(fragment.selection_set, fragments)
-
-    return count
+    return analyze_selection_set(selection_set, fragments).field_count
 
 
 def stash_meta_on_request(request, attr_name, meta):
@@ -84,3 +199,18 @@ def stash_meta_on_request(request, attr_name, meta):
     wsgi_request = getattr(request, "_request", None)
     if wsgi_request is not None:
         setattr(wsgi_request, attr_name, meta)
+
+
+def get_request_username(request):
+    """Return the username of the authenticated user of a request.
+
+    Args:
+        request: The request object (DRF Request or WSGIRequest).
+
+    Returns:
+        str: The username, or ``"anonymous"`` for unauthenticated requests.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return user.username
+    return "anonymous"
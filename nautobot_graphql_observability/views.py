@@ -1 +1,118 @@
 """Views for the nautobot_graphql_observability app."""
+
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from nautobot.apps.views import AdminRequiredMixin, GenericView
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+
+from nautobot_graphql_observability.app_settings import get_app_settings
+from nautobot_graphql_observability.exposition import render_metrics
+from nautobot_graphql_observability.slow_operations import (
+    SORT_FIELDS,
+    get_buffer_path,
+    get_slow_operation_buffer,
+    select_slow_operations,
+)
+
+
+class AppMetricsView(APIView):
+    """Expose the app's Prometheus metrics.
+
+    Unlike Nautobot's ``/metrics/``, the view does no API versioning, so the
+    ``Accept`` headers sent by Prometheus are honoured rather than rejected:
+    ``application/openmetrics-text`` selects the OpenMetrics format and
+    ``Accept-Encoding: gzip`` a compressed body. Authentication follows
+    Nautobot's ``METRICS_AUTHENTICATED`` setting.
+    """
+
+    renderer_classes = [JSONRenderer]
+    versioning_class = None
+    serializer_class = None
+
+    def get_permissions(self):
+        """Require an authenticated user when ``METRICS_AUTHENTICATED`` is set."""
+        if getattr(settings, "METRICS_AUTHENTICATED", False):
+            return [IsAuthenticated()]
+        return [AllowAny()]
+
+    def perform_content_negotiation(self, request, force=False):
+        """Never reject the scraper's ``Accept`` header; only error responses are rendered by DRF."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        """Return the rendered metrics."""
+        body, content_type, encoding = render_metrics(
+            request.META.get("HTTP_ACCEPT"),
+            request.META.get("HTTP_ACCEPT_ENCODING"),
+            get_app_settings().metrics_endpoint_cache_ttl,
+        )
+        response = HttpResponse(body, content_type=content_type)
+        response["Vary"] = "Accept, Accept-Encoding"
+        if encoding:
+            response["Content-Encoding"] = encoding
+        return response
+
+
+class SlowOperationsView(AdminRequiredMixin, GenericView):
+    """List the slow operations kept in the buffer shared by the workers.
+
+    Query parameters filter the list (``operation_name`` and ``user`` on a
+    case-insensitive substring, ``min_duration_ms`` on the duration) and sort
+    it (``sort``: one of
+    :data:`~nautobot_graphql_observability.slow_operations.SORT_FIELDS`,
+    prefixed with ``-`` for descending order). Restricted to staff users, as
+    the query text may contain sensitive values.
+    """
+
+    template_name = "nautobot_graphql_observability/slow_operations.html"
+
+    def get(self, request):
+        """Render the filtered and sorted slow operations."""
+        config = get_app_settings()
+        filters = {
+            "operation_name": request.GET.get("operation_name", "").strip(),
+            "user": request.GET.get("user", "").strip(),
+            "min_duration_ms": request.GET.get("min_duration_ms", "").strip(),
+        }
+        try:
+            min_duration_ms = float(filters["min_duration_ms"] or 0)
+        except ValueError:
+            min_duration_ms = 0.0
+        sort = request.GET.get("sort", "-timestamp")
+
+        operations = []
+        if config.slow_operations_enabled:
+            buffer = get_slow_operation_buffer(config)
+            if buffer is not None:
+                operations = select_slow_operations(
+                    buffer.entries(),
+                    operation_name=filters["operation_name"],
+                    user=filters["user"],
+                    min_duration_ms=min_duration_ms,
+                    sort=sort,
+                )
+
+        # Header links sort by their column, toggling the direction of the current one.
+        sort_links = {
+            field: "?" + urlencode({**filters, "sort": field if sort == f"-{field}" else f"-{field}"})
+            for field in SORT_FIELDS
+        }
+        return TemplateResponse(
+            request,
+            self.template_name,
+            {
+                "title": "Slow GraphQL Operations",
+                "enabled": config.slow_operations_enabled,
+                "threshold_ms": config.slow_operation_threshold_ms,
+                "buffer_path": get_buffer_path(config),
+                "operations": operations,
+                "filters": filters,
+                "sort": sort,
+                "sort_links": sort_links,
+            },
+        )
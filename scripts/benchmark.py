@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of the GraphQL middlewares and AST utilities.
+
+Generated documents of increasing size, depth and fragment fan-out are run
+against a synthetic Graphene schema (resolvers return in-memory objects, no
+database is involved) to measure:
+
+- the per-field overhead of ``PrometheusMiddleware`` and
+  ``GraphQLQueryLoggingMiddleware``, behind ``GraphQLObservabilityDjangoMiddleware``,
+  with every feature flag disabled, enabled one at a time and all enabled,
+  compared with an execution without any middleware (middlewares disabled by
+  the settings are left out of the chain, as in the GraphQL API);
+- the cost of getting the middleware chain of a request and wrapping the
+  resolvers of the document in it, with both middlewares instantiated per
+  request, as Graphene-Django does, or shared through ``get_middleware_chain``;
+- ``calculate_query_depth``, ``calculate_query_complexity`` and ``_extract_query_body``.
+
+Results are printed as a table and can be written as JSON. With ``--compare``,
+they are checked against an earlier JSON file and the script exits with
+status 1 if any benchmark got slower by more than ``--max-regression``.
+
+Must run where Nautobot is configured (``NAUTOBOT_CONFIG``), e.g. through
+``invoke benchmark``.
+
+Usage:
+    python scripts/benchmark.py [--quick] [--output results.json] [--compare baseline.json] [--max-regression 0.25]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import NamedTuple
+
+import nautobot
+
+nautobot.setup()
+
+# pylint: disable=wrong-import-position
+import graphene  # noqa: E402
+import graphql  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from graphene_django import settings as graphene_django_settings  # noqa: E402
+from graphene_django.views import instantiate_middleware  # noqa: E402
+from graphql import MiddlewareManager, default_field_resolver, graphql_sync, parse  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from nautobot_graphql_observability import __version__  # noqa: E402
+from nautobot_graphql_observability.app_settings import get_app_settings  # noqa: E402
+from nautobot_graphql_observability.django_middleware import GraphQLObservabilityDjangoMiddleware  # noqa: E402
+from nautobot_graphql_observability.logging_middleware import (  # noqa: E402
+    GraphQLQueryLoggingMiddleware,
+    _extract_query_body,
+)
+from nautobot_graphql_observability.middleware import PrometheusMiddleware  # noqa: E402
+from nautobot_graphql_observability.middleware_chain import get_middleware_chain  # noqa: E402
+from nautobot_graphql_observability.tracing import shutdown_tracing  # noqa: E402
+from nautobot_graphql_observability.utils import calculate_query_complexity, calculate_query_depth  # noqa: E402
+
+APP_NAME = "nautobot_graphql_observability"
+QUERY_LOGGER = "nautobot_graphql_observability.graphql_query_log"
+
+# Every optional feature disabled; scenarios enable them one at a time.
+BASE_SETTINGS = {
+    "graphql_metrics_enabled": True,
+    "track_query_depth": False,
+    "track_query_complexity": False,
+    "track_query_cost": False,
+    "track_query_fingerprint": False,
+    "track_per_user": False,
+    "track_field_resolution": False,
+    "track_db_queries": False,
+    "detect_n_plus_one": False,
+    "query_logging_enabled": False,
+    "log_query_body": False,
+    "log_query_variables": False,
+    "log_query_fingerprint": False,
+    "slow_operations_enabled": False,
+    "tracing_enabled": False,
+    "track_overhead": False,
+    "tracing_exporter": "jsonl",
+    "tracing_jsonl_path": os.devnull,
+}
+
+PROMETHEUS_FLAGS = (
+    "track_query_depth",
+    "track_query_complexity",
+    "track_query_cost",
+    "track_query_fingerprint",
+    "track_per_user",
+    "track_field_resolution",
+    "track_db_queries",
+    "detect_n_plus_one",
+    "tracing_enabled",
+    "track_overhead",
+)
+LOGGING_FLAGS = ("log_query_body", "log_query_variables", "log_query_fingerprint")
+
+GRAPHENE_MIDDLEWARE = [
+    "nautobot_graphql_observability.logging_middleware.GraphQLQueryLoggingMiddleware",
+    "nautobot_graphql_observability.middleware.PrometheusMiddleware",
+]
+
+
+class Shape(NamedTuple):
+    """Shape of a generated document."""
+
+    name: str
+    depth: int
+    breadth: int
+    fragments: int
+    items: int
+
+
+SHAPES = (
+    Shape("small", depth=2, breadth=3, fragments=0, items=10),
+    Shape("wide", depth=2, breadth=30, fragments=0, items=10),
+    Shape("deep", depth=12, breadth=3, fragments=0, items=10),
+    Shape("fragments", depth=4, breadth=3, fragments=8, items=10),
+    Shape("large", depth=8, breadth=20, fragments=8, items=20),
+)
+
+
+class Scenario(NamedTuple):
+    """Middleware configuration of a benchmark."""
+
+    name: str
+    middleware: tuple
+    settings: dict
+
+
+def build_schema():
+    """Return a synthetic schema of self-referencing ``Node`` objects."""
+    node = {"id": "1", "name": "node", "value": 1}
+    node["child"] = node
+
+    class Node(graphene.ObjectType):
+        """Object with scalar fields and a nested ``child``."""
+
+        id = graphene.ID()
+        name = graphene.String()
+        value = graphene.Int()
+        child = graphene.Field(lambda: Node)
+
+    class Query(graphene.ObjectType):
+        """Root returning ``limit`` nodes."""
+
+        nodes = graphene.List(Node, limit=graphene.Int())
+
+        @staticmethod
+        def resolve_nodes(root, info, limit=10):  # pylint: disable=unused-argument
+            return [node] * limit
+
+    return graphene.Schema(query=Query).graphql_schema
+
+
+def build_document(shape):
+    """Return a query whose ``depth`` nested levels select ``breadth`` scalars and spread ``fragments`` fragments."""
+    selection = ""
+    for level in reversed(range(shape.depth)):
+        scalars = " ".join(f"s{index}: name" for index in range(shape.breadth))
+        spreads = " ".join(f"...F{index}" for index in range(shape.fragments))
+        child = f" child {{ {selection} }}" if level < shape.depth - 1 else ""
+        selection = f"id {scalars} {spreads}{child}".strip()
+    fragments = " ".join(f"fragment F{index} on Node {{ f{index}: value }}" for index in range(shape.fragments))
+    return f"query Bench($limit: Int) {{ nodes(limit: $limit) {{ {selection} }} }} {fragments}".strip()
+
+
+def build_scenarios():
+    """Return the middleware configurations to compare with the execution without middleware."""
+    prometheus = (PrometheusMiddleware,)
+    logging_ = (GraphQLQueryLoggingMiddleware,)
+    scenarios = [
+        Scenario("prometheus:disabled", prometheus, {**BASE_SETTINGS, "graphql_metrics_enabled": False}),
+        Scenario("prometheus:base", prometheus, BASE_SETTINGS),
+    ]
+    scenarios += [
+        Scenario(f"prometheus:+{flag}", prometheus, {**BASE_SETTINGS, flag: True}) for flag in PROMETHEUS_FLAGS
+    ]
+    scenarios.append(
+        Scenario("prometheus:all", prometheus, {**BASE_SETTINGS, **dict.fromkeys(PROMETHEUS_FLAGS, True)}),
+    )
+    logging_settings = {**BASE_SETTINGS, "graphql_metrics_enabled": False, "query_logging_enabled": True}
+    scenarios += [
+        Scenario("logging:disabled", logging_, {**logging_settings, "query_logging_enabled": False}),
+        Scenario("logging:base", logging_, logging_settings),
+    ]
+    scenarios += [Scenario(f"logging:+{flag}", logging_, {**logging_settings, flag: True}) for flag in LOGGING_FLAGS]
+    scenarios.append(
+        Scenario(
+            "all",
+            prometheus + logging_,
+            {
+                **BASE_SETTINGS,
+                **dict.fromkeys(PROMETHEUS_FLAGS, True),
+                **dict.fromkeys(LOGGING_FLAGS, True),
+                "query_logging_enabled": True,
+            },
+        )
+    )
+    return scenarios
+
+
+def time_call(function, number, repeat):
+    """Return the best and median duration of one call of ``function``, in microseconds."""
+    function()
+    timings = timeit.Timer(function).repeat(repeat=repeat, number=number)
+    timings = [timing / number * 1e6 for timing in timings]
+    return min(timings), statistics.median(timings)
+
+
+class Runner:
+    """Times one document against the schema, with or without middlewares."""
+
+    def __init__(self, schema, shape, number, repeat):
+        """Parse the document of ``shape`` and count the fields it resolves."""
+        self.schema = schema
+        self.shape = shape
+        self.number = number
+        self.repeat = repeat
+        self.source = build_document(shape)
+        self.variables = {"limit": shape.items}
+        self.factory = RequestFactory()
+        self.fields = 0
+        self.resolvers = set()
+
+        def count(next_, root, info, **kwargs):
+            self.fields += 1
+            self.resolvers.add(info.parent_type.fields[info.field_name].resolve or default_field_resolver)
+            return next_(root, info, **kwargs)
+
+        self._execute(self._request(), [count])
+
+    def _execute(self, request, middleware):
+        """Execute the document as the GraphQL view would.
+
+        ``GraphQLDRFAPIView`` executes operations with the DRF ``Request``
+        wrapping the Django request as their context, so attributes missing
+        from it go through ``Request.__getattr__`` as in production.
+        """
+        context = Request(request)
+        context.user = request.user
+        result = graphql_sync(
+            self.schema,
+            self.source,
+            context_value=context,
+            variable_values=self.variables,
+            middleware=middleware,
+        )
+        if result.errors:
+            raise RuntimeError(f"{self.shape.name}: {result.errors[0]}")
+        return HttpResponse()
+
+    def _request(self):
+        request = self.factory.post("/api/graphql/")
+        request.user = AnonymousUser()
+        return request
+
+    def time_baseline(self):
+        """Time the document without any middleware."""
+        return time_call(lambda: self._execute(self._request(), None), self.number, self.repeat)
+
+    def time_scenario(self, scenario):
+        """Time the document through the Django middleware and the scenario's Graphene middlewares.
+
+        The middlewares go through ``get_middleware_chain`` as in the GraphQL
+        API, so those disabled by the scenario's settings are left out.
+        """
+        django_middleware = GraphQLObservabilityDjangoMiddleware(
+            lambda request: self._execute(request, get_middleware_chain(get_app_settings())),
+        )
+        graphene = {"MIDDLEWARE": [f"{cls.__module__}.{cls.__qualname__}" for cls in scenario.middleware]}
+        with override_settings(PLUGINS_CONFIG={APP_NAME: scenario.settings}, GRAPHENE=graphene):
+            timings = time_call(lambda: django_middleware(self._request()), self.number, self.repeat)
+            shutdown_tracing()
+        return timings
+
+    def time_chain(self, shared):
+        """Time getting the middleware chain of a request and wrapping the resolvers of the document in it.
+
+        Per request, as Graphene-Django does, the middlewares are instantiated
+        and every resolver is wrapped again; the shared chain only looks up its
+        wrapped resolvers.
+        """
+
+        def get_chain():
+            if shared:
+                return get_middleware_chain(get_app_settings())
+            middleware = graphene_django_settings.graphene_settings.MIDDLEWARE
+            return MiddlewareManager(*instantiate_middleware(middleware))
+
+        def wrap_resolvers():
+            chain = get_chain()
+            for resolver in self.resolvers:
+                chain.get_field_resolver(resolver)
+
+        settings = {**BASE_SETTINGS, "query_logging_enabled": True}
+        with override_settings(PLUGINS_CONFIG={APP_NAME: settings}, GRAPHENE={"MIDDLEWARE": GRAPHENE_MIDDLEWARE}):
+            return time_call(wrap_resolvers, self.number * 100, self.repeat)
+
+
+def run_middleware_benchmarks(schema, shapes, scenarios, number, repeat):
+    """Yield the results of every scenario on every document shape."""
+    for shape in shapes:
+        runner = Runner(schema, shape, number, repeat)
+        best, median = runner.time_baseline()
+        yield _result("middleware", "baseline", shape, runner.fields, best, median)
+        baseline = median
+        for scenario in scenarios:
+            best, median = runner.time_scenario(scenario)
+            result = _result("middleware", scenario.name, shape, runner.fields, best, median)
+            result["per_field_overhead_us"] = round((median - baseline) / runner.fields, 4)
+            yield result
+
+
+def run_chain_benchmarks(schema, shapes, number, repeat):
+    """Yield the results of the per-request and shared middleware chains on every document shape."""
+    for shape in shapes:
+        runner = Runner(schema, shape, number, repeat)
+        for scenario, shared in (("per_request", False), ("shared", True)):
+            best, median = runner.time_chain(shared)
+            yield _result("chain", scenario, shape, runner.fields, best, median)
+
+
+def ast_functions(document):
+    """Return the AST utilities to time on ``document``, by name."""
+    operation = document.definitions[0]
+    fragments = {definition.name.value: definition for definition in document.definitions[1:]}
+    info = SimpleNamespace(operation=operation)
+    return {
+        "calculate_query_depth": lambda: calculate_query_depth(operation.selection_set, fragments),
+        "calculate_query_complexity": lambda: calculate_query_complexity(operation.selection_set, fragments),
+        "_extract_query_body": lambda: _extract_query_body(info),
+    }
+
+
+def run_ast_benchmarks(shapes, number, repeat):
+    """Yield the results of the AST utilities on every document shape."""
+    for shape in shapes:
+        document = parse(build_document(shape))
+        functions = ast_functions(document)
+        fields = functions["calculate_query_complexity"]()
+        for name, function in functions.items():
+            best, median = time_call(function, number, repeat)
+            yield _result("ast", name, shape, fields, best, median)
+
+
+def _result(group, scenario, shape, fields, best, median):
+    """Return one machine-readable benchmark result."""
+    return {
+        "name": f"{group}/{scenario}/{shape.name}",
+        "group": group,
+        "scenario": scenario,
+        "document": shape._asdict(),
+        "fields": fields,
+        "best_us": round(best, 3),
+        "median_us": round(median, 3),
+    }
+
+
+def compare(results, baseline_path, max_regression):
+    """Return the benchmarks whose best time grew by more than ``max_regression`` over the baseline file."""
+    with open(baseline_path, encoding="utf-8") as stream:
+        previous = {result["name"]: result["best_us"] for result in json.load(stream)["benchmarks"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["name"])
+        if before and result["best_us"] > before * (1 + max_regression):
+            regressions.append((result["name"], before, result["best_us"]))
+    return regressions
+
+
+def print_table(results, stream):
+    """Print the results as a human-readable table."""
+    stream.write(f"{'benchmark':<64} {'fields':>7} {'best us':>11} {'median us':>11} {'us/field':>9}\n")
+    for result in results:
+        overhead = result.get("per_field_overhead_us")
+        stream.write(
+            f"{result['name']:<64} {result['fields']:>7} {result['best_us']:>11.1f} {result['median_us']:>11.1f} "
+            f"{'' if overhead is None else f'{overhead:.3f}':>9}\n"
+        )
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations and document shapes, for smoke runs")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Tolerated slowdown ratio (default: 0.25)")
+    args = parser.parse_args()
+
+    number, repeat = (5, 3) if args.quick else (20, 7)
+    shapes = SHAPES[:3] if args.quick else SHAPES
+
+    # Query log records are built and handled, but not written anywhere.
+    query_logger = logging.getLogger(QUERY_LOGGER)
+    query_logger.setLevel(logging.INFO)
+    query_logger.propagate = False
+    query_logger.handlers = [logging.NullHandler()]
+
+    schema = build_schema()
+    results = list(run_middleware_benchmarks(schema, shapes, build_scenarios(), number, repeat))
+    results.extend(run_chain_benchmarks(schema, shapes, number, repeat))
+    results.extend(run_ast_benchmarks(shapes, number * 10, repeat))
+    print_table(results, sys.stdout)
+
+    report = {
+        "app_version": __version__,
+        "python": platform.python_version(),
+        "graphql_core": graphql.__version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "number": number,
+        "repeat": repeat,
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.1f} us -> {after:.1f} us", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -956,6 +956,27 @@ def coverage_xml(context):
     run_command(context, command)
 
 
+@task(
+    help={
+        "quick": "Run fewer iterations on fewer documents, for a smoke run. (default: False)",
+        "output": "Write the results as JSON to this file.",
+        "compare": "JSON results of an earlier run; fail if a benchmark got slower than max-regression.",
+        "max_regression": "Tolerated slowdown ratio when comparing. (default: 0.25)",
+    }
+)
+def benchmark(context, quick=False, output="", compare="", max_regression=0.25):
+    """Run the micro-benchmarks of the GraphQL middlewares and AST utilities."""
+    command = "python scripts/benchmark.py"
+    if quick:
+        command += " --quick"
+    if output:
+        command += f" --output {output}"
+    if compare:
+        command += f" --compare {compare} --max-regression {max_regression}"
+
+    run_command(context, command)
+
+
 @task(
     help={
         "failfast": "fail as soon as a single test fails don't run the entire test suite. (default: False)",